@@ -0,0 +1,123 @@
+"""
+Benchmark of plotting lookups over a season: per-call fastf1.plotting vs SessionLookups.
+
+Replays the lookup calls the teams, drivers, driver-team link and session
+result stages make for every loaded session, first straight through the client
+and then through a SessionLookups table built once per session.
+
+Usage:
+    python -m f1_api.benchmarks.plotting_lookups_benchmark --year 2025
+    python -m f1_api.benchmarks.plotting_lookups_benchmark --year 2025 --source extracts
+"""
+import argparse
+import time
+from f1_api.data_sources.ff1_client import FastF1Client
+from f1_api.data_sources.extract_store import ExtractReplayClient
+from f1_api.data_sources.session_lookups import SessionLookups
+
+
+class _PerCallLookups:
+    """Same interface as SessionLookups, every lookup goes to the client"""
+    def __init__(self, f1_session, client):
+        self.f1_session = f1_session
+        self.client = client
+
+    @property
+    def teams(self):
+        return self.client.get_session_teams(self.f1_session)
+
+    @property
+    def driver_names(self):
+        return self.client.get_drivers_by_session(self.f1_session)
+
+    def drivers_of(self, team):
+        return self.client.get_drivers_by_team(team, self.f1_session)
+
+    def team_color(self, team):
+        return self.client.get_team_color(team, self.f1_session)
+
+    def driver_color(self, driver):
+        return self.client.get_driver_color(driver, self.f1_session)
+
+    def team_name_by_driver(self, driver):
+        return self.client.get_session_team_name_by_driver(driver, self.f1_session)
+
+
+class _PrecomputedLookups:
+    def __init__(self, f1_session, client):
+        self.lookups = SessionLookups.build(f1_session, client)
+        self.teams = self.lookups.teams
+        self.driver_names = self.lookups.driver_names
+
+    def drivers_of(self, team):
+        return self.lookups.drivers_by_team[team]
+
+    def team_color(self, team):
+        return self.lookups.team_color(team)
+
+    def driver_color(self, driver):
+        return self.lookups.driver_color(driver)
+
+    def team_name_by_driver(self, driver):
+        return self.lookups.team_name_by_driver(driver)
+
+
+def replay_stages(session_map: dict, client, lookups_cls) -> tuple[int, list]:
+    """Runs the lookups of one ingestion over the season, returns the call count and the answers"""
+    calls = 0
+    answers = []
+    for f1_session in session_map.values():
+        lookups = lookups_cls(f1_session, client)
+        abbreviations = list(f1_session.results["Abbreviation"])
+        # Teams and drivers stages
+        for team in lookups.teams:
+            try:
+                answers.append(lookups.team_color(team))
+            except Exception:
+                answers.append(None)
+            answers.extend(lookups.drivers_of(team))
+            calls += 2
+        for name in lookups.driver_names:
+            answers.append(lookups.driver_color(name))
+            calls += 1
+        # Driver-team links and session results stages
+        for _ in range(2):
+            for abbreviation in abbreviations:
+                try:
+                    answers.append(lookups.team_name_by_driver(abbreviation))
+                except Exception:
+                    answers.append(None)
+                calls += 1
+    return calls, answers
+
+
+def _timed(fn) -> tuple[float, tuple]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--source", choices=["fastf1", "extracts"], default="fastf1")
+    args = parser.parse_args()
+
+    if args.source == "extracts":
+        client = ExtractReplayClient()
+    else:
+        FastF1Client.enable_cache()
+        client = FastF1Client
+    session_map = client.get_session_map(args.year, set())
+    print(f"{args.year}: {len(session_map)} sessions from {args.source}")
+
+    per_call_time, (calls, per_call_answers) = _timed(lambda: replay_stages(session_map, client, _PerCallLookups))
+    precomputed_time, (_, precomputed_answers) = _timed(lambda: replay_stages(session_map, client, _PrecomputedLookups))
+    print(f"lookups per run: {calls}")
+    print(f"per-call:    {per_call_time * 1000:9.2f} ms")
+    print(f"precomputed: {precomputed_time * 1000:9.2f} ms  ({per_call_time / precomputed_time:.1f}x)")
+    print(f"answers match: {per_call_answers == precomputed_answers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark of SessionResult extraction: per-driver loop vs columnar path.
+
+Usage:
+    python -m f1_api.benchmarks.session_results_benchmark --year 2025 --gp Monza --session Race
+"""
+import argparse
+import math
+import time
+import fastf1 as ff1
+from f1_api.models.lib.session_results_utility import SessionResultsUtility
+
+
+def extract_rows_loop(f1_session, session_type: str) -> list[dict]:
+    """Per-driver extraction as SessionResultsController did it before the columnar path"""
+    rows = []
+    results = f1_session.results
+    laps = f1_session.laps
+    if session_type in ("Sprint", "Race"):
+        fastest_driver = laps.pick_fastest()["Driver"]
+        disq_drivers = results.loc[results["Status"] == "Disqualified", "Abbreviation"]
+        if fastest_driver in disq_drivers.values:
+            laps = laps[laps["Driver"] != fastest_driver]
+    for driver_num in f1_session.drivers:
+        driver_name = results.loc[results["DriverNumber"] == driver_num, "Abbreviation"].values[0]
+        driver_results = f1_session.get_driver(driver_name)
+        row = {"driver_number": int(driver_num), "position": None, "grid_position": None,
+               "best_lap_time": None, "total_time": None, "points": None, "status": None, "fastest_lap": None}
+        driver_lap = laps.pick_drivers(driver_name).pick_fastest()
+        if driver_lap is not None:
+            row["best_lap_time"] = driver_lap["LapTime"].total_seconds()
+        if session_type in ("Sprint", "Race"):
+            row["position"] = driver_results["ClassifiedPosition"]
+            row["grid_position"] = int(driver_results["GridPosition"])
+            total_time = driver_results["Time"].total_seconds()
+            row["total_time"] = None if math.isnan(total_time) else total_time
+            row["points"] = int(driver_results["Points"])
+            row["status"] = driver_results["Status"]
+            session_fastest = laps["LapTime"].min().total_seconds()
+            row["fastest_lap"] = str(driver_results["ClassifiedPosition"]).isdigit() and row["best_lap_time"] == session_fastest
+        if session_type == "Qualifying":
+            row["position"] = int(driver_results["Position"])
+        rows.append(row)
+    return rows
+
+
+def extract_rows_columnar(f1_session, session_type: str) -> list[dict]:
+    frame = SessionResultsUtility.extract_session_rows(f1_session.results, f1_session.laps, session_type)
+    return frame.drop(columns=["abbreviation"]).to_dict("records")
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--gp", default="Monza")
+    parser.add_argument("--session", default="Race")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cache", default=None, help="FastF1 cache directory")
+    args = parser.parse_args()
+
+    if args.cache:
+        ff1.Cache.enable_cache(args.cache)
+    f1_session = ff1.get_session(args.year, args.gp, args.session)
+    f1_session.load(laps=True, telemetry=False, weather=False, messages=False)
+    session_type = f1_session.name
+
+    loop_rows = sorted(extract_rows_loop(f1_session, session_type), key=lambda r: r["driver_number"])
+    columnar_rows = sorted(extract_rows_columnar(f1_session, session_type), key=lambda r: r["driver_number"])
+    mismatches = [(a, b) for a, b in zip(loop_rows, columnar_rows) if a != b]
+
+    loop_time = _best_of(lambda: extract_rows_loop(f1_session, session_type), args.repeat)
+    columnar_time = _best_of(lambda: extract_rows_columnar(f1_session, session_type), args.repeat)
+    print(f"{args.year} {args.gp} {session_type}: {len(f1_session.drivers)} drivers, {len(f1_session.laps)} laps")
+    print(f"per-driver loop: {loop_time * 1000:8.2f} ms")
+    print(f"columnar:        {columnar_time * 1000:8.2f} ms  ({loop_time / columnar_time:.1f}x)")
+    print(f"row mismatches:  {len(mismatches)}")
+    for loop_row, columnar_row in mismatches:
+        print(f"  loop={loop_row}\n  columnar={columnar_row}")
+
+
+if __name__ == "__main__":
+    main()
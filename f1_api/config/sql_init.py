@@ -2,10 +2,11 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.pool import NullPool
-from sqlmodel import SQLModel
+from sqlmodel import Session, SQLModel
 from urllib.parse import quote_plus
 from f1_api.models.f1_schemas import *
 from f1_api.models.app_models import *
+from f1_api.models.repositories.schema_repository import ensure_ingestion_schema
 
 # Load environment variables first
 load_dotenv(r'C:/Users/Marc/Documents/ITA/Sprint 8/f1_api/.env')
@@ -35,6 +36,8 @@ def create_models():
     """
     try:
         SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            ensure_ingestion_schema(session)
         print("Database tables created successfully!")
     except Exception as e:
         print(f"Failed to create tables: {e}")
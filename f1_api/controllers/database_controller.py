@@ -1,54 +1,367 @@
+import gc
 import logging
+import os
+import tracemalloc
 from datetime import datetime
 from sqlmodel import Session, select
 from f1_api.models.f1_schemas import Events, Seasons, Sessions, Teams, Drivers
+from f1_api.controllers.ingestion_metrics import IngestionMetrics
+from f1_api.controllers.season_context_controller import SeasonContextController
 from f1_api.controllers.session_results_controller import get_session_results
-from f1_api.controllers.teams_controller import get_team_data
+from f1_api.controllers.teams_controller import TeamsController
 from f1_api.controllers.events_controller import get_event_data
 from f1_api.controllers.sessions_controller import get_session_data
 from f1_api.controllers.drivers_controller import get_driver_data
 from f1_api.controllers.driver_team_link_controller import get_all_driver_team_links
 from f1_api.controllers.driver_team_link_reconciliation import reconcile_driver_team_links
+from f1_api.data_sources.extract_store import DEFAULT_EXTRACT_DIR, ExtractReplayClient, ExtractStore
+from f1_api.data_sources.ff1_client import FastF1Client
+from f1_api.models.repositories.bulk_upsert_repository import BulkUpsertRepository
+from f1_api.models.repositories.data_version_repository import DataVersionRepository
+from f1_api.models.repositories.driver_season_stats_repository import DriverSeasonStatsRepository
+from f1_api.models.repositories.dry_run_repository import DryRunRepository
+from f1_api.models.repositories.ingestion_checkpoint_repository import IngestionCheckpointRepository
+from f1_api.models.repositories.ingestion_state_repository import IngestionStateRepository
+from f1_api.models.repositories.schema_repository import ensure_ingestion_schema
 
 logging.basicConfig(level=logging.INFO)
 
-async def update_db(engine):
+class IngestionCancelled(Exception):
+    """
+    Raised by a progress callback to stop an ingestion run between stages
+    """
+
+def _rows(models) -> list[dict]:
+    """Column values of ingested models, leaving serial ids to the DB"""
+    return [m.model_dump(exclude={"id"}) for m in models]
+
+def _season_rows(year: int, driver_rows: list[dict]) -> list[dict]:
+    """DriverSeason values of the season's drivers, keyed by driver_key until their ids are known"""
+    return [
+        {"season_id": year, **{column: row[column] for column in ("driver_key", "driver_number", "acronym", "driver_color", "headshot_url")}}
+        for row in driver_rows
+    ]
+
+def _write(writes: dict, metrics: IngestionMetrics | None, table: str, upsert, rows: list[dict]) -> dict:
+    """Upserts the rows of a table and adds the counts to the run totals"""
+    counts = upsert(rows)
+    totals = writes.setdefault(table, {"inserted": 0, "updated": 0})
+    for key in totals:
+        totals[key] += counts[key]
+    if metrics:
+        metrics.record_rows(table, len(rows), counts)
+    return counts
+
+def _written(writes: dict) -> int:
+    """Rows inserted or updated so far in the run"""
+    return sum(totals["inserted"] + totals["updated"] for totals in writes.values())
+
+def _peak_memory_mb() -> float | None:
+    if not tracemalloc.is_tracing():
+        return None
+    return round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 1)
+
+def _checkpoint_store() -> ExtractStore:
+    """Extracts of the rounds an unfinished run already loaded, replayed when it resumes"""
+    return ExtractStore(os.environ.get("INGESTION_CHECKPOINT_DIR", os.path.join(DEFAULT_EXTRACT_DIR, "checkpoints")))
+
+def _resume_loads(year: int, checkpoint_round: int, checkpoints: IngestionCheckpointRepository,
+                  store: ExtractStore) -> bool:
+    """True when the sessions of a checkpointed load can be replayed, drops the round's checkpoints otherwise"""
+    checkpoint = checkpoints.get(checkpoint_round, "loading_sessions")
+    if checkpoint is None:
+        return False
+    if all(store.has_session(year, rn, sn) for rn, sn in checkpoint.sessions or []):
+        return True
+    logging.warning(f"Extracts of the checkpointed load of round {checkpoint_round} are missing, restarting it")
+    checkpoints.clear(checkpoint_round)
+    return False
+
+async def _ingest_snapshot(session: Session, year: int, season_context: SeasonContextController,
+                           bulk: BulkUpsertRepository, writes: dict, report, round_number: int | None = None,
+                           write_extracts: bool = False, reconcile: bool = True,
+                           metrics: IngestionMetrics | None = None, dry_run: bool = False,
+                           checkpoints: IngestionCheckpointRepository | None = None,
+                           resumed: list | None = None) -> list:
+    """
+    Runs every ingestion stage over one snapshot (the season or one round), returns the reconciled links
+
+    With ``checkpoints`` each stage is recorded in the same commit as its writes
+    and stages a previous run completed are skipped; the loaded sessions are
+    kept as extracts so a resumed run replays them instead of calling FastF1.
+    A snapshot that changed anything bumps the season's DataVersion, which
+    invalidates the cached drivers and teams responses.
+    """
+    checkpoint_round = round_number or 0
+    resumed = resumed if resumed is not None else []
+    written_before, resumed_before = _written(writes), len(resumed)
+    def done(stage: str) -> bool:
+        if checkpoints is not None and checkpoints.is_done(checkpoint_round, stage):
+            logging.info(f"Resuming: {stage} of round {checkpoint_round} already completed")
+            resumed.append((checkpoint_round, stage))
+            return True
+        return False
+    def mark(stage: str, sessions: list | None = None):
+        if checkpoints is not None:
+            checkpoints.mark(checkpoint_round, stage, sessions)
+
+    report("loading_sessions", round_number)
+    store = _checkpoint_store() if checkpoints is not None else None
+    replayed = checkpoints is not None and _resume_loads(year, checkpoint_round, checkpoints, store)
+    if replayed and done("loading_sessions"):
+        season_context.ff1_client = ExtractReplayClient(store)
+    season_context.session_map
+    if checkpoints is not None and not replayed:
+        store.write_snapshot(season_context)
+        mark("loading_sessions", season_context.loaded_sessions)
+        session.commit()
+    if write_extracts:
+        report("writing_extracts", round_number)
+        logging.info(f"Wrote {ExtractStore().write_snapshot(season_context)} session extracts")
+
+    report("events", round_number)
+    if not done("events"):
+        events: list[Events] = get_event_data(session,year,season_context)
+        sessions: list[Sessions] = get_session_data(session,year,season_context)
+        teams_controller = TeamsController(session, season_context)
+        teams: list[Teams] = teams_controller.all_teams
+
+        _write(writes, metrics, "events", bulk.upsert_events, _rows(events))
+        _write(writes, metrics, "sessions", bulk.upsert_sessions, _rows(sessions))
+        _write(writes, metrics, "teams", bulk.upsert_teams, _rows(teams))
+        _write(writes, metrics, "team_rosters", bulk.upsert_team_rosters, teams_controller.roster_rows)
+        mark("events")
+        session.commit()
+        season_context.lookups.invalidate()
+        if dry_run:
+            season_context.lookups.add_provisional(team_names=bulk.new_keys("teams", "team_name"))
+
+    report("drivers", round_number)
+    if not done("drivers"):
+        drivers: list[Drivers] = get_driver_data(session,season_context)
+        driver_rows = _rows(drivers)
+        _write(writes, metrics, "drivers", bulk.upsert_drivers, driver_rows)
+        _write(writes, metrics, "driver_seasons", bulk.upsert_driver_seasons, _season_rows(year, driver_rows))
+        mark("drivers")
+        session.commit()
+        season_context.lookups.invalidate()
+        if dry_run:
+            season_context.lookups.add_provisional(driver_numbers=bulk.new_keys("driverseason", "driver_number"))
+
+    report("driver_team_links", round_number)
+    if not done("driver_team_links"):
+        all_driver_team_links = get_all_driver_team_links(session,year,season_context)
+        _write(writes, metrics, "driver_team_links", bulk.upsert_driver_team_links, _rows(all_driver_team_links))
+        mark("driver_team_links")
+        session.commit()
+
+    missing_links = []
+    if reconcile:
+        missing_links = await _reconcile(session, year, season_context, bulk, writes, report, metrics)
+
+    report("session_results", round_number)
+    if not done("session_results"):
+        all_session_results = get_session_results(year, session, season_context)
+        counts = _write(writes, metrics, "session_results", bulk.upsert_session_results, _rows(all_session_results))
+        if not dry_run and (counts["inserted"] or counts["updated"]):
+            # Same transaction as the results, so a resumed run never finds one without the other
+            _write(writes, metrics, "driver_season_stats", DriverSeasonStatsRepository(session, year).refresh,
+                   {result.driver_id for result in all_session_results})
+        mark("session_results")
+        session.commit()
+
+    if not dry_run:
+        # A resumed snapshot may have written its data in the failed run, before any bump
+        if _written(writes) > written_before or len(resumed) > resumed_before:
+            DataVersionRepository(session).bump(year)
+        # The watermarks take over from the checkpoints once the snapshot is fully written
+        IngestionStateRepository(session, year).record_sessions(season_context.loaded_sessions)
+        if checkpoints is not None:
+            checkpoints.clear(checkpoint_round)
+        session.commit()
+        if store is not None:
+            for loaded_round in {rn for rn, _ in season_context.loaded_sessions}:
+                store.remove(year, loaded_round)
+    return missing_links
+
+async def _reconcile(session: Session, year: int, season_context: SeasonContextController,
+                     bulk: BulkUpsertRepository, writes: dict, report,
+                     metrics: IngestionMetrics | None = None) -> list:
+    # Reconcile missing DriverTeamLinks
+    report("reconciliation")
+    missing_links = await reconcile_driver_team_links(session, year, season_context)
+    if missing_links:
+        logging.info(f"Reconciliation: adding {len(missing_links)} missing DriverTeamLinks")
+        counts = _write(writes, metrics, "driver_team_links", bulk.upsert_driver_team_links, _rows(missing_links))
+        if not isinstance(bulk, DryRunRepository) and counts["inserted"]:
+            DataVersionRepository(session).bump(year)
+        session.commit()
+    return missing_links
+
+async def update_db(engine, year: int | None = None, progress=None,
+                    rounds: list[int] | None = None, sessions: list[str] | None = None,
+                    source: str | None = None, stream: bool | None = None,
+                    dry_run: bool = False, dry_run_file: str | None = None, force: bool = False):
     """
     Adds all the models to the sql session and pushes them inteo the DB
+
+    Every stage reads from a single season snapshot, returns the run summary
+    with its FastF1 load counters. The run is planned from the ingestion
+    watermarks first, so a refresh with nothing pending never touches FastF1.
+    ``progress(stage, round_number=None)`` is called as the run advances and may
+    raise IngestionCancelled to stop it. ``rounds`` / ``sessions`` restrict the run
+    to a slice of the season (e.g. the latest race weekend), reloaded even if it
+    was already ingested. ``source`` (INGESTION_SOURCE) is "fastf1" or "extracts"
+    to replay Parquet extracts without FastF1; with FF1_WRITE_EXTRACTS=1 a FastF1
+    run also writes the extracts of the sessions it loaded.
+
+    ``stream`` (INGESTION_STREAMING, on by default) runs the stages one round at
+    a time and releases the round's sessions once it is written, so memory does
+    not grow with the number of rounds; each round is reconciled before its
+    sessions are released. With INGESTION_TRACE_MEMORY=1 (a diagnostics mode,
+    tracemalloc slows the run down) the summary reports the tracemalloc peak of
+    the run and of each round.
+
+    Stage timings, rows per table, FastF1 loads and the warnings logged by
+    each stage are returned as summary["report"], and written as JSON to
+    INGESTION_REPORT_DIR when it is set.
+
+    The driver_season_stats rows of every driver whose results changed are
+    recomputed with the results, and seeded once for seasons ingested before
+    the table existed.
+
+    ``dry_run`` runs the same extraction but only diffs the rows against the
+    database: nothing is written, summary["dry_run"] holds the change set per
+    table and ``dry_run_file`` receives the detailed rows as JSON. New drivers
+    and teams get negative placeholder ids so their links and results are
+    counted too.
+
+    With INGESTION_CHECKPOINTS=1 stages are checkpointed per (stage, round):
+    after a failure the next run skips the stages already committed and
+    replays the sessions it already loaded from extracts under
+    INGESTION_CHECKPOINT_DIR. They are off by default, as every checkpointed
+    round writes its sessions as Parquet. ``force`` drops the checkpoints and the
+    watermarks' plan and reloads every round of the scope.
     """
+    summary = {}
+    year = year or datetime.now().year
+    metrics = IngestionMetrics(year)
+    def report(stage: str, round_number: int | None = None):
+        metrics.enter(stage, round_number)
+        if progress:
+            progress(stage, round_number)
+    started_tracing = False
+    metrics.start()
     try:
-        year = datetime.now().year
+        source = source or os.environ.get("INGESTION_SOURCE", "fastf1")
+        stream = stream if stream is not None else os.environ.get("INGESTION_STREAMING", "1") == "1"
+        ff1_client = ExtractReplayClient() if source == "extracts" else FastF1Client
+        write_extracts = source != "extracts" and os.environ.get("FF1_WRITE_EXTRACTS") == "1"
+        if os.environ.get("INGESTION_TRACE_MEMORY") == "1" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        report("planning")
         with Session(engine) as session:
+            ensure_ingestion_schema(session)
+            bulk = DryRunRepository(session) if dry_run else BulkUpsertRepository(session)
             season_exists = session.exec(select(Seasons).where(Seasons.year == year)).first()
-            if not season_exists:
+            if not season_exists and dry_run:
+                bulk.missing_season(year)
+            elif not season_exists:
                 session.add(Seasons(year=year))
                 session.commit()
 
-            events: list[Events] = get_event_data(session,year)
-            sessions: list[Sessions] = get_session_data(session,year)
-            teams: list[Teams] = get_team_data(session)
-
-            session.add_all([*events,*sessions,*teams])
-
-            drivers: list[Drivers] = get_driver_data(session)
-            
-            session.add_all(drivers)
-            session.commit()
-            
-            all_driver_team_links = get_all_driver_team_links(session,year)
-            session.add_all(all_driver_team_links)
-            session.commit()
-            
-            # Reconcile missing DriverTeamLinks
-            missing_links = await reconcile_driver_team_links(session, year)
-            if missing_links:
-                logging.info(f"Reconciliation: adding {len(missing_links)} missing DriverTeamLinks")
-                session.add_all(missing_links)
+            checkpoints = None
+            if not dry_run and os.environ.get("INGESTION_CHECKPOINTS") == "1":
+                checkpoints = IngestionCheckpointRepository(session, year)
+                if force:
+                    checkpoints.clear()
+                    session.commit()
+                    _checkpoint_store().remove(year)
+                else:
+                    stale_extracts = checkpoints.discard_stale()
+                    session.commit()
+                    store = _checkpoint_store()
+                    for rn, sn in stale_extracts:
+                        store.remove_session(year, rn, sn)
+                    if stale_extracts:
+                        logging.info(f"Discarded stale ingestion checkpoints of season {year}")
+            resumed = []
+
+            state_repository = IngestionStateRepository(session, year)
+            if not dry_run:
+                state_repository.backfill_from_results()
+                DriverSeasonStatsRepository(session, year).backfill()
                 session.commit()
+            pending = state_repository.get_pending_sessions() if not rounds and not force else None
+            if pending is not None and not pending:
+                logging.info(f"Season {year} is up to date, nothing to ingest")
+                summary = {"season": year, "pending_sessions": 0}
+            else:
+                season_context = SeasonContextController(session, ff1_client, year, report,
+                                                         rounds=rounds, session_names=sessions, metrics=metrics,
+                                                         force=force)
+                writes = {}
+                round_peaks = {}
+
+                if stream:
+                    missing_links = []
+                    for round_number in season_context.pending_rounds:
+                        if tracemalloc.is_tracing():
+                            tracemalloc.reset_peak()
+                        round_context = season_context.for_round(round_number)
+                        await _ingest_snapshot(session, year, round_context, bulk, writes, report, round_number,
+                                               write_extracts=write_extracts, reconcile=False, metrics=metrics,
+                                               dry_run=dry_run, checkpoints=checkpoints, resumed=resumed)
+                        # Reconciled while the round's sessions are still loaded
+                        missing_links += await _reconcile(session, year, round_context, bulk, writes, report, metrics)
+                        # A session that is not available yet ends the season, like the full session map
+                        stopped = len(round_context.session_map) < len(round_context.pending_sessions)
+                        round_context.release()
+                        del round_context
+                        gc.collect()
+                        round_peaks[int(round_number)] = _peak_memory_mb()
+                        if stopped:
+                            break
+                else:
+                    missing_links = await _ingest_snapshot(session, year, season_context, bulk, writes, report,
+                                                           write_extracts=write_extracts, metrics=metrics, dry_run=dry_run,
+                                                           checkpoints=checkpoints, resumed=resumed)
 
-            all_session_results = get_session_results(year, session)
-            session.add_all(all_session_results)
-            session.commit()
+                summary = {
+                    **season_context.summary,
+                    "pending_sessions": len(pending) if pending is not None else None,
+                    "rounds": sorted(rounds) if rounds else None,
+                    "streaming": stream,
+                    "forced": force,
+                    "resumed_stages": resumed,
+                    "writes": writes,
+                    "lookups": season_context.lookups.stats,
+                    "reconciled_links": [(link.driver_id, link.round_number) for link in missing_links],
+                    "memory": {
+                        # The last peak covers everything since the final round started
+                        "peak_mb": max([p for p in [*round_peaks.values(), _peak_memory_mb()] if p is not None], default=None),
+                        "round_peak_mb": round_peaks,
+                    },
+                }
+                if dry_run:
+                    session.rollback()
+                    summary["dry_run"] = bulk.summary
+                    if dry_run_file:
+                        summary["dry_run_file"] = bulk.write_changes(dry_run_file)
+            logging.info(f"update_db summary: {summary}")
             session.close()
+    except IngestionCancelled:
+        raise
     except Exception as e:
         logging.warning(f'During the execution of update_db function, the following exception ocurred: {e}')
+        summary = {**summary, "error": str(e)}
+    finally:
+        metrics.stop()
+        if started_tracing:
+            tracemalloc.stop()
+    summary["report"] = metrics.report()
+    report_path = metrics.write_report()
+    if report_path:
+        logging.info(f"Ingestion report written to {report_path}")
+    return summary
@@ -14,7 +14,6 @@ from f1_api.models.repositories.drivers_repository import DriversRepository
 from f1_api.models.repositories.driver_team_link_repository import DriverTeamLinkRepository
 from f1_api.models.app_models import DriverOwnership
 from f1_api.models.repositories.sessions_results_repository import SessionResultsRepository
-from f1_api.models.lib.drivers_utility import DriversUtility
 
 logger = logging.getLogger(__name__)
 
@@ -152,23 +151,15 @@ class DriverOwnershipController(BaseController):
             List of dicts with driver data + fantasy_stats.price
         """
         
-        # Initialize repositories
+        # Driver aggregates computed by Postgres (same approach as market_controller)
         results_repo = SessionResultsRepository(season_year, self.session)
-        drivers_utility = DriversUtility()
-        
-        # Get driver results data (same approach as market_controller)
-        database_data = results_repo.get_driver_results()
-        all_results = database_data["all_results"]
-        
-        # Calculate stats using DriversUtility
-        stats = drivers_utility.get_driver_stats(all_results)
-        points_map = {r.driver_id: r.total_points for r in database_data["results"]}
+        stats = results_repo.get_driver_stats()["stats"]
         
         # Enrich each driver with fantasy_stats.price
         enriched = []
         for driver in drivers:
             driver_stats = stats.get(driver.id, {})
-            points = points_map.get(driver.id, 0)
+            points = driver_stats.get("points", 0)
             podiums = driver_stats.get("podiums", 0)
             victories = driver_stats.get("victories", 0)
             
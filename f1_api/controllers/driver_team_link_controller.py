@@ -4,24 +4,20 @@ from f1_api.controllers.season_context_controller import SeasonContextController
 from f1_api.data_sources.ff1_client import FastF1Client
 from f1_api.models.f1_schemas import DriverTeamLink
 from f1_api.models.repositories.driver_team_link_repository import DriverTeamLinkRepository
-from f1_api.models.repositories.drivers_repository import DriversRepository
-from f1_api.models.repositories.teams_repository import TeamsRepository
 
 class DriverTeamLinkController:
-    def __init__(self, session: Session, year: int):
+    def __init__(self, session: Session, year: int, season_context: SeasonContextController | None = None):
         self.season = year
-        self.driver_repository = DriversRepository(session,year)
-        self.team_repository = TeamsRepository(session)
         self.repository = DriverTeamLinkRepository(session)
-        self.season_context = SeasonContextController(session,FastF1Client)
+        self.season_context = season_context or SeasonContextController(session,FastF1Client,year)
     def get_all_driver_team_links(self) -> list[DriverTeamLink]:
         """
         Returns a list of DriverTeamLink objects for all (driver, team, round) assignments
         """
         links = set()
         driver_team_links = []
-        existing_links = self.repository.get_existing_links()
         session_types_by_rn = self.season_context.session_types_by_rn
+        lookups = self.season_context.lookups
         for round_number, session_types in session_types_by_rn.items():
             for session_number,session_type in enumerate(session_types, start=1):
                 try:
@@ -33,12 +29,10 @@ class DriverTeamLinkController:
                     results = f1_session.results
                     for driver_num in driver_list:
                         try:
-                            driver_id = self.driver_repository.get_drivers_id_map().get(int(driver_num))
+                            driver_id = lookups.driver_id(driver_num)
                             driver_abb = results.loc[results["DriverNumber"] == driver_num, "Abbreviation"].values[0]
                             team_name = self.season_context.get_session_team_name_by_driver(driver_abb,f1_session)
-                            team_id = self.team_repository.get_team_id_map().get(team_name)
-                            if (driver_id, team_id, round_number) in existing_links:
-                                continue
+                            team_id = lookups.team_id(team_name)
                             if driver_id is None or team_id is None:
                                 continue
                             link_key = (driver_id, team_id, self.season, round_number)
@@ -58,6 +52,6 @@ class DriverTeamLinkController:
                     logging.warning(f"Round {round_number} not availavle yet: {e}")
                     continue
         return driver_team_links
-def get_all_driver_team_links(session,year):
-    controller = DriverTeamLinkController(session, year)
+def get_all_driver_team_links(session,year,season_context=None):
+    controller = DriverTeamLinkController(session, year, season_context)
     return controller.get_all_driver_team_links()
\ No newline at end of file
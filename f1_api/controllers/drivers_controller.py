@@ -1,112 +1,150 @@
 """Drivers controller module for drivers-related operations"""
 from datetime import datetime
 import logging
+import pandas as pd
 from sqlmodel import Session
 from f1_api.controllers.base_controller import BaseController
 from f1_api.controllers.season_context_controller import SeasonContextController
 from f1_api.data_sources.ff1_client import FastF1Client
 from f1_api.models.f1_schemas import Drivers
 from f1_api.models.lib.drivers_utility import DriversUtility
+from f1_api.models.repositories.driver_season_stats_repository import DriverSeasonStatsRepository
 from f1_api.models.repositories.drivers_repository import DriversRepository
 from f1_api.models.repositories.sessions_results_repository import SessionResultsRepository
 
+DRIVER_COLUMNS = ["FullName", "DriverNumber", "Abbreviation", "CountryCode", "TeamName"]
+
 class DriversController(BaseController):
     """Provides drivers response"""
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, season_context: SeasonContextController | None = None):
         super().__init__(session)
-        self.season = datetime.now().year
+        self.season = season_context.year if season_context else datetime.now().year
         self.repository = DriversRepository(session,self.season)
         self.results = SessionResultsRepository(self.season, session)
+        self.season_stats = DriverSeasonStatsRepository(session, self.season)
         self.business_logic = DriversUtility()
-        self.season_context = SeasonContextController(session, FastF1Client)
-    def get_drivers_service(self) -> list:
+        self.season_context = season_context or SeasonContextController(session, FastF1Client)
+    def get_drivers_service(self, round_number: int | None = None) -> list:
         """
-        Get all drivers sorted by championship points up to the last round
+        Get all drivers sorted by championship points up to the last round,
+        read from the driver_season_stats table maintained by ingestion
         
         Args:
-            session: Database session
+            round_number: Standings as of this round instead, aggregated from the results
             
         Returns:
             list: Drivers with calculated points and stats
         """
         try:
-            database_data = self.results.get_driver_results()
-            max_round = database_data["max_round"]
-            sprint_rounds = database_data["sprint_rounds"]
-            results = database_data["results"]
-            all_results = database_data["all_results"]
-            db_drivers = database_data["drivers"]
-
-            points_map = {r.driver_id: r.total_points for r in results}
+            if round_number is not None:
+                return self._get_drivers_at_round(round_number)
+            rows = self.season_stats.get_drivers_with_stats()
+            if not rows:
+                return []
+            max_round, sprint_rounds = rows[0][2], rows[0][3]
 
-            available_points = 25 * max_round + len(sprint_rounds) * 8
+            available_points = 25 * max_round + sprint_rounds * 8
 
-            stats = self.business_logic.get_driver_stats(all_results)
-            
-            drivers_sorted = sorted(
-                db_drivers,
-                key=lambda d: points_map.get(d.id, 0),
-                reverse=True
-            )
+            stats = {driver.id: driver_stats.model_dump() for driver, driver_stats, _, _ in rows if driver_stats}
+            points_map = {driver_id: driver_stats["points"] for driver_id, driver_stats in stats.items()}
+            drivers_sorted = [driver for driver, _, _, _ in rows]
+            season = rows[0][1].season_id if rows[0][1] else None
 
-            drivers = self.business_logic.get_drivers_mapped(max_round, stats, points_map, available_points, drivers_sorted, self.session)
+            drivers = self.business_logic.get_drivers_mapped(max_round, stats, points_map, available_points, drivers_sorted, self.session, season)
 
             return drivers
             
         except Exception as e:  # pylint: disable=broad-except
             logging.warning("Drivers controller execution interrupted by the following exception: %s", e)
             return []
+    def _get_drivers_at_round(self, round_number: int) -> list:
+        """Drivers by points up to a round, from the per-driver aggregates of SessionResult"""
+        season_stats = self.results.get_driver_stats(round_number)
+        max_round = season_stats["max_round"]
+        stats = season_stats["stats"]
+        points_map = {driver_id: driver_stats["points"] for driver_id, driver_stats in stats.items()}
+        available_points = 25 * max_round + season_stats["sprint_rounds"] * 8
+        drivers_sorted = sorted(
+            self.repository.get_season_drivers(),
+            key=lambda d: points_map.get(d.id, 0),
+            reverse=True
+        )
+        return self.business_logic.get_drivers_mapped(max_round, stats, points_map, available_points, drivers_sorted, self.session, self.season)
     def get_driver_data(self) -> list[Drivers]:
-        drivers_list = []
-        added_drivers = set()
+        """
+        Drivers of the season, keyed on their create_driver_id slug.
+
+        Driver rows of every loaded session are concatenated into one frame and
+        headshot URLs are computed per column. What changed is decided by the
+        upsert, which also keeps a backfilled season from overwriting the
+        fields of a more recent one.
+        """
+        candidates = self._season_driver_frame()
+        if candidates.empty:
+            return []
+        candidates = candidates.drop_duplicates(subset=["DriverNumber", "TeamName"], keep="first")
+        driver_ids = self._driver_ids(candidates["FullName"].unique())
+        candidates = candidates[candidates["FullName"].isin(list(driver_ids))]
+        team_keys = candidates["TeamName"].str.lower().str.replace(" ", "")
+        candidates = candidates.assign(
+            driver_key=candidates["FullName"].map(driver_ids),
+            team_key=team_keys,
+            headshot_url=DriversUtility.get_driver_headshot_urls(
+                self.season,
+                team_keys,
+                candidates["FullName"].map(driver_ids),
+            )
+        )
+        return [
+            Drivers(
+                driver_key=row.driver_key,
+                driver_number=int(row.DriverNumber),
+                full_name=row.FullName,
+                acronym=row.Abbreviation,
+                driver_color=row.driver_color,
+                country_code=row.CountryCode,
+                headshot_url=row.headshot_url,
+                team_key=row.team_key,
+                last_season=self.season,
+                current_market_value=10_000_000
+            )
+            for row in candidates.itertuples(index=False)
+        ]
+    def _season_driver_frame(self) -> pd.DataFrame:
+        """Result rows of the race drivers in every session, in round, session and plotting order"""
+        frames = []
         session_types_by_rn = self.season_context.session_types_by_rn
         for round_number, session_types in session_types_by_rn.items():
             race = self.season_context.session_map.get((round_number,session_types[4]))
-            accept_drivers = set()
-            if race is not None:
-                teams = self.season_context.get_session_teams(race)
-                for t in teams:
-                    accept_drivers.update(self.season_context.get_drivers_by_team(t,race))
-            else:
+            if race is None:
                 logging.warning(f"No race data available for round {round_number}, skipping driver processing for this round")
                 continue
+            accept_drivers = set()
+            for t in self.season_context.get_session_teams(race):
+                accept_drivers.update(self.season_context.get_drivers_by_team(t,race))
             for session_type in session_types:
                 try:
                     f1_session = self.season_context.session_map.get((round_number,session_type))
                     if f1_session is None:
                         continue
-                    results = f1_session.results
-                    driver_names = self.season_context.get_drivers_by_session(f1_session)
-                    for driver in driver_names:
-                        if driver not in accept_drivers:
-                            continue
-                        driver_color = self.season_context.driver_color(driver,f1_session)
-                        driver_number = results.loc[results["FullName"] == driver, "DriverNumber"].values[0] if not results.loc[results["FullName"] == driver, "DriverNumber"].empty else None
-                        acronym = results.loc[results["FullName"] == driver, "Abbreviation"].values[0] if not results.loc[results["FullName"] == driver, "Abbreviation"].empty else None
-                        country = results.loc[results["FullName"] == driver, "CountryCode"].values[0] if not results.loc[results["FullName"] == driver, "CountryCode"].empty else None
-                        team = results.loc[results["FullName"] == driver, "TeamName"].values[0] if not results.loc[results["FullName"] == driver, "TeamName"].empty else None
-                        team_name = team.lower().replace(" ", "")
-                        driver_id = DriversUtility.create_driver_id(driver)
-                        headshot_url = DriversUtility.get_driver_headshot_url(self.season,team_name,driver_id)
-                        driver_key = (driver_number, team)
-                        if driver_key in added_drivers:
-                            continue
-                        added_drivers.add(driver_key)
-                        driver_obj = {
-                            "driver_number": int(driver_number),
-                            "full_name": driver,
-                            "acronym": acronym,
-                            "driver_color": driver_color,
-                            "country_code": country,
-                            "headshot_url": headshot_url
-                        }
-                        updated_driver = self.repository.check_existing_drivers(driver_obj)
-                        if updated_driver:
-                            drivers_list.append(updated_driver)
+                    driver_names = [d for d in self.season_context.get_drivers_by_session(f1_session) if d in accept_drivers]
+                    results = f1_session.results[DRIVER_COLUMNS].drop_duplicates(subset=["FullName"])
+                    rows = results.set_index("FullName").reindex(driver_names).dropna(subset=["DriverNumber"]).reset_index()
+                    rows["driver_color"] = [self.season_context.driver_color(d, f1_session) for d in rows["FullName"]]
+                    frames.append(rows)
                 except Exception as e:
                     logging.warning(f"Round {round_number} not availavle yet: {e}")
-                    return drivers_list
-        return drivers_list
+                    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    @staticmethod
+    def _driver_ids(full_names) -> dict:
+        driver_ids = {}
+        for name in full_names:
+            try:
+                driver_ids[name] = DriversUtility.create_driver_id(name)
+            except ValueError as e:
+                logging.warning(f"Skipping driver {name}: {e}")
+        return driver_ids
     def get_drivers_id_map(self):
         all_drivers = self.repository.get_all_drivers()
         driver_id_map = {driver.driver_number: driver.id for driver in all_drivers}
@@ -117,8 +155,8 @@ def get_drivers_service(session: Session) -> list:
     """
     controller = DriversController(session)
     return controller.get_drivers_service()
-def get_driver_data(session):
-    drivers_controller = DriversController(session)
+def get_driver_data(session, season_context=None):
+    drivers_controller = DriversController(session, season_context)
     return drivers_controller.get_driver_data()
 def get_drivers_id_map(session):
     drivers_controller = DriversController(session)
@@ -4,17 +4,14 @@ from f1_api.models.f1_schemas import Events
 from f1_api.models.repositories.events_repository import EventsRepository
 
 class EventsController:
-    def __init__(self, session: Session, year: int):
+    def __init__(self, session: Session, year: int, season_context: SeasonContextController | None = None):
         self.repository = EventsRepository(session, year)
-        self.season_context = SeasonContextController(session)
+        self.season_context = season_context or SeasonContextController(session, year=year)
 
     def get_events_data(self):
         events = []
-        round_numbers = self.repository.get_round_numbers()
         events_data = self.season_context.events_data
         for e in events_data:
-            if e["round_number"] in round_numbers:
-                continue
             events.append(Events(
                 round_number=e["round_number"],
                 season_id=e["season_id"],
@@ -25,6 +22,6 @@ class EventsController:
             ))
         return events
 
-def get_event_data(session, year):
-    events_controller = EventsController(session,year)
+def get_event_data(session, year, season_context=None):
+    events_controller = EventsController(session,year,season_context)
     return events_controller.get_events_data()
\ No newline at end of file
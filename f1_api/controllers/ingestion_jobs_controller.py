@@ -0,0 +1,155 @@
+"""Ingestion jobs controller, submits, reports and cancels background ingestion runs"""
+import logging
+import os
+from datetime import datetime
+from sqlmodel import Session
+from fastapi import HTTPException
+from f1_api.controllers.base_controller import BaseController
+from f1_api.controllers.ingestion_metrics import render_prometheus
+from f1_api.controllers.ingestion_worker import start_worker
+from f1_api.models.f1_schemas import IngestionJob
+from f1_api.models.repositories.ingestion_jobs_repository import IngestionJobsRepository
+from f1_api.models.repositories.schema_repository import ensure_ingestion_schema
+
+BACKFILL_MAX_PARALLEL = int(os.environ.get("BACKFILL_MAX_PARALLEL", 4))
+
+def job_scope(rounds: list[int] | None = None, sessions: list[str] | None = None,
+              dry_run: bool = False, force: bool = False) -> dict | None:
+    """IngestionJob.scope of a submission, None for a full season run"""
+    scope = {"rounds": sorted(rounds), "sessions": sorted(sessions) if sessions else None} if rounds else None
+    if dry_run:
+        scope = {**(scope or {}), "dry_run": True}
+    if force:
+        scope = {**(scope or {}), "force": True}
+    return scope
+
+class IngestionJobsController(BaseController):
+    def __init__(self, session: Session):
+        super().__init__(session)
+        self.repository = IngestionJobsRepository(session)
+
+    def submit(self, season_year: int | None = None, rounds: list[int] | None = None,
+               sessions: list[str] | None = None, dry_run: bool = False, force: bool = False) -> dict:
+        """
+        Queue an ingestion of a season, or of some of its rounds, and start its worker
+
+        A dry run computes the change set of the ingestion without writing it,
+        the job summary holds it under "dry_run". A forced run ignores the
+        watermarks and any checkpoints of a failed run and reloads everything.
+
+        Single-flight: while a job of the same season is queued or running, its
+        id is returned instead of starting a second run when it covers the same
+        scope (rounds, sessions, dry run and force). The partial unique index
+        uq_ingestionjob_active_season enforces it, so concurrent submissions
+        cannot both create a job.
+
+        Returns:
+            dict: job_id, season, status and whether an active job was reused
+
+        Raises:
+            HTTPException 409 if the active job of the season has another scope
+        """
+        season_year = season_year or datetime.now().year
+        scope = job_scope(rounds, sessions, dry_run, force)
+        job, created = self._create_job(season_year, scope, worker_pid=0)
+        if not created:
+            return self._reuse(job, season_year, scope)
+        try:
+            pid = start_worker(job.id)
+        except Exception as e:
+            self.repository.update_job(job, status="failed", error=str(e), finished_at=datetime.now())
+            raise HTTPException(status_code=500, detail="Could not start ingestion worker") from e
+        self.repository.update_job(job, worker_pid=pid)
+        return {"job_id": job.id, "season": season_year, "status": job.status, "reused": False}
+
+    def _create_job(self, season_year: int, scope: dict | None, worker_pid: int | None) -> tuple[IngestionJob, bool]:
+        """(new job, True), or (the season's active job, False) when there is one"""
+        ensure_ingestion_schema(self.session)
+        dead = self.repository.fail_dead_jobs(season_year)
+        if dead:
+            logging.warning(f"Ingestion jobs {dead} of season {season_year} lost their worker, marked as failed")
+        while True:
+            job = self.repository.create_job(season_year, scope, worker_pid)
+            if job is not None:
+                return job, True
+            active = self.repository.get_active_for_season(season_year)
+            # The active job may have finished between the insert and the read
+            if active is not None:
+                return active, False
+
+    def _reuse(self, active: IngestionJob, season_year: int, scope: dict | None) -> dict:
+        if active.scope != scope:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Ingestion job {active.id} of season {season_year} is {active.status} with scope {active.scope}"
+            )
+        logging.info(f"Ingestion of season {season_year} already active as job {active.id}")
+        return {"job_id": active.id, "season": season_year, "status": active.status, "reused": True}
+
+    def submit_backfill(self, first_season: int, last_season: int, max_parallel: int = BACKFILL_MAX_PARALLEL) -> list[dict]:
+        """
+        Queue one ingestion job per season of a range and start up to max_parallel workers
+
+        Each worker claims the next queued season when it finishes. Seasons keep
+        their own watermarks, so re-submitting a range resumes every season where
+        it stopped, and seasons with an active job are not queued twice.
+
+        Returns:
+            list[dict]: job_id, season, status and reused flag of each season
+        """
+        if first_season > last_season:
+            raise HTTPException(status_code=400, detail="first_season must not be after last_season")
+        jobs = []
+        started = 0
+        for season_year in range(first_season, last_season + 1):
+            reserved = started < max_parallel
+            job, created = self._create_job(season_year, None, worker_pid=0 if reserved else None)
+            if not created:
+                active = job
+                reused = active.scope is None
+                jobs.append({"job_id": active.id, "season": season_year, "status": active.status, "reused": reused})
+                if not reused:
+                    logging.warning(f"Season {season_year} not queued, job {active.id} with scope {active.scope} is active")
+                continue
+            if reserved:
+                self.repository.update_job(job, worker_pid=start_worker(job.id))
+                started += 1
+            jobs.append({"job_id": job.id, "season": season_year, "status": job.status, "reused": False})
+        return jobs
+
+    def get_job(self, job_id: int) -> IngestionJob:
+        job = self.repository.get_by_id(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Ingestion job not found")
+        return job
+
+    def get_recent_jobs(self) -> list[IngestionJob]:
+        return self.repository.get_recent()
+
+    def get_job_report(self, job_id: int) -> dict:
+        """JSON run report of a finished job"""
+        job = self.get_job(job_id)
+        if not job.summary or "report" not in job.summary:
+            raise HTTPException(status_code=404, detail="No run report for this ingestion job")
+        return job.summary["report"]
+
+    def get_metrics(self) -> str:
+        """Prometheus metrics of the latest run of each season"""
+        reports = [
+            job.summary["report"]
+            for job in self.repository.get_latest_finished_by_season()
+            if job.summary and "report" in job.summary
+        ]
+        return render_prometheus(reports, self.repository.count_by_status())
+
+    def cancel(self, job_id: int) -> IngestionJob:
+        """
+        Request cancellation, the worker stops at its next stage or session boundary
+
+        Raises HTTPException 409 if the job already finished
+        """
+        job = self.get_job(job_id)
+        if job.status in ("completed", "failed", "cancelled"):
+            raise HTTPException(status_code=409, detail=f"Ingestion job already {job.status}")
+        status = "cancelled" if job.status == "queued" and not job.worker_pid else "cancelling"
+        return self.repository.update_job(job, cancel_requested=True, status=status)
@@ -0,0 +1,181 @@
+"""
+Instrumentation of ingestion runs.
+
+IngestionMetrics times every stage of a run (a stage lasts until the next one
+is reported), counts the rows each stage produced and wrote, records every
+FastF1 session load with its wall time and cache usage, and collects the
+warnings and exceptions logged while a stage runs. report() is the JSON run
+report stored in the job summary; render_prometheus() turns the latest reports
+into Prometheus text metrics for the API.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+MAX_LOGGED_ERRORS = 50
+
+class _StageLogHandler(logging.Handler):
+    """Attributes WARNING and above records to the stage that is running"""
+    def __init__(self, metrics: "IngestionMetrics"):
+        super().__init__(level=logging.WARNING)
+        self.metrics = metrics
+
+    def emit(self, record: logging.LogRecord):
+        self.metrics.record_error(record.getMessage(), level=record.levelname)
+
+class IngestionMetrics:
+    def __init__(self, season: int):
+        self.season = season
+        self.started_at = datetime.now()
+        self.stages = {}
+        self.tables = {}
+        self.session_loads = []
+        self.errors = []
+        self.error_count = 0
+        self._current = None
+        self._current_started = None
+        self._handler = _StageLogHandler(self)
+
+    def start(self):
+        logging.getLogger().addHandler(self._handler)
+
+    def stop(self):
+        self.finish()
+        logging.getLogger().removeHandler(self._handler)
+
+    def _stage(self, stage: str) -> dict:
+        return self.stages.setdefault(stage, {
+            "seconds": 0.0, "entries": 0, "rows_produced": 0,
+            "rows_inserted": 0, "rows_updated": 0, "errors": 0,
+        })
+
+    def enter(self, stage: str, round_number: int | None = None):
+        """Starts timing a stage, closing the one that was running"""
+        if self._current == (stage, round_number):
+            return
+        self.finish()
+        self._current = (stage, round_number)
+        self._current_started = time.perf_counter()
+        self._stage(stage)["entries"] += 1
+
+    def finish(self):
+        if self._current is None:
+            return
+        self._stage(self._current[0])["seconds"] += time.perf_counter() - self._current_started
+        self._current = None
+
+    def record_rows(self, table: str, produced: int, written: dict):
+        """Rows a stage produced for a table and how many the upsert inserted or updated"""
+        stage = self._current[0] if self._current else "planning"
+        for totals in (self._stage(stage), self.tables.setdefault(table, {"rows_produced": 0, "rows_inserted": 0, "rows_updated": 0})):
+            totals["rows_produced"] += produced
+            totals["rows_inserted"] += written.get("inserted", 0)
+            totals["rows_updated"] += written.get("updated", 0)
+
+    def record_session_load(self, round_number: int, session_type: str, seconds: float | None,
+                            cache: str | None = None, error: str | None = None):
+        self.session_loads.append({
+            "round_number": int(round_number),
+            "session_type": session_type,
+            "seconds": round(seconds, 3) if seconds is not None else None,
+            "cache": cache,
+            "error": error,
+        })
+
+    def record_error(self, message: str, level: str = "ERROR"):
+        stage, round_number = self._current or ("planning", None)
+        self._stage(stage)["errors"] += 1
+        self.error_count += 1
+        if len(self.errors) < MAX_LOGGED_ERRORS:
+            self.errors.append({"stage": stage, "round_number": round_number, "level": level, "message": message})
+
+    def report(self) -> dict:
+        loads = [load for load in self.session_loads if load["seconds"] is not None]
+        cache = {}
+        for load in self.session_loads:
+            cache[load["cache"] or "unknown"] = cache.get(load["cache"] or "unknown", 0) + 1
+        return {
+            "season": self.season,
+            "started_at": self.started_at.isoformat(),
+            "stages": {
+                stage: {**totals, "seconds": round(totals["seconds"], 3)}
+                for stage, totals in self.stages.items()
+            },
+            "tables": self.tables,
+            "session_loads": {
+                "count": len(self.session_loads),
+                "seconds": round(sum(load["seconds"] for load in loads), 3),
+                "slowest": sorted(loads, key=lambda load: load["seconds"], reverse=True)[:5],
+                "cache": cache,
+                "failed": [load for load in self.session_loads if load["error"]],
+                "loads": self.session_loads,
+            },
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def write_report(self, directory: str | None = None) -> str | None:
+        """Writes the run report as JSON to INGESTION_REPORT_DIR, if configured"""
+        directory = directory or os.environ.get("INGESTION_REPORT_DIR")
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"ingestion_{self.season}_{self.started_at:%Y%m%dT%H%M%S}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        return path
+
+def _labels(**labels) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+def render_prometheus(reports: list[dict], job_counts: dict | None = None) -> str:
+    """
+    Prometheus text exposition of the latest run report of each season.
+
+    Values are gauges of that run, so a new run replaces the previous one.
+    """
+    metrics = {
+        "f1_ingestion_stage_seconds": ("gauge", "Wall time of an ingestion stage in the latest run"),
+        "f1_ingestion_rows_produced": ("gauge", "Rows produced for a table in the latest run"),
+        "f1_ingestion_rows_written": ("gauge", "Rows written to a table in the latest run"),
+        "f1_ingestion_stage_errors": ("gauge", "Warnings and exceptions logged by an ingestion stage in the latest run"),
+        "f1_ingestion_session_loads": ("gauge", "FastF1 session loads of the latest run by cache usage"),
+        "f1_ingestion_session_load_seconds": ("gauge", "Total FastF1 session load time of the latest run"),
+        "f1_ingestion_last_run_timestamp_seconds": ("gauge", "Start time of the latest run"),
+        "f1_ingestion_jobs": ("gauge", "Ingestion jobs by status"),
+    }
+    samples = {name: [] for name in metrics}
+    for report in reports:
+        season = report["season"]
+        for stage, totals in report.get("stages", {}).items():
+            samples["f1_ingestion_stage_seconds"].append((_labels(season=season, stage=stage), totals["seconds"]))
+            samples["f1_ingestion_stage_errors"].append((_labels(season=season, stage=stage), totals["errors"]))
+        for table, totals in report.get("tables", {}).items():
+            samples["f1_ingestion_rows_produced"].append((_labels(season=season, table=table), totals["rows_produced"]))
+            for kind in ("inserted", "updated"):
+                samples["f1_ingestion_rows_written"].append(
+                    (_labels(season=season, table=table, kind=kind), totals[f"rows_{kind}"])
+                )
+        loads = report.get("session_loads", {})
+        for cache, count in loads.get("cache", {}).items():
+            samples["f1_ingestion_session_loads"].append((_labels(season=season, cache=cache), count))
+        samples["f1_ingestion_session_load_seconds"].append((_labels(season=season), loads.get("seconds", 0)))
+        started_at = datetime.fromisoformat(report["started_at"]).timestamp()
+        samples["f1_ingestion_last_run_timestamp_seconds"].append((_labels(season=season), started_at))
+    for status, count in (job_counts or {}).items():
+        samples["f1_ingestion_jobs"].append((_labels(status=status), count))
+
+    lines = []
+    for name, (kind, help_text) in metrics.items():
+        if not samples[name]:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{labels} {value}" for labels, value in samples[name])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,316 @@
+"""
+Post-session auto-ingestion scheduler.
+
+Rounds around the current date are picked from Events.date_start, and the start
+time of each of their sessions from the FastF1 schedule (Session{n}DateUtc).
+A session becomes due INGESTION_SCHEDULER_DELAY_MINUTES after its expected end;
+the scheduler then queues a targeted ingestion job for it and, while the
+session still has no stored results, retries with exponential backoff until
+INGESTION_SCHEDULER_MAX_ATTEMPTS is reached.
+
+It runs inside the API when INGESTION_SCHEDULER=1, or as a sidecar:
+
+    python -m f1_api.controllers.ingestion_scheduler
+
+Every API worker and sidecar may start one, but only the process holding the
+scheduler's PostgreSQL advisory lock ticks; the others wait to take over.
+A season busy with a job of another scope defers the session without using
+one of its attempts.
+
+``ff1_client``, ``clock``, ``submit`` and ``lock`` are injectable: an
+ExtractReplayClient (with INGESTION_SOURCE=extracts for the jobs) and a clock
+set just after a recorded session drive a full cycle offline.
+"""
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlmodel import Session, select
+from f1_api.config.sql_init import engine
+from f1_api.controllers.ingestion_jobs_controller import IngestionJobsController
+from f1_api.data_sources.ff1_client import FastF1Client
+from f1_api.models.f1_schemas import Events
+from f1_api.models.repositories.ingestion_jobs_repository import IngestionJobsRepository
+from f1_api.models.repositories.ingestion_state_repository import IngestionStateRepository
+
+SESSION_DURATIONS = {
+    "Race": timedelta(hours=2),
+    "Sprint": timedelta(hours=1),
+}
+DEFAULT_SESSION_DURATION = timedelta(hours=1)
+# Rounds whose Events.date_start falls in this window around now are scheduled
+LOOKBACK = timedelta(days=7)
+LOOKAHEAD = timedelta(days=14)
+MAX_OUTCOMES = 100
+FINISHED_JOB_STATUSES = ("completed", "failed", "cancelled")
+# First key of the advisory lock held by the one process that runs the scheduler
+SCHEDULER_LOCK_NAMESPACE = 8002
+
+def utc_now() -> datetime:
+    """Naive UTC now, comparable with the schedule's Session{n}DateUtc"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class SchedulerLock:
+    """Session-level advisory lock kept on its own autocommit connection while this process schedules"""
+    def __init__(self, engine, namespace: int = SCHEDULER_LOCK_NAMESPACE):
+        self.engine = engine
+        self.namespace = namespace
+        self._connection = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    def acquire(self) -> bool:
+        """True while this process holds the lock, tries to take it otherwise"""
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                return True
+            except Exception as e:
+                logging.warning(f"Ingestion scheduler lost its lock connection: {e}")
+                self.release()
+        connection = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:namespace, 0)"), {"namespace": self.namespace}
+        ).scalar()
+        if acquired:
+            self._connection = connection
+        else:
+            connection.close()
+        return bool(acquired)
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:namespace, 0)"), {"namespace": self.namespace})
+        except Exception:
+            pass
+        self._connection.close()
+        self._connection = None
+
+class IngestionScheduler:
+    def __init__(self, session_factory, ff1_client=FastF1Client, clock=utc_now, submit=None, lock=None,
+                 delay: timedelta | None = None, retry_base: timedelta | None = None,
+                 max_attempts: int | None = None, poll_seconds: int | None = None):
+        self.session_factory = session_factory
+        self.ff1_client = ff1_client
+        self.clock = clock
+        self.submit = submit or self._submit_job
+        self.lock = lock or SchedulerLock(engine)
+        self.delay = delay or timedelta(minutes=int(os.environ.get("INGESTION_SCHEDULER_DELAY_MINUTES", 30)))
+        self.retry_base = retry_base or timedelta(minutes=int(os.environ.get("INGESTION_SCHEDULER_RETRY_MINUTES", 10)))
+        self.max_attempts = max_attempts or int(os.environ.get("INGESTION_SCHEDULER_MAX_ATTEMPTS", 6))
+        self.poll_seconds = poll_seconds or int(os.environ.get("INGESTION_SCHEDULER_POLL_SECONDS", 60))
+        self.tasks = {}
+        self.outcomes = deque(maxlen=MAX_OUTCOMES)
+        self._schedules = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _schedule(self, season: int):
+        """FastF1 schedule of a season, fetched again once a day"""
+        key = (season, self.clock().date())
+        if key not in self._schedules:
+            self._schedules = {k: v for k, v in self._schedules.items() if k[0] != season}
+            self._schedules[key] = self.ff1_client.get_event_schedule(season)
+        return self._schedules[key]
+
+    def _event_rounds(self, session: Session, now: datetime) -> dict[int, set[int]] | None:
+        """season -> rounds starting around now from Events.date_start, None when no event is stored"""
+        events = session.exec(
+            select(Events.season_id, Events.round_number)
+            .where(Events.date_start >= now - LOOKBACK, Events.date_start <= now + LOOKAHEAD)
+        ).all()
+        if not events:
+            has_events = session.exec(select(Events.round_number).where(Events.season_id == now.year)).first()
+            return None if has_events is None else {}
+        rounds = {}
+        for season, round_number in events:
+            rounds.setdefault(season, set()).add(round_number)
+        return rounds
+
+    def _session_tasks(self, season: int, rounds: set[int] | None) -> list[dict]:
+        schedule = self._schedule(season)
+        if schedule is None:
+            return []
+        tasks = []
+        for _, event in schedule.iterrows():
+            round_number = int(event["RoundNumber"])
+            if round_number == 0 or event["EventFormat"] == "testing":
+                continue
+            if rounds is not None and round_number not in rounds:
+                continue
+            for session_number in range(1, 6):
+                session_type = event[f"Session{session_number}"]
+                starts_at = event.get(f"Session{session_number}DateUtc")
+                if not session_type or starts_at is None or str(starts_at) == "NaT":
+                    continue
+                ends_at = starts_at.to_pydatetime() + SESSION_DURATIONS.get(session_type, DEFAULT_SESSION_DURATION)
+                tasks.append({
+                    "season": season,
+                    "round_number": round_number,
+                    "session_number": session_number,
+                    "session_type": session_type,
+                    "event_name": event["EventName"],
+                    "ends_at": ends_at,
+                    "due_at": ends_at + self.delay,
+                })
+        return tasks
+
+    def refresh(self, session: Session):
+        """Adds the sessions of the rounds around now to the task list"""
+        now = self.clock()
+        rounds_by_season = self._event_rounds(session, now)
+        if rounds_by_season is None:
+            # Nothing ingested yet, the current season's schedule alone decides
+            rounds_by_season = {now.year: None}
+        for season, rounds in rounds_by_season.items():
+            for task in self._session_tasks(season, rounds):
+                key = (task["season"], task["round_number"], task["session_number"])
+                if key not in self.tasks:
+                    self.tasks[key] = {**task, "status": "scheduled", "attempts": 0,
+                                       "next_attempt_at": task["due_at"], "job_id": None}
+
+    def tick(self) -> list[dict]:
+        """Checks the tasks once: closes the ingested ones, retries the empty ones, queues the due ones"""
+        now = self.clock()
+        with self.session_factory() as session:
+            self.refresh(session)
+            ingested = {}
+            for key, task in sorted(self.tasks.items()):
+                if task["status"] in ("ingested", "gave_up"):
+                    continue
+                season = task["season"]
+                if season not in ingested:
+                    ingested[season] = IngestionStateRepository(session, season).get_ingested_sessions()
+                if (task["round_number"], task["session_number"]) in ingested[season]:
+                    task["status"] = "ingested"
+                    self._outcome(task, "ingested")
+                    continue
+                if task["status"] == "submitted":
+                    job = IngestionJobsRepository(session).get_by_id(task["job_id"]) if task["job_id"] else None
+                    if job is not None and job.status not in FINISHED_JOB_STATUSES:
+                        continue
+                    if task["attempts"] >= self.max_attempts:
+                        task["status"] = "gave_up"
+                        self._outcome(task, "gave_up")
+                        continue
+                    # Results still empty, back off before asking again
+                    task["status"] = "waiting"
+                    task["next_attempt_at"] = now + self.retry_base * 2 ** (task["attempts"] - 1)
+                    self._outcome(task, f"no results yet, retry at {task['next_attempt_at']:%Y-%m-%d %H:%M} UTC")
+                    continue
+                if now < task["next_attempt_at"]:
+                    continue
+                try:
+                    job_id = self.submit(session, task)
+                    if job_id is None:
+                        # Another job holds the season, ask again next tick without spending an attempt
+                        if task["status"] != "deferred":
+                            task["status"] = "deferred"
+                            self._outcome(task, "deferred, the season has an active job of another scope")
+                        continue
+                    task["job_id"] = job_id
+                    task["attempts"] += 1
+                    task["status"] = "submitted"
+                    self._outcome(task, "submitted")
+                except Exception as e:
+                    task["attempts"] += 1
+                    task["status"] = "waiting"
+                    task["next_attempt_at"] = now + self.retry_base * 2 ** (task["attempts"] - 1)
+                    self._outcome(task, f"submit failed: {e}")
+                    logging.warning(f"Scheduled ingestion of {task['session_type']} at {task['event_name']} failed: {e}")
+        return self.upcoming()
+
+    def _submit_job(self, session: Session, task: dict) -> int | None:
+        """Id of the session's ingestion job, None while the season runs a job of another scope"""
+        controller = IngestionJobsController(session)
+        try:
+            job = controller.submit(task["season"], rounds=[task["round_number"]], sessions=[task["session_type"]])
+        except HTTPException as e:
+            if e.status_code == 409:
+                return None
+            raise
+        session.commit()
+        return job["job_id"]
+
+    def _outcome(self, task: dict, result: str):
+        self.outcomes.append({
+            "at": self.clock(),
+            "season": task["season"],
+            "round_number": task["round_number"],
+            "session_type": task["session_type"],
+            "attempt": task["attempts"],
+            "job_id": task["job_id"],
+            "result": result,
+        })
+
+    def upcoming(self) -> list[dict]:
+        """Tasks that are not finished yet, soonest first"""
+        pending = [task for task in self.tasks.values() if task["status"] not in ("ingested", "gave_up")]
+        return sorted(pending, key=lambda task: task["next_attempt_at"])
+
+    @property
+    def status(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "leader": self.lock.held,
+            "now": self.clock(),
+            "upcoming": self.upcoming(),
+            "outcomes": list(reversed(self.outcomes)),
+        }
+
+    def run_once(self) -> bool:
+        """Ticks when this process holds the scheduler lock, returns whether it did"""
+        try:
+            if not self.lock.acquire():
+                return False
+            self.tick()
+            return True
+        except Exception as e:
+            logging.warning(f"Ingestion scheduler tick failed: {e}")
+            return False
+
+    def run_forever(self):
+        try:
+            while not self._stop.is_set():
+                self.run_once()
+                self._stop.wait(self.poll_seconds)
+        finally:
+            self.lock.release()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="ingestion-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+_scheduler = None
+
+def get_scheduler() -> IngestionScheduler:
+    """Scheduler of this process, created on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = IngestionScheduler(lambda: Session(engine))
+    return _scheduler
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    FastF1Client.enable_cache()
+    scheduler = get_scheduler()
+    logging.info(f"Ingestion scheduler polling every {scheduler.poll_seconds}s")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Ingestion worker process.
+
+Each submitted IngestionJob runs update_db in its own process, so the minutes of
+FastF1 and DB work never block the API event loop. The worker reports progress
+on the job row, stops between stages when cancellation is requested and holds a
+PostgreSQL advisory lock per season so two runs of the same season never overlap;
+a running job whose lock is gone is treated as dead by the next submission.
+When its job is done a worker claims the next queued job, which is how a
+multi-season backfill runs a bounded number of seasons in parallel.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from datetime import datetime
+from sqlalchemy import text
+from sqlmodel import Session
+from f1_api.config.sql_init import engine
+from f1_api.controllers.database_controller import IngestionCancelled, update_db
+from f1_api.data_sources.ff1_client import FastF1Client
+from f1_api.models.repositories.ingestion_jobs_repository import INGESTION_LOCK_NAMESPACE, IngestionJobsRepository
+
+def start_worker(job_id: int) -> int:
+    """Spawns the worker process of a job and returns its pid"""
+    process = multiprocessing.get_context("spawn").Process(
+        target=run_worker, args=(job_id,), daemon=False
+    )
+    process.start()
+    return process.pid
+
+def run_worker(job_id: int | None):
+    """Worker process entry point, runs its job and then the queued ones it can claim"""
+    FastF1Client.enable_cache()
+    while job_id is not None:
+        run_ingestion_job(job_id)
+        with Session(engine) as session:
+            job_id = IngestionJobsRepository(session).claim_next_queued(os.getpid())
+
+def run_ingestion_job(job_id: int):
+    """Runs a single ingestion job, recording its progress and outcome on the job row"""
+    # Autocommit: a transaction left open by the lock query would sit idle for the
+    # whole run and idle_in_transaction_session_timeout could kill it, dropping the lock
+    lock_connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    with Session(engine) as session, lock_connection:
+        repository = IngestionJobsRepository(session)
+        job = repository.get_by_id(job_id)
+        if job is None:
+            logging.warning(f"Ingestion job {job_id} not found")
+            return
+        if job.cancel_requested:
+            repository.update_job(job, status="cancelled", finished_at=datetime.now())
+            return
+        acquired = lock_connection.execute(
+            text("SELECT pg_try_advisory_lock(:namespace, :season)"),
+            {"namespace": INGESTION_LOCK_NAMESPACE, "season": job.season_id}
+        ).scalar()
+        if not acquired:
+            repository.update_job(job, status="failed", finished_at=datetime.now(),
+                                  error=f"Another ingestion of season {job.season_id} is running")
+            return
+        try:
+            repository.update_job(job, status="running", worker_pid=os.getpid())
+
+            def progress(stage: str, round_number: int | None = None):
+                session.refresh(job)
+                if job.cancel_requested:
+                    raise IngestionCancelled(f"Job {job_id} cancelled during {stage}")
+                repository.update_job(job, stage=stage, round_number=round_number)
+
+            scope = job.scope or {}
+            dry_run = bool(scope.get("dry_run"))
+            report_dir = os.environ.get("INGESTION_REPORT_DIR")
+            dry_run_file = os.path.join(report_dir, f"dry_run_{job.season_id}_{job.id}.json") if dry_run and report_dir else None
+            summary = asyncio.run(update_db(engine, job.season_id, progress,
+                                            rounds=scope.get("rounds"), sessions=scope.get("sessions"),
+                                            dry_run=dry_run, dry_run_file=dry_run_file,
+                                            force=bool(scope.get("force"))))
+            status = "failed" if "error" in summary else "completed"
+            repository.update_job(job, status=status, stage="done", summary=summary,
+                                  error=summary.get("error"), finished_at=datetime.now())
+        except IngestionCancelled as e:
+            logging.info(str(e))
+            repository.update_job(job, status="cancelled", finished_at=datetime.now())
+        except Exception as e:
+            logging.warning(f"Ingestion job {job_id} failed: {e}")
+            session.rollback()
+            repository.update_job(job, status="failed", error=str(e), finished_at=datetime.now())
+        finally:
+            lock_connection.execute(
+                text("SELECT pg_advisory_unlock(:namespace, :season)"),
+                {"namespace": INGESTION_LOCK_NAMESPACE, "season": job.season_id}
+            )
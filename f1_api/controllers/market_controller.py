@@ -29,7 +29,6 @@ LOCK_DAYS_AFTER_PURCHASE = 7  # Days a driver is locked after purchase/buyout
 SELL_TO_MARKET_REFUND = 0.8  # 80% refund when quick selling
 MAX_BUYOUTS_PER_USER_PAIR_PER_SEASON = 2  # Max buyouts between two users
 MAX_DRIVERS_PER_USER = 4  # 3 lineup + 1 reserve
-CURRENT_SEASON = 2025  # TODO: Get dynamically
 INITIAL_BUDGET = 100_000_000  # 100M
 
 
@@ -46,16 +45,17 @@ class MarketController(BaseController):
     - Emergency driver assignment
     """
     
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, season: int | None = None):
         super().__init__(session)
+        self.season = season or datetime.now().year
         self.ownership_repo = DriverOwnershipRepository(session)
         self.transactions_repo = MarketTransactionsRepository(session)
         self.buyout_repo = BuyoutClauseHistoryRepository(session)
         self.user_teams_repo = UserTeamsRepository(session)
         self.users_repo = UserRepository(session)
-        self.results_repo = SessionResultsRepository(CURRENT_SEASON, session)
+        self.results_repo = SessionResultsRepository(self.season, session)
         self.drivers_utility = DriversUtility()
-        self.drivers_repo = DriversRepository(self.session, CURRENT_SEASON)
+        self.drivers_repo = DriversRepository(self.session, self.season)
         self.link_repo = DriverTeamLinkRepository(self.session)
     
     def _enrich_drivers_with_stats(self, drivers: list) -> list:
@@ -64,29 +64,20 @@ class MarketController(BaseController):
         Reuses logic from DriversController to ensure consistency.
         """
         try:
-            # Get driver results data
-            database_data = self.results_repo.get_driver_results()
-            max_round = database_data["max_round"]
-            sprint_rounds = database_data["sprint_rounds"]
-            all_results = database_data["all_results"]
-            
-            # Calculate stats
-            stats = self.drivers_utility.get_driver_stats(all_results)
-            points_map = {r.driver_id: r.total_points for r in database_data["results"]}
-            available_points = 25 * max_round + len(sprint_rounds) * 8
+            # One aggregated row per driver, computed by Postgres
+            season_stats = self.results_repo.get_driver_stats()
+            stats = season_stats["stats"]
+            available_points = 25 * season_stats["max_round"] + season_stats["sprint_rounds"] * 8
             
             # Enrich each driver
             enriched_drivers = []
             for driver in drivers:
                 driver_stats = stats.get(driver.id, {})
-                finishes = driver_stats.get("finish_positions", None)
-                grids = driver_stats.get("grid_positions", None)
                 pole_victories = driver_stats.get("pole_victories", None)
                 poles = driver_stats.get("poles", 0)
-                points = points_map.get(driver.id, 0)
+                points = driver_stats.get("points", 0)
                 podiums = driver_stats.get("podiums", 0)
                 victories = driver_stats.get("victories", 0)
-                overtakes = driver_stats.get("overtakes", 0)
                 
                 enriched_driver = {
                     **driver.model_dump(),
@@ -101,11 +92,11 @@ class MarketController(BaseController):
                         "sprint_poles": driver_stats.get("sprint_poles", 0)
                     },
                     "fantasy_stats": {
-                        "avg_finish": round(sum(finishes) / len(finishes), 1) if finishes else 0,
-                        "avg_grid_position": round(sum(grids) / len(grids), 1) if grids else 0,
+                        "avg_finish": self.drivers_utility.average(driver_stats, "finish"),
+                        "avg_grid_position": self.drivers_utility.average(driver_stats, "grid"),
                         "pole_win_conversion": round(((pole_victories * 100) / poles), 1) if poles else 0,
                         "price": 10_000_000 + (int(points) * 10_000) + (podiums * 50_000) + (victories * 100_000),
-                        "overtake_efficiency": round(sum(overtakes) / len(overtakes), 1) if overtakes else 0,
+                        "overtake_efficiency": self.drivers_utility.average(driver_stats, "overtake"),
                         "available_points_percentatge": round(points * 100 / available_points, 1) if available_points > 0 else 0,
                     }
                 }
@@ -182,8 +173,8 @@ class MarketController(BaseController):
             raise HTTPException(500, "Not enough free drivers available to initialize team")
         
         # Get driver points using results repository
-        database_data = self.results_repo.get_driver_results()
-        points_map = {r.driver_id: r.total_points for r in database_data["results"]}
+        stats = self.results_repo.get_driver_stats()["stats"]
+        points_map = {driver_id: driver_stats["points"] for driver_id, driver_stats in stats.items()}
         
         # Create list of (driver_id, points) for free drivers
         drivers_with_points = []
@@ -763,7 +754,7 @@ class MarketController(BaseController):
         
         # Check buyout limit
         buyout_count = self.buyout_repo.count_buyouts_between_users(
-            buyer_id, victim_id, league_id, CURRENT_SEASON
+            buyer_id, victim_id, league_id, self.season
         )
         if buyout_count >= MAX_BUYOUTS_PER_USER_PAIR_PER_SEASON:
             raise HTTPException(403, {
@@ -882,7 +873,7 @@ class MarketController(BaseController):
             driver_id=driver_id,
             buyout_price=buyout_price,
             buyout_date=datetime.now(),
-            season_year=CURRENT_SEASON
+            season_year=self.season
         )
         self.buyout_repo.create(buyout_history)
         
@@ -985,7 +976,7 @@ class MarketController(BaseController):
         enriched_drivers = self._enrich_drivers_with_stats(drivers)
         
         # Get team names for current season
-        team_map = self.link_repo.get_driver_team_map(CURRENT_SEASON)
+        team_map = self.link_repo.get_driver_team_map(self.season)
         
         # Get owner names if needed
         owners = {}
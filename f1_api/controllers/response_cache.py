@@ -0,0 +1,160 @@
+"""
+In-process cache of the standings responses.
+
+Entries are keyed by (endpoint, season, data_version). Ingestion bumps the
+DataVersion of a season once a snapshot (a round when streaming) is fully
+written, in the commit that records its watermarks after the stage commits.
+A response cached between those commits may mix old and new rows, but it is
+keyed on the old version: the bump makes it miss and the old entries age out
+of the LRU. The version
+itself is read at most once every RESPONSE_CACHE_VERSION_SECONDS, which lets
+a hit skip the database entirely; that interval bounds how long a response can
+lag behind a finished ingestion.
+
+Only ingested data may be cached: the version does not move on market writes,
+so the drivers payload leaves out the market columns of Drivers (MARKET_FIELDS).
+
+Concurrent misses on the same key are single-flight: one request computes the
+response while the others wait for it instead of recomputing it.
+
+RESPONSE_CACHE=0 disables it, RESPONSE_CACHE_SIZE and RESPONSE_CACHE_TTL_SECONDS
+bound the entries.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlmodel import Session
+from f1_api.models.repositories.data_version_repository import DataVersionRepository
+
+class _Flight:
+    """A computation in progress, shared by the requests that missed the same key"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    def __init__(self, max_entries: int | None = None, ttl_seconds: float | None = None,
+                 version_seconds: float | None = None, enabled: bool | None = None, clock=time.monotonic):
+        self.max_entries = max_entries or int(os.environ.get("RESPONSE_CACHE_SIZE", 64))
+        self.ttl_seconds = ttl_seconds or float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", 300))
+        self.version_seconds = version_seconds if version_seconds is not None else float(
+            os.environ.get("RESPONSE_CACHE_VERSION_SECONDS", 5)
+        )
+        self.enabled = enabled if enabled is not None else os.environ.get("RESPONSE_CACHE", "1") == "1"
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0, "errors": 0}
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._version = None
+        self._version_read_at = None
+        self._lock = threading.Lock()
+
+    def data_version(self, session: Session) -> int:
+        """Latest DataVersion, read again once the previous read is older than version_seconds"""
+        now = self.clock()
+        if self._version is None or now - self._version_read_at >= self.version_seconds:
+            self._version = DataVersionRepository(session).current()
+            self._version_read_at = now
+        return self._version
+
+    def get(self, session: Session, endpoint: str, season: int, compute):
+        """Cached response of an endpoint, compute() builds it on a miss"""
+        if not self.enabled:
+            return compute()
+        try:
+            version = self.data_version(session)
+        except Exception as e:
+            logging.warning(f"Response cache bypassed for {endpoint}, data version unavailable: {e}")
+            session.rollback()
+            return compute()
+        key = (endpoint, season, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.clock() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self.stats["expirations"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = compute()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                # Controllers return [] when they fail, that is not worth keeping
+                if flight.error is None and flight.value:
+                    self._store(key, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def _store(self, key: tuple, value):
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    @property
+    def status(self) -> dict:
+        with self._lock:
+            requests = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+            return {
+                "enabled": self.enabled,
+                "data_version": self._version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                **self.stats,
+                "hit_ratio": round(self.stats["hits"] / requests, 3) if requests else None,
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text metrics of the cache, appended to /admin/metrics"""
+        lines = []
+        for name, kind, help_text in (
+            ("hits", "counter", "Responses served from the cache"),
+            ("misses", "counter", "Responses computed after a cache miss"),
+            ("coalesced", "counter", "Requests that waited for a response another request was computing"),
+            ("evictions", "counter", "Entries dropped by the LRU bound"),
+            ("expirations", "counter", "Entries dropped by the TTL"),
+        ):
+            lines.append(f"# HELP f1_response_cache_{name}_total {help_text}")
+            lines.append(f"# TYPE f1_response_cache_{name}_total {kind}")
+            lines.append(f"f1_response_cache_{name}_total {self.stats[name]}")
+        lines.append("# HELP f1_response_cache_entries Responses currently cached")
+        lines.append("# TYPE f1_response_cache_entries gauge")
+        lines.append(f"f1_response_cache_entries {len(self._entries)}")
+        return "\n".join(lines) + "\n"
+
+response_cache = ResponseCache()
+
+def cached_response(session: Session, endpoint: str, season: int, compute):
+    """Function wrapper over the process-wide cache"""
+    return response_cache.get(session, endpoint, season, compute)
@@ -1,19 +1,69 @@
 """Season Context Controller - Encapsulates season data loading logic"""
+import logging
+import time
+from collections import Counter
 from datetime import datetime
-from sqlmodel import Session, select
+from sqlmodel import Session
 from f1_api.data_sources.ff1_client import FastF1Client
-from f1_api.models.f1_schemas import SessionResult
+from f1_api.data_sources.session_lookups import SessionLookups
+from f1_api.models.repositories.ingestion_state_repository import IngestionStateRepository
+from f1_api.models.repositories.lookup_registry import IngestionLookupRegistry
 
 class SeasonContextController:
-    """Controller to manage season context (schedule, session_map, registered rounds)"""
-    def __init__(self, session: Session, ff1_client = FastF1Client):
+    """
+    Controller to manage season context (schedule, session_map, registered rounds)
+
+    One instance is the season snapshot of an ingestion run: every stage reads the
+    schedule and the FastF1 sessions from it, so each session is loaded once per run.
+    ``rounds`` / ``session_names`` scope the snapshot to a slice of the season; a
+    scoped snapshot reloads its sessions even if they were already ingested, as
+    does a ``force`` snapshot.
+    for_round() derives a one-round snapshot for streaming runs, which keeps the
+    parent's watermarks and counters and is released once the round is written.
+    """
+    def __init__(self, session: Session, ff1_client = FastF1Client, year: int | None = None, progress=None,
+                 rounds: set[int] | None = None, session_names: list[str] | None = None, metrics=None,
+                 force: bool = False):
         self.session = session
         self.ff1_client = ff1_client
-        self.year = datetime.now().year
+        self.year = year or datetime.now().year
+        self.progress = progress
+        self.rounds = set(rounds) if rounds else None
+        self.session_names = session_names
+        self.metrics = metrics
+        self.force = force
         self._schedule = None
         self._registered_rounds = None
         self._session_map = None
         self._session_types_by_rn = None
+        self._extra_sessions = {}
+        self._lookups = None
+        self._session_lookups = {}
+        self.load_counts = Counter()
+        self.counters = Counter()
+    def for_round(self, round_number: int) -> "SeasonContextController":
+        """Snapshot of one round sharing the schedule, watermarks, id lookups and counters of this one"""
+        child = SeasonContextController(self.session, self.ff1_client, self.year, self.progress,
+                                        rounds={round_number}, session_names=self.session_names,
+                                        metrics=self.metrics)
+        child._schedule = self.schedule
+        child._registered_rounds = self.registered_rounds
+        child._lookups = self.lookups
+        child.load_counts = self.load_counts
+        child.counters = self.counters
+        return child
+    def release(self):
+        """Drops the loaded FastF1 sessions and their lookups, counters are kept"""
+        self._session_map = {}
+        self._extra_sessions = {}
+        self._session_lookups = {}
+    @property
+    def pending_sessions(self) -> list[tuple]:
+        """(round, session_number, event_name, session_type) this snapshot should load"""
+        return FastF1Client._pending_sessions(self.schedule, self.registered_rounds, self.rounds, self.session_names)
+    @property
+    def pending_rounds(self) -> list[int]:
+        return sorted({round_number for round_number, _, _, _ in self.pending_sessions})
     @property
     def schedule(self):
         """Lazy load schedule"""
@@ -25,6 +75,8 @@ class SeasonContextController:
         """Lazy load events data by round number"""
         events = []
         for _,e in self.schedule.iloc[1:].iterrows():
+            if not self._in_scope(e["RoundNumber"]):
+                continue
             event = {}
             event["round_number"] = e["RoundNumber"]
             event["event_name"] = e["EventName"]
@@ -35,16 +87,29 @@ class SeasonContextController:
             events.append(event)
         return events
     @property
+    def lookups(self) -> IngestionLookupRegistry:
+        """Driver and team id identity maps shared by every stage of the run"""
+        if self._lookups is None:
+            self._lookups = IngestionLookupRegistry(self.session, self.year)
+        return self._lookups
+    @property
     def registered_rounds(self):
-        """Lazy load registered rounds"""
+        """Lazy load registered (round, session) pairs from the ingestion watermarks"""
+        if self._registered_rounds is None and (self.rounds is not None or self.force):
+            self._registered_rounds = set()
         if self._registered_rounds is None:
-            self._registered_rounds = set(self.session.exec(select(SessionResult.round_number, SessionResult.session_number)).all())
+            self._registered_rounds = IngestionStateRepository(self.session, self.year).get_ingested_sessions()
         return self._registered_rounds
     @property
     def session_map(self):
         """Lazy load session map"""
         if self._session_map is None:
-            self._session_map = self.ff1_client.get_session_map(self.year, self.registered_rounds)
+            on_loaded = (lambda rn, _: self.progress("loading_sessions", rn)) if self.progress else None
+            scope = {"rounds": self.rounds, "session_names": self.session_names} if self.rounds is not None else {}
+            on_load = self.metrics.record_session_load if self.metrics else None
+            self._session_map = self.ff1_client.get_session_map(self.year, self.registered_rounds, progress=on_loaded,
+                                                                on_load=on_load, **scope)
+            self.load_counts.update(self._session_map.keys())
         return self._session_map
     @property
     def session_types_by_rn(self):
@@ -53,6 +118,8 @@ class SeasonContextController:
             self._session_types_by_rn = {}
             for _,event in self.schedule.iloc[1:].iterrows():
                 round_number = event["RoundNumber"]
+                if not self._in_scope(round_number):
+                    continue
                 sessions = [
                     event["Session1"],
                     event["Session2"],
@@ -62,22 +129,82 @@ class SeasonContextController:
                 ]
                 self._session_types_by_rn[round_number] = sessions
         return self._session_types_by_rn
+    def _in_scope(self, round_number: int) -> bool:
+        return self.rounds is None or round_number in self.rounds
+    def event_name(self, round_number: int) -> str | None:
+        """Event name of a round from the schedule"""
+        event_row = self.schedule[self.schedule["RoundNumber"] == round_number]
+        if event_row.empty:
+            return None
+        return event_row["EventName"].values[0]
+    def get_session(self, round_number: int, session_type: str, laps: bool = True):
+        """
+        Session of the snapshot, loading it on demand if it is not in the session map
+
+        Sessions loaded here are memoized, so asking again for the same
+        (round_number, session_type) never hits FastF1 twice within the run.
+        """
+        key = (round_number, session_type)
+        if self._session_map is not None and key in self._session_map:
+            return self._session_map[key]
+        if key not in self._extra_sessions:
+            name = self.event_name(round_number)
+            if name is None:
+                logging.warning(f"No event found for round {round_number}")
+                return None
+            start = time.perf_counter()
+            try:
+                self._extra_sessions[key] = self.ff1_client.load_session(self.year, name, session_type, laps=laps)
+            except Exception as e:
+                if self.metrics:
+                    self.metrics.record_session_load(round_number, session_type, None, error=f"{type(e).__name__}: {e}")
+                raise
+            if self.metrics:
+                self.metrics.record_session_load(round_number, session_type, time.perf_counter() - start)
+            self.load_counts[key] += 1
+        return self._extra_sessions[key]
+    @property
+    def loaded_sessions(self) -> list[tuple[int, int]]:
+        """(round_number, session_number) pairs present in the session map"""
+        return [
+            (round_number, session_number)
+            for round_number, session_types in self.session_types_by_rn.items()
+            for session_number, session_type in enumerate(session_types, start=1)
+            if (round_number, session_type) in self.session_map
+        ]
+    @property
+    def summary(self) -> dict:
+        """FastF1 load counters of the snapshot, max_loads_per_session is 1 when nothing was reloaded"""
+        return {
+            "season": self.year,
+            "sessions_loaded": len(self.load_counts),
+            "session_loads": sum(self.load_counts.values()),
+            "max_loads_per_session": max(self.load_counts.values(), default=0),
+            "session_lookups_built": self.counters["session_lookups_built"],
+        }
+    def session_lookups(self, f1_session) -> SessionLookups:
+        """Plotting lookups of a session, built on first use and kept for the run"""
+        key = id(f1_session)
+        if key not in self._session_lookups:
+            self._session_lookups[key] = (f1_session, SessionLookups.build(f1_session, self.ff1_client))
+            self.counters["session_lookups_built"] += 1
+        return self._session_lookups[key][1]
     def get_session_team_name_by_driver(self,driver,session):
-        return self.ff1_client.get_session_team_name_by_driver(driver,session)
+        return self.session_lookups(session).team_name_by_driver(driver)
     def get_session_teams(self, race):
-        return self.ff1_client.get_session_teams(race)
+        return list(self.session_lookups(race).teams)
     def get_drivers_by_team(self, team, race):
-        return self.ff1_client.get_drivers_by_team(team, race)
+        return list(self.session_lookups(race).drivers_by_team.get(team, []))
     def get_drivers_by_session(self, session):
-        return self.ff1_client.get_drivers_by_session(session)
+        return self.session_lookups(session).driver_names
     def team_color(self, team_name, f1_session):
         """Gets team color"""
-        return self.ff1_client.get_team_color(team_name, f1_session)
+        return self.session_lookups(f1_session).team_color(team_name)
     def driver_color(self, driver, session):
-        return self.ff1_client.get_driver_color(driver,session)
+        return self.session_lookups(session).driver_color(driver)
     def get_context(self):
         """Get all context data as a tuple"""
         return self.schedule, self.registered_rounds, self.session_map, self.session_types_by_rn
-def get_season_context_service(session: Session) -> SeasonContextController:
-    """Factory function for creating SeasonContextController"""
-    return SeasonContextController(session)
+def get_season_context_service(session: Session, season_context: SeasonContextController | None = None) -> SeasonContextController:
+    """Factory function for creating SeasonContextController, reusing a shared snapshot when given"""
+    return season_context or SeasonContextController(session)
@@ -4,19 +4,16 @@ from f1_api.models.f1_schemas import Sessions
 from f1_api.models.repositories.session_repository import SessionRepository
 
 class SessionController:
-    def __init__(self, session: Session, year: int):
+    def __init__(self, session: Session, year: int, season_context: SeasonContextController | None = None):
         self.season = year
         self.repository = SessionRepository(session,year)
-        self.season_context = SeasonContextController(session)
+        self.season_context = season_context or SeasonContextController(session, year=year)
 
     def get_session_data(self):
         sessions = []
-        existing_sessions = self.repository.get_existing_sessions()
         session_types_by_rn = self.season_context.session_types_by_rn
         for round_number, session_types in session_types_by_rn.items():
             for i, session in enumerate(session_types, start=1):
-                if (round_number, i) in existing_sessions:
-                    continue
                 sessions.append(Sessions(
                     round_number=round_number,
                     season_id=self.season,
@@ -25,6 +22,6 @@ class SessionController:
                 ))
         return sessions
 
-def get_session_data(session,year):
-    session_controller = SessionController(session,year)
+def get_session_data(session,year,season_context=None):
+    session_controller = SessionController(session,year,season_context)
     return session_controller.get_session_data()
@@ -8,12 +8,11 @@ team information with calculated metrics and rankings.
 """
 import logging
 from typing import Dict
-from fastf1 import plotting
 from sqlmodel import Session
 from fastapi import HTTPException
 from f1_api.controllers.base_controller import BaseController
 from f1_api.models.repositories.teams_repository import TeamsRepository
-from f1_api.controllers.season_context_controller import get_season_context_service
+from f1_api.controllers.season_context_controller import SeasonContextController, get_season_context_service
 from f1_api.models.f1_schemas import Teams
 
 class TeamsController(BaseController):
@@ -30,7 +29,7 @@ class TeamsController(BaseController):
     - Team data enrichment with calculated fields
     - Error handling and data validation
     """
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, season_context: SeasonContextController | None = None):
         """
         Initialize the TeamsService with required dependencies.
         
@@ -38,11 +37,12 @@ class TeamsController(BaseController):
         
         Args:
             session: SQLModel database session for repository operations
-            year: Optional year for season-specific data filtering
+            season_context: Optional shared season snapshot of an ingestion run
         """
         super().__init__(session)
-        self.context_service = get_season_context_service(session)
+        self.context_service = get_season_context_service(session, season_context)
         self.repository = TeamsRepository(self.session)
+        self._round_rosters = None
 
     def _validate_dependencies(self) -> None:
         """
@@ -159,65 +159,83 @@ class TeamsController(BaseController):
             logging.error(f'Failed to create team object for {team_name}: {e}')
             return None
 
-    def _process_session_for_teams(self, round_number: int, session_type: str, 
-                                 existing_teams: set, added_teams: set) -> list[Teams]:
+    def _representative_session(self, round_number: int, session_types: list):
         """
-        Process a single session to extract team data.
+        Session a round's teams are read from: the race, or the latest loaded
+        session when the race is not available yet.
+
+        Team names only change between rounds, so one session per round is enough.
+        """
+        for session_type in [session_types[-1]] + list(reversed(session_types[:-1])):
+            f1_session = self.context_service.session_map.get((round_number, session_type))
+            if f1_session is not None:
+                return f1_session
+        return None
+
+    def _process_round_for_teams(self, round_number: int, session_types: list) -> tuple | None:
+        """
+        Read the team roster of a single round.
         
         Args:
-            round_number: Round number for the session
-            session_type: Type of session (e.g., 'FP1', 'Q', 'R')
-            existing_teams: Set of already existing team names
-            added_teams: Set of team names already processed in this operation
+            round_number: Round number to read
+            session_types: Session types of the round, in weekend order
             
         Returns:
-            list[Teams]: List of new team objects found in this session
+            tuple | None: (representative session, team names), None when no session is usable
         """
-        session_teams = []
-        
         try:
-            f1_session = self.context_service.session_map.get((round_number, session_type))
+            f1_session = self._representative_session(round_number, session_types)
             if f1_session is None:
-                return session_teams
-                
-            try:
-                team_names = plotting.list_team_names(f1_session)
-            except ValueError as e:
-                logging.warning(f'Invalid session data for round {round_number}, session {session_type}: {e}')
-                return session_teams
-            except AttributeError as e:
-                logging.warning(f'Session data format error for round {round_number}, session {session_type}: {e}')
-                return session_teams
-            except Exception as e:
-                logging.error(f'Unexpected error getting team names for round {round_number}, session {session_type}: {e}')
-                return session_teams
-            
-            for name in team_names:
-                if name in existing_teams or name in added_teams:
-                    continue
-                    
-                added_teams.add(name)
-                team_color = self._get_team_color_safely(name, f1_session)
-                team_object = self._create_team_object_safely(name, team_color)
-                
-                if team_object:
-                    session_teams.append(team_object)
-                    
+                return None
+            return f1_session, list(self.context_service.get_session_teams(f1_session))
+        except ValueError as e:
+            logging.warning(f'Invalid session data for round {round_number}: {e}')
+        except AttributeError as e:
+            logging.warning(f'Session data format error for round {round_number}: {e}')
         except KeyError as e:
-            logging.warning(f'Session mapping error for round {round_number}, session {session_type}: {e}')
+            logging.warning(f'Session mapping error for round {round_number}: {e}')
         except Exception as e:
-            logging.error(f'Unexpected error processing session {session_type} for round {round_number}: {e}')
-            
-        return session_teams
+            logging.error(f'Unexpected error getting team names for round {round_number}: {e}')
+        return None
+
+    @property
+    def round_rosters(self) -> dict:
+        """
+        Team roster of every loaded round, read once per controller.
+
+        Returns:
+            dict: round_number -> (representative session, list of team names)
+        """
+        if self._round_rosters is None:
+            self._round_rosters = {}
+            for round_number, session_types in self._get_session_types_safely().items():
+                roster = self._process_round_for_teams(round_number, session_types)
+                if roster is not None:
+                    self._round_rosters[round_number] = roster
+        return self._round_rosters
+
+    @property
+    def roster_rows(self) -> list[dict]:
+        """TeamRoster rows of the loaded rounds"""
+        return [
+            {
+                "season_id": self.context_service.year,
+                "round_number": round_number,
+                "team_name": team_name,
+                "session_name": getattr(f1_session, "name", None),
+            }
+            for round_number, (f1_session, team_names) in self.round_rosters.items()
+            for team_name in team_names
+        ]
 
     @property
     def all_teams(self) -> list[Teams]:
         """
-        Get all teams discovered from season data with comprehensive error handling.
+        Get the teams of the season that are not in the database yet.
         
-        Processes all available sessions to discover team information including
-        team names and colors. Validates data integrity and handles various
-        error conditions gracefully.
+        Reads one representative session per round and diffs the season's team
+        names against the existing teams in a single pass. Colors come from the
+        first round a team appears in.
         
         Returns:
             list[Teams]: List of team objects with names and colors
@@ -229,15 +247,17 @@ class TeamsController(BaseController):
         
         teams = []
         existing_teams = self._get_existing_teams_safely()
-        session_types_by_rn = self._get_session_types_safely()
         added_teams = set()
         
-        for round_number, session_types in session_types_by_rn.items():
-            for session_type in session_types:
-                session_teams = self._process_session_for_teams(
-                    round_number, session_type, existing_teams, added_teams
-                )
-                teams.extend(session_teams)
+        for f1_session, team_names in self.round_rosters.values():
+            for name in team_names:
+                if name in existing_teams or name in added_teams:
+                    continue
+                added_teams.add(name)
+                team_color = self._get_team_color_safely(name, f1_session)
+                team_object = self._create_team_object_safely(name, team_color)
+                if team_object:
+                    teams.append(team_object)
                 
         return teams
     
@@ -333,11 +353,20 @@ def get_teams_service(session: Session) -> list:
     controller = TeamsController(session)
     return controller.get_teams_with_season_stats
 
-def get_team_data(session: Session) -> list[Teams]:
+def get_team_data(session: Session, season_context: SeasonContextController | None = None) -> list[Teams]:
     """Function wrapper for getting a list of teams for the DB"""
-    controller = TeamsController(session)
+    controller = TeamsController(session, season_context)
     return controller.all_teams
 
+def get_team_rosters(session: Session, season: int) -> dict:
+    """Function wrapper for the recorded per-round rosters of a season"""
+    controller = TeamsController(session)
+    return {
+        "season": season,
+        "rounds": controller.repository.get_round_rosters(season),
+        "changes": controller.repository.get_roster_changes(season),
+    }
+
 def get_team_id_map(session: Session) -> dict:
     controller = TeamsController(session)
     return controller.team_id_map
\ No newline at end of file
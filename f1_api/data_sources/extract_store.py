@@ -0,0 +1,260 @@
+"""
+Columnar extract store for FastF1 sessions.
+
+An extract keeps only what ingestion reads from a session: the results columns,
+the fastest laps of each driver and the plotting lookups (driver -> team, colors).
+Each session is written as Parquet files under {root}/{year}/{round:02d}_{session_number}/
+and ExtractReplayClient serves them through the FastF1Client interface, so an
+ingestion can be rebuilt offline without FastF1 or its cache.
+
+Usage:
+    python -m f1_api.data_sources.extract_store --year 2025 [--rounds 1 2] [--out DIR]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+import pandas as pd
+from f1_api.data_sources.ff1_client import FastF1Client
+from f1_api.data_sources.session_lookups import SessionLookups
+
+# Outside the package, which may be installed read-only
+DEFAULT_EXTRACT_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "f1_api", "ff1_extracts"
+)
+
+SCHEDULE_COLUMNS = [
+    "RoundNumber", "EventName", "EventFormat", "Country", "EventDate",
+    "Session1", "Session2", "Session3", "Session4", "Session5",
+    "Session1DateUtc", "Session2DateUtc", "Session3DateUtc", "Session4DateUtc", "Session5DateUtc",
+]
+RESULT_COLUMNS = [
+    "DriverNumber", "Abbreviation", "FullName", "CountryCode", "TeamName",
+    "Position", "ClassifiedPosition", "GridPosition", "Time", "Points", "Status",
+]
+
+class ExtractedSession:
+    """Session replayed from an extract, exposes the attributes ingestion reads from a FastF1 session"""
+    def __init__(self, name: str, results: pd.DataFrame, laps: pd.DataFrame,
+                 driver_lookup: pd.DataFrame, team_lookup: pd.DataFrame):
+        self.name = name
+        self.results = results
+        self.laps = laps
+        self.driver_lookup = driver_lookup
+        self.team_lookup = team_lookup
+
+    @property
+    def drivers(self) -> list[str]:
+        return list(self.results["DriverNumber"])
+
+class ExtractStore:
+    """Reads and writes session extracts, FF1_EXTRACT_DIR overrides the default root"""
+    def __init__(self, root: str | None = None):
+        self.root = root or os.environ.get("FF1_EXTRACT_DIR", DEFAULT_EXTRACT_DIR)
+
+    def session_dir(self, year: int, round_number: int, session_number: int) -> str:
+        return os.path.join(self.root, str(year), f"{round_number:02d}_{session_number}")
+
+    def write_schedule(self, year: int, schedule) -> str:
+        path = os.path.join(self.root, str(year), "schedule.parquet")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        columns = [c for c in SCHEDULE_COLUMNS if c in schedule.columns]
+        pd.DataFrame(schedule[columns]).reset_index(drop=True).to_parquet(path, index=False)
+        return path
+
+    def read_schedule(self, year: int) -> pd.DataFrame:
+        return pd.read_parquet(os.path.join(self.root, str(year), "schedule.parquet"))
+
+    def write_session(self, year: int, round_number: int, session_number: int, f1_session) -> str:
+        """Writes the extract of a FastF1 session loaded with laps"""
+        path = self.session_dir(year, round_number, session_number)
+        os.makedirs(path, exist_ok=True)
+        results = pd.DataFrame(f1_session.results)
+        results[[c for c in RESULT_COLUMNS if c in results.columns]].reset_index(drop=True).to_parquet(
+            os.path.join(path, "results.parquet"), index=False
+        )
+        self._compact_laps(f1_session.laps).to_parquet(os.path.join(path, "laps.parquet"), index=False)
+        driver_lookup, team_lookup = self._plotting_lookups(f1_session)
+        driver_lookup.to_parquet(os.path.join(path, "drivers.parquet"), index=False)
+        team_lookup.to_parquet(os.path.join(path, "teams.parquet"), index=False)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": f1_session.name, "round_number": int(round_number), "session_number": session_number}, f)
+        return path
+
+    def has_session(self, year: int, round_number: int, session_number: int) -> bool:
+        return os.path.exists(os.path.join(self.session_dir(year, round_number, session_number), "meta.json"))
+
+    def read_session(self, year: int, round_number: int, session_number: int) -> ExtractedSession:
+        path = self.session_dir(year, round_number, session_number)
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        return ExtractedSession(
+            name=meta["name"],
+            results=pd.read_parquet(os.path.join(path, "results.parquet")),
+            laps=pd.read_parquet(os.path.join(path, "laps.parquet")),
+            driver_lookup=pd.read_parquet(os.path.join(path, "drivers.parquet")),
+            team_lookup=pd.read_parquet(os.path.join(path, "teams.parquet")),
+        )
+
+    def remove(self, year: int, round_number: int | None = None):
+        """Deletes the extracts of a round, or of the whole season"""
+        path = os.path.join(self.root, str(year))
+        if round_number is not None:
+            prefix = f"{round_number:02d}_"
+            for entry in os.listdir(path) if os.path.isdir(path) else []:
+                if entry.startswith(prefix):
+                    shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+            return
+        shutil.rmtree(path, ignore_errors=True)
+
+    def remove_session(self, year: int, round_number: int, session_number: int):
+        shutil.rmtree(self.session_dir(year, round_number, session_number), ignore_errors=True)
+
+    def write_snapshot(self, season_context) -> int:
+        """Writes the schedule and every session loaded by a season snapshot, returns the session count"""
+        self.write_schedule(season_context.year, season_context.schedule)
+        written = 0
+        for round_number, session_types in season_context.session_types_by_rn.items():
+            for session_number, session_type in enumerate(session_types, start=1):
+                f1_session = season_context.session_map.get((round_number, session_type))
+                if f1_session is None or isinstance(f1_session, ExtractedSession):
+                    continue
+                self.write_session(season_context.year, round_number, session_number, f1_session)
+                written += 1
+        return written
+
+    @staticmethod
+    def _compact_laps(laps: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keeps two laps per driver: the fastest personal best and the fastest lap
+        overall, which is all SessionResultsUtility.extract_session_rows reads.
+        """
+        laps = laps[["Driver", "LapTime", "IsPersonalBest"]].dropna(subset=["LapTime"])
+        personal_bests = laps[laps["IsPersonalBest"] == True].groupby("Driver", as_index=False)["LapTime"].min()
+        fastest = laps.groupby("Driver", as_index=False)["LapTime"].min()
+        return pd.concat([
+            personal_bests.assign(IsPersonalBest=True),
+            fastest.assign(IsPersonalBest=False),
+        ], ignore_index=True)
+
+    @staticmethod
+    def _plotting_lookups(f1_session) -> tuple[pd.DataFrame, pd.DataFrame]:
+        lookups = SessionLookups.build(f1_session, FastF1Client)
+        teams = [{"team_name": team, "team_color": lookups.team_colors[team]} for team in lookups.teams]
+        drivers = [
+            {
+                "name": name,
+                "abbreviation": lookups.abbreviations[name],
+                "team_name": team,
+                "driver_color": lookups.driver_colors[name],
+            }
+            for team in lookups.teams
+            for name in lookups.drivers_by_team[team]
+        ]
+        return (
+            pd.DataFrame(drivers, columns=["name", "abbreviation", "team_name", "driver_color"]),
+            pd.DataFrame(teams, columns=["team_name", "team_color"]),
+        )
+
+class ExtractReplayClient:
+    """FastF1Client stand-in serving sessions and plotting lookups from an ExtractStore"""
+    def __init__(self, store: ExtractStore | None = None):
+        self.store = store or ExtractStore()
+
+    def get_event_schedule(self, year: int) -> pd.DataFrame | None:
+        try:
+            return self.store.read_schedule(year)
+        except FileNotFoundError:
+            logging.error(f"No schedule extract for {year} in {self.store.root}")
+            return None
+
+    def get_session_map(self, year: int, existing_rounds, max_workers=None, executor=None,
+                        progress=None, rounds=None, session_names=None, on_load=None) -> dict:
+        """Same contract as FastF1Client.get_session_map, a missing extract stops the map"""
+        schedule = self.get_event_schedule(year)
+        if schedule is None:
+            return {}
+        pending = FastF1Client._pending_sessions(schedule, existing_rounds, rounds, session_names)
+        loads = (self._timed_read(year, rn, sn) for rn, sn, _, _ in pending)
+        return FastF1Client._collect_sessions(pending, loads, {}, progress, on_load)
+
+    def load_session(self, year: int, name: str, session_type: str, laps: bool = True) -> ExtractedSession:
+        schedule = self.get_event_schedule(year)
+        event = schedule[schedule["EventName"] == name].iloc[0]
+        sessions = [event[f"Session{i}"] for i in range(1, 6)]
+        return self.store.read_session(year, int(event["RoundNumber"]), sessions.index(session_type) + 1)
+
+    def _timed_read(self, year: int, round_number: int, session_number: int):
+        start = time.perf_counter()
+        return self.store.read_session(year, round_number, session_number), time.perf_counter() - start, "extract"
+
+    @staticmethod
+    def get_session_team_name_by_driver(driver, session):
+        return ExtractReplayClient._driver_row(driver, session)["team_name"]
+
+    @staticmethod
+    def get_team_color(team_name: str, f1_session):
+        colors = f1_session.team_lookup.loc[f1_session.team_lookup["team_name"] == team_name, "team_color"]
+        if colors.empty or colors.iloc[0] is None:
+            raise ValueError(f"No color for team {team_name}")
+        return colors.iloc[0]
+
+    @staticmethod
+    def get_session_teams(race):
+        return list(race.team_lookup["team_name"])
+
+    @staticmethod
+    def get_drivers_by_team(team, race):
+        return list(race.driver_lookup.loc[race.driver_lookup["team_name"] == team, "name"])
+
+    @staticmethod
+    def get_drivers_by_session(session):
+        return list(session.driver_lookup["name"])
+
+    @staticmethod
+    def get_driver_color(driver, session):
+        return ExtractReplayClient._driver_row(driver, session)["driver_color"]
+
+    @staticmethod
+    def get_driver_abbreviation(driver, session):
+        return ExtractReplayClient._driver_row(driver, session)["abbreviation"]
+
+    @staticmethod
+    def _driver_row(driver, session) -> pd.Series:
+        """Driver lookup row by plotting name or abbreviation, like fastf1.plotting identifiers"""
+        lookup = session.driver_lookup
+        rows = lookup[(lookup["name"] == driver) | (lookup["abbreviation"] == driver)]
+        if rows.empty:
+            raise KeyError(f"No driver {driver} in session extract")
+        return rows.iloc[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Write FastF1 session extracts of a season")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--out", default=None, help="Extract root directory")
+    parser.add_argument("--rounds", type=int, nargs="+", default=None, help="Only extract these rounds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    FastF1Client.enable_cache()
+    store = ExtractStore(args.out)
+    schedule = FastF1Client.get_event_schedule(args.year)
+    store.write_schedule(args.year, schedule)
+    rounds = set(args.rounds) if args.rounds else None
+    for rn, sn, name, session_type in FastF1Client._pending_sessions(schedule, set(), rounds):
+        if store.has_session(args.year, rn, sn):
+            continue
+        try:
+            f1_session = FastF1Client.load_session(args.year, name, session_type)
+        except Exception as e:
+            logging.warning(f"Stopped extracting at {session_type} of {name}: {e}")
+            break
+        if f1_session.results.empty:
+            break
+        store.write_session(args.year, rn, sn, f1_session)
+        logging.info(f"Extracted {session_type} of {name}")
+
+if __name__ == "__main__":
+    main()
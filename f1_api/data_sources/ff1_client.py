@@ -1,18 +1,78 @@
 """This layer connects the API to the external FastF1 service"""
-from typing import Optional
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional
 import logging
-import fastf1 as ff1
-from fastf1 import plotting
-from fastf1.events import EventSchedule
+import os
+import threading
+import time
+try:
+    import fastf1 as ff1
+    from fastf1 import plotting
+except ImportError:  # deployments replaying extracts (extract_store) run without FastF1
+    ff1 = plotting = None
+if TYPE_CHECKING:
+    from fastf1.events import EventSchedule
+
+DEFAULT_LOAD_WORKERS = 1
+DEFAULT_CACHE_DIR = r'C:/Users/Marc/Documents/ITA/Sprint 8/f1_api/ff1_cache'
 
 class SessionLoadError(Exception):
     """
     Custom exception for fastf1 session loading errors
     """
 
+class _EmptySession(Exception):
+    """A loaded session without results, the end of the available data"""
+
+class _CacheUsageHandler(logging.Handler):
+    """Counts the cached and fetched API requests FastF1 logs from the loading thread"""
+    def __init__(self):
+        super().__init__()
+        self.thread = threading.get_ident()
+        self.cached = 0
+        self.fetched = 0
+
+    def emit(self, record: logging.LogRecord):
+        if record.thread != self.thread:
+            return
+        message = record.getMessage()
+        if message.startswith("Using cached data"):
+            self.cached += 1
+        elif message.startswith("Fetching"):
+            self.fetched += 1
+
+    @property
+    def usage(self) -> str | None:
+        """'hit' when every request came from the cache, 'miss' when any was fetched"""
+        if self.fetched:
+            return "miss"
+        return "hit" if self.cached else None
+
+def _timed_session_load(year: int, name: str, session_type: str):
+    """Loads a single session with laps, returns it with the elapsed seconds and the FastF1 cache usage"""
+    handler = _CacheUsageHandler()
+    ff1_logger = logging.getLogger("fastf1")
+    ff1_logger.addHandler(handler)
+    try:
+        start = time.perf_counter()
+        f1_session = ff1.get_session(year=year,gp=name,identifier=session_type)
+        f1_session.load(laps=True, telemetry=False, weather=False, messages=False)
+        return f1_session, time.perf_counter() - start, handler.usage
+    finally:
+        ff1_logger.removeHandler(handler)
+
 class FastF1Client:
     """Base client for FastF1 API communication"""
     @staticmethod
+    def enable_cache(cache_dir: Optional[str] = None):
+        """Enables the FastF1 cache, FF1_CACHE_DIR overrides the default directory"""
+        if ff1 is None:
+            logging.warning("FastF1 is not installed, only extract replay is available")
+            return
+        ff1.Cache.enable_cache(cache_dir or os.environ.get("FF1_CACHE_DIR", DEFAULT_CACHE_DIR))
+    @staticmethod
     def get_event_schedule(year: int) -> Optional[EventSchedule]:
         """Get event schedule for a year"""
         try:
@@ -21,38 +81,107 @@ class FastF1Client:
             logging.error(f"Error getting schedule for {year}: {e}")
             return None
     @staticmethod
-    def get_session_map(year: int, existing_rounds: list[int]) -> dict:
-        """Loads all sessions and returns them in a Dic"""
+    def load_session(year: int, name: str, session_type: str, laps: bool = True):
+        """Loads a single session, used for sessions outside of the session map"""
+        start = time.perf_counter()
+        f1_session = ff1.get_session(year=year,gp=name,identifier=session_type)
+        f1_session.load(laps=laps, telemetry=False, weather=False, messages=False)
+        logging.info(f"Loaded {session_type} at {name} in {time.perf_counter() - start:.2f}s")
+        return f1_session
+    @staticmethod
+    def get_session_map(year: int, existing_rounds: list[int], max_workers: Optional[int] = None,
+                        executor: Optional[str] = None, progress: Optional[Callable[[int, str], None]] = None,
+                        rounds: Optional[set[int]] = None, session_names: Optional[list[str]] = None,
+                        on_load: Optional[Callable] = None) -> dict:
+        """
+        Loads all sessions and returns them in a Dic keyed by (round, session_type)
+
+        Sessions are loaded by a pool of ``max_workers`` threads or processes
+        (``FF1_LOAD_WORKERS`` / ``FF1_LOAD_EXECUTOR`` when not given). Loads are
+        consumed in schedule order, so the map still stops at the first session
+        that fails or has no results, exactly like the sequential path.
+        ``progress`` is called with (round, session_type) after each session is added.
+        ``rounds`` and ``session_names`` restrict the load to a slice of the season.
+        ``on_load(round, session_type, seconds, cache, error)`` is called for every load attempt.
+        """
         session_map = {}
-        try:
-            schedule = FastF1Client.get_event_schedule(year) 
-            for _,event in schedule.iloc[1:].iterrows():
-                rn = event["RoundNumber"]
-                if event["EventFormat"] == "testing":
+        workers = max_workers or int(os.environ.get("FF1_LOAD_WORKERS", DEFAULT_LOAD_WORKERS))
+        executor_kind = executor or os.environ.get("FF1_LOAD_EXECUTOR", "thread")
+        schedule = FastF1Client.get_event_schedule(year)
+        if schedule is None:
+            return session_map
+        pending = FastF1Client._pending_sessions(schedule, existing_rounds, rounds, session_names)
+        if workers <= 1:
+            loads = (_timed_session_load(year, name, session_type) for _, _, name, session_type in pending)
+            return FastF1Client._collect_sessions(pending, loads, session_map, progress, on_load)
+        pool_class = ProcessPoolExecutor if executor_kind == "process" else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            futures = deque()
+            queue = iter(pending)
+            def submit_next():
+                item = next(queue, None)
+                if item is not None:
+                    futures.append(pool.submit(_timed_session_load, year, item[2], item[3]))
+            for _ in range(workers):
+                submit_next()
+            def ordered_loads():
+                while futures:
+                    future = futures.popleft()
+                    submit_next()
+                    yield future.result()
+            try:
+                return FastF1Client._collect_sessions(pending, ordered_loads(), session_map, progress, on_load)
+            finally:
+                for future in futures:
+                    future.cancel()
+    @staticmethod
+    def _pending_sessions(schedule: EventSchedule, existing_rounds, rounds=None, session_names=None) -> list[tuple]:
+        """Lists (round, session_number, event_name, session_type) still to load, in schedule order"""
+        pending = []
+        for _,event in schedule.iloc[1:].iterrows():
+            rn = event["RoundNumber"]
+            if event["EventFormat"] == "testing":
+                continue
+            if rounds is not None and rn not in rounds:
+                continue
+            name = event["EventName"]
+            sessions = [
+                event["Session1"],
+                event["Session2"],
+                event["Session3"],
+                event["Session4"],
+                event["Session5"]
+            ]
+            for sn,session_type in enumerate(sessions,start=1):
+                if (rn,sn) in existing_rounds:
+                    logging.info(f"{name} session {sn} already in DB")
                     continue
-                name = event["EventName"]
-                sessions = [
-                    event["Session1"],
-                    event["Session2"],
-                    event["Session3"],
-                    event["Session4"],
-                    event["Session5"]
-                ]
-                for sn,session_type in enumerate(sessions,start=1):
-                    try:
-                        if (rn,sn) in existing_rounds:
-                            logging.info(f"{event["EventName"]} session {sn} already in DB")
-                            continue
-                        f1_session = ff1.get_session(year=year,gp=name,identifier=session_type)
-                        f1_session.load(laps=True, telemetry=False, weather=False, messages=False)
-                        
-                        if f1_session.results.empty:
-                            logging.warning(f"No data for session {session_type} at {name}, skipping.")
-                            raise Exception("No more sessions to load")  
-                        session_map[(rn, session_type)] = f1_session
-                    except Exception as e:
-                        logging.warning(f"Failed to load session {session_type} at {name}")
-                        raise SessionLoadError from e
+                if session_names and session_type not in session_names:
+                    continue
+                pending.append((rn, sn, name, session_type))
+        return pending
+    @staticmethod
+    def _collect_sessions(pending: list[tuple], loads, session_map: dict, progress=None, on_load=None) -> dict:
+        """Adds loaded sessions to the map in schedule order until the first empty or failed one"""
+        loads = iter(loads)
+        try:
+            for rn, _, name, session_type in pending:
+                try:
+                    f1_session, elapsed, cache = next(loads)
+                    logging.info(f"Loaded {session_type} at {name} in {elapsed:.2f}s")
+                    if on_load:
+                        on_load(rn, session_type, elapsed, cache, None)
+                    if f1_session.results.empty:
+                        logging.warning(f"No data for session {session_type} at {name}, skipping.")
+                        raise _EmptySession("No more sessions to load")
+                    session_map[(rn, session_type)] = f1_session
+                except Exception as e:
+                    logging.warning(f"Failed to load session {session_type} at {name}")
+                    if on_load and not isinstance(e, _EmptySession):
+                        on_load(rn, session_type, None, None, f"{type(e).__name__}: {e}")
+                    raise SessionLoadError from e
+                if progress:
+                    progress(rn, session_type)
             return session_map
         except SessionLoadError:
             logging.warning("Stopped loading further sessions")
@@ -76,5 +205,8 @@ class FastF1Client:
     @staticmethod
     def get_driver_color(driver,session):
         return plotting.get_driver_color(driver,session)
+    @staticmethod
+    def get_driver_abbreviation(driver,session):
+        return plotting.get_driver_abbreviation(driver,session)
 def load_sessions(year,existing):
     return FastF1Client.get_session_map(year=year,existing_rounds=existing)
\ No newline at end of file
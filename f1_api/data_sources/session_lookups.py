@@ -0,0 +1,68 @@
+"""Per-session plotting lookups, built once instead of calling fastf1.plotting per driver"""
+import logging
+
+class SessionLookups:
+    """
+    Driver -> team, driver -> color, team -> color and team -> drivers of a session.
+
+    Drivers are keyed both by their plotting name and their abbreviation, like
+    the identifiers fastf1.plotting accepts. Built through any client with the
+    FastF1Client plotting interface (FastF1 or extract replay).
+    """
+    def __init__(self, teams: list[str], team_colors: dict, drivers_by_team: dict,
+                 team_by_driver: dict, driver_colors: dict, abbreviations: dict):
+        self.teams = teams
+        self.team_colors = team_colors
+        self.drivers_by_team = drivers_by_team
+        self.team_by_driver = team_by_driver
+        self.driver_colors = driver_colors
+        self.abbreviations = abbreviations
+
+    @classmethod
+    def build(cls, f1_session, client) -> "SessionLookups":
+        teams = list(client.get_session_teams(f1_session))
+        team_colors = {}
+        drivers_by_team = {}
+        team_by_driver = {}
+        driver_colors = {}
+        abbreviations = {}
+        for team in teams:
+            try:
+                team_colors[team] = client.get_team_color(team, f1_session)
+            except Exception as e:
+                logging.warning(f"No color for team {team}: {e}")
+                team_colors[team] = None
+            drivers_by_team[team] = []
+            for name in client.get_drivers_by_team(team, f1_session):
+                try:
+                    abbreviation = client.get_driver_abbreviation(name, f1_session)
+                    color = client.get_driver_color(name, f1_session)
+                except Exception as e:
+                    logging.warning(f"Skipping driver {name} of {team}, no plotting data: {e}")
+                    continue
+                drivers_by_team[team].append(name)
+                abbreviations[name] = abbreviation
+                for key in (name, abbreviation):
+                    team_by_driver[key] = team
+                    driver_colors[key] = color
+        return cls(teams, team_colors, drivers_by_team, team_by_driver, driver_colors, abbreviations)
+
+    @property
+    def driver_names(self) -> list[str]:
+        return [name for team in self.teams for name in self.drivers_by_team[team]]
+
+    def team_name_by_driver(self, driver: str) -> str:
+        if driver not in self.team_by_driver:
+            raise KeyError(f"No team for driver {driver} in session")
+        return self.team_by_driver[driver]
+
+    def driver_color(self, driver: str) -> str:
+        if driver not in self.driver_colors:
+            raise KeyError(f"No color for driver {driver} in session")
+        return self.driver_colors[driver]
+
+    def team_color(self, team_name: str) -> str:
+        color = self.team_colors.get(team_name)
+        if color is None:
+            raise ValueError(f"No color for team {team_name}")
+        return color
@@ -1,4 +1,5 @@
 """Dependencies module"""
 from .database import get_db_session
+from .etag import content_etag, league_etag, versioned_etag
 
-__all__ = ["get_db_session"]
\ No newline at end of file
+__all__ = ["get_db_session", "content_etag", "league_etag", "versioned_etag"]
\ No newline at end of file
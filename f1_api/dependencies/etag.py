@@ -0,0 +1,73 @@
+"""
+Conditional GET dependencies.
+
+Routes opt in with one line in their decorator:
+
+    @router.get("/", dependencies=[Depends(versioned_etag("drivers"))])
+    @router.get("/{league_id}/market/for-sale", dependencies=[Depends(league_etag)])
+
+versioned_etag derives a strong ETag from the ingestion DataVersion and the
+season served, so its routes must only return ingested data (the drivers
+payload leaves out the market fields of Drivers for that reason).
+league_etag derives one from a single query over the league's ownerships,
+transactions, participants and teams plus the DataVersion. A matching
+If-None-Match is answered with 304 before the endpoint runs.
+content_etag marks the response for etag_middleware, which hashes the
+serialized body: the endpoint still runs but an unchanged body is not sent.
+league_etag falls back to it when its validator cannot be read.
+"""
+import hashlib
+import logging
+from datetime import datetime
+from fastapi import Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from f1_api.controllers.response_cache import response_cache
+from f1_api.dependencies.database import get_db_session
+from f1_api.models.repositories.data_version_repository import DataVersionRepository
+from f1_api.models.repositories.leagues_repository import LeaguesRepository
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of If-None-Match against an ETag, as RFC 9110 asks for GET"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def versioned_etag(endpoint: str):
+    """Dependency answering 304 while the ingested data behind an endpoint is unchanged"""
+    def dependency(request: Request, response: Response, session: Session = Depends(get_db_session)):
+        try:
+            version = response_cache.data_version(session)
+            season = DataVersionRepository(session).served_season(datetime.now().year)
+        except Exception as e:
+            logging.warning(f"No ETag for {endpoint}, data version unavailable: {e}")
+            session.rollback()
+            return
+        etag = f"{endpoint}-{season}-{version}"
+        if request.url.query:
+            etag += "-" + hashlib.sha256(request.url.query.encode()).hexdigest()[:12]
+        _validate(request, response, f'"{etag}"')
+    return dependency
+
+def league_etag(league_id: int, request: Request, response: Response, session: Session = Depends(get_db_session)):
+    """Dependency answering 304 while nothing a league route reads has changed"""
+    try:
+        marker = LeaguesRepository(session).get_change_marker(league_id)
+        version = response_cache.data_version(session)
+    except Exception as e:
+        logging.warning(f"League {league_id} validator unavailable, hashing the response instead: {e}")
+        session.rollback()
+        content_etag(request)
+        return
+    validator = f"{request.url.path}?{request.url.query}|{marker}|{version}"
+    _validate(request, response, f'"league-{league_id}-{hashlib.sha256(validator.encode()).hexdigest()[:32]}"')
+
+def _validate(request: Request, response: Response, etag: str):
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+def content_etag(request: Request):
+    """Dependency asking etag_middleware to tag the response with a hash of its body"""
+    request.state.content_etag = True
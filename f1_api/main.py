@@ -1,5 +1,4 @@
 """In this module the api exposes the endpoints"""
-import fastf1 as ff1
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 #from f1_api.controllers.routes import router as legacy_router
@@ -9,10 +8,28 @@ from f1_api.routers.admin_router import router as admin_router
 from f1_api.routers.users_router import router as users_router
 from f1_api.routers.drivers_router import router as drivers_router
 from f1_api.routers.user_teams_router import router as user_teams_router
+from f1_api.data_sources.ff1_client import FastF1Client
+from f1_api.controllers.ingestion_scheduler import get_scheduler
+from f1_api.middleware.etag import etag_middleware
+from contextlib import asynccontextmanager
+import os
 
-ff1.Cache.enable_cache(r'C:/Users/Marc/Documents/ITA/Sprint 8/f1_api/ff1_cache')
+FastF1Client.enable_cache()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Auto-ingests sessions after they end when INGESTION_SCHEDULER=1"""
+    scheduler = get_scheduler() if os.environ.get("INGESTION_SCHEDULER") == "1" else None
+    if scheduler:
+        scheduler.start()
+    yield
+    if scheduler:
+        scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# ETags of the routes that opt in with the content_etag dependency
+app.middleware("http")(etag_middleware)
 
 # Include legacy routes for backward compatibility
 #app.include_router(legacy_router, prefix="/api", tags=["Legacy"])
@@ -36,4 +53,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
\ No newline at end of file
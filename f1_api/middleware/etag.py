@@ -0,0 +1,21 @@
+"""Content-hash ETags for the routes that opt in with the content_etag dependency"""
+import hashlib
+from fastapi import Request
+from fastapi.responses import Response
+from f1_api.dependencies.etag import etag_matches
+
+
+async def etag_middleware(request: Request, call_next):
+    """Tags opted-in GET responses with a sha256 of the body, 304 when If-None-Match matches"""
+    response = await call_next(request)
+    if request.method != "GET" or response.status_code != 200 or not getattr(request.state, "content_etag", False):
+        return response
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    tagged = Response(content=body, status_code=response.status_code, media_type=response.media_type)
+    # raw keeps repeated headers such as several Set-Cookie
+    tagged.raw_headers = [(name, value) for name, value in response.headers.raw if name != b"etag"]
+    tagged.raw_headers.append((b"etag", etag.encode("latin-1")))
+    return tagged
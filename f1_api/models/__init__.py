@@ -4,8 +4,15 @@ from .f1_schemas import (
     Sessions,
     Teams,
     Drivers,
+    DriverSeason,
     DriverTeamLink,
-    SessionResult
+    SessionResult,
+    DriverSeasonStats,
+    TeamRoster,
+    IngestionState,
+    IngestionCheckpoint,
+    DataVersion,
+    IngestionJob
 )
 
 from .app_models import (
@@ -33,8 +40,15 @@ __all__ = [
     "Sessions",
     "Teams",
     "Drivers",
+    "DriverSeason",
     "DriverTeamLink",
     "SessionResult",
+    "DriverSeasonStats",
+    "TeamRoster",
+    "IngestionState",
+    "IngestionCheckpoint",
+    "DataVersion",
+    "IngestionJob",
     # App Models
     "Leagues",
     "Users",
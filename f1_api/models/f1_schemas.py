@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKeyConstraint, UniqueConstraint, DateTime, String
+from sqlalchemy import JSON, Column, ForeignKeyConstraint, Index, UniqueConstraint, DateTime, String, text
 from sqlmodel import Field, SQLModel
 from datetime import datetime
 
@@ -36,14 +36,21 @@ class Teams(SQLModel, table=True):
     team_color: str
     team_url: str | None = None
 
+    __table_args__ = (
+        UniqueConstraint('team_name'),
+    )
+
 class Drivers(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
+    driver_key: str | None = None  # DriversUtility.create_driver_id slug, stable across seasons and car numbers
     driver_number: int
     full_name: str
     acronym: str
     driver_color: str
     country_code: str | None
     headshot_url: str
+    team_key: str | None = None  # team segment of headshot_url, the headshot is only refreshed when it changes
+    last_season: int | None = None  # season the number, acronym, color and headshot were taken from
     
     # MARKET PRICING FIELDS
     purchase_count: int | None = Field(default=0)  # Veces comprado en el mercado
@@ -53,6 +60,19 @@ class Drivers(SQLModel, table=True):
     performance_score: float | None = Field(default=50.0)  # Score de rendimiento (0-100)
     last_price_update: datetime | None = Field(default=None)  # Última actualización de precio
 
+    __table_args__ = (
+        UniqueConstraint('driver_key'),
+    )
+
+class DriverSeason(SQLModel, table=True):
+    """Number, acronym, color and headshot a driver raced with in a season"""
+    season_id: int = Field(foreign_key="seasons.year", primary_key=True)
+    driver_id: int = Field(foreign_key="drivers.id", primary_key=True)
+    driver_number: int
+    acronym: str
+    driver_color: str
+    headshot_url: str
+
 class DriverTeamLink(SQLModel, table=True):
     driver_id: int = Field(foreign_key="drivers.id", primary_key=True)
     team_id: int = Field(foreign_key="teams.id", primary_key=True)
@@ -85,3 +105,77 @@ class SessionResult(SQLModel, table=True):
             ['sessions.round_number', 'sessions.season_id', 'sessions.session_number']
         ),
     )
+
+class DriverSeasonStats(SQLModel, table=True):
+    """Season totals of a driver, refreshed from SessionResult by ingestion"""
+    season_id: int = Field(foreign_key="seasons.year", primary_key=True)
+    driver_id: int = Field(foreign_key="drivers.id", primary_key=True)
+    last_round: int = Field(default=0)  # latest round with a stored result
+    points: int = Field(default=0)
+    poles: int = Field(default=0)
+    pole_victories: int = Field(default=0)
+    podiums: int = Field(default=0)
+    victories: int = Field(default=0)
+    fastest_laps: int = Field(default=0)
+    sprint_podiums: int = Field(default=0)
+    sprint_victories: int = Field(default=0)
+    sprint_poles: int = Field(default=0)
+    # Running sums behind the fantasy averages, races only
+    finish_sum: int = Field(default=0)
+    finish_count: int = Field(default=0)
+    grid_sum: int = Field(default=0)
+    grid_count: int = Field(default=0)
+    overtake_sum: int = Field(default=0)
+    overtake_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class TeamRoster(SQLModel, table=True):
+    season_id: int = Field(foreign_key="seasons.year", primary_key=True)
+    round_number: int = Field(primary_key=True)
+    team_name: str = Field(primary_key=True)
+    session_name: str | None = None  # representative session the roster was read from
+
+class IngestionState(SQLModel, table=True):
+    season_id: int = Field(primary_key=True)
+    round_number: int = Field(primary_key=True)
+    session_number: int = Field(primary_key=True)
+    status: str  # 'completed' (results written), 'changed' (results differ from the last load) or 'empty' (no results yet)
+    row_count: int = Field(default=0)
+    checksum: str | None = None  # sha256 of the stored SessionResult rows
+    loaded_at: datetime = Field(default_factory=datetime.now)
+
+class IngestionCheckpoint(SQLModel, table=True):
+    season_id: int = Field(primary_key=True)
+    round_number: int = Field(primary_key=True)  # 0 for a whole-season snapshot
+    stage: str = Field(primary_key=True)
+    sessions: list | None = Field(default=None, sa_column=Column(JSON))  # [round, session_number] pairs extracted by 'loading_sessions'
+    completed_at: datetime = Field(default_factory=datetime.now)
+
+class DataVersion(SQLModel, table=True):
+    season_id: int = Field(primary_key=True)
+    version: int = Field(default=0)  # bumped by every ingestion commit that changed the season's data
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class IngestionJob(SQLModel, table=True):
+    id: int = Field(default=None, primary_key=True)
+    season_id: int = Field(index=True)
+    status: str = Field(default="queued")  # 'queued', 'running', 'cancelling', 'cancelled', 'completed', 'failed'
+    stage: str | None = None
+    round_number: int | None = None
+    cancel_requested: bool = Field(default=False)
+    scope: dict | None = Field(default=None, sa_column=Column(JSON))  # {"rounds": [...], "sessions": [...]}, None = full season
+    worker_pid: int | None = None
+    error: str | None = None
+    summary: dict | None = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+
+    __table_args__ = (
+        # Single-flight: at most one queued or running job per season
+        Index(
+            "uq_ingestionjob_active_season", "season_id", unique=True,
+            postgresql_where=text("status IN ('queued', 'running', 'cancelling')"),
+            sqlite_where=text("status IN ('queued', 'running', 'cancelling')")
+        ),
+    )
@@ -0,0 +1,48 @@
+import pandas as pd
+
+RACE_SESSIONS = ("Sprint", "Race")
+
+class SessionResultsUtility:
+    @staticmethod
+    def extract_session_rows(results: pd.DataFrame, laps: pd.DataFrame, session_type: str) -> pd.DataFrame:
+        """
+        Builds one row per driver of a session from its results and laps frames.
+
+        Fastest laps come from a single groupby over the personal-best laps and
+        status / fastest-lap flags are computed column-wise, so the cost no longer
+        grows with drivers x laps. Missing values are returned as None.
+        """
+        personal_bests = laps.loc[laps["IsPersonalBest"] == True, ["Driver", "LapTime"]].dropna(subset=["LapTime"])
+        if session_type in RACE_SESSIONS and not personal_bests.empty:
+            fastest_driver = personal_bests.loc[personal_bests["LapTime"].idxmin(), "Driver"]
+            disq_drivers = results.loc[results["Status"] == "Disqualified", "Abbreviation"]
+            if fastest_driver in disq_drivers.values:
+                laps = laps[laps["Driver"] != fastest_driver]
+                personal_bests = personal_bests[personal_bests["Driver"] != fastest_driver]
+
+        fastest = personal_bests.groupby("Driver")["LapTime"].min().dt.total_seconds().rename("best_lap_time")
+        frame = results.merge(fastest, how="left", left_on="Abbreviation", right_index=True)
+
+        rows = pd.DataFrame({
+            "driver_number": frame["DriverNumber"].astype(int),
+            "abbreviation": frame["Abbreviation"],
+            "position": None,
+            "grid_position": None,
+            "best_lap_time": frame["best_lap_time"],
+            "total_time": None,
+            "points": None,
+            "status": None,
+            "fastest_lap": None,
+        })
+        if session_type in RACE_SESSIONS:
+            session_fastest = laps["LapTime"].min().total_seconds()
+            classified = frame["ClassifiedPosition"].astype(str).str.isdigit()
+            rows["position"] = frame["ClassifiedPosition"]
+            rows["grid_position"] = frame["GridPosition"].astype(int)
+            rows["total_time"] = frame["Time"].dt.total_seconds()
+            rows["points"] = frame["Points"].astype(int)
+            rows["status"] = frame["Status"]
+            rows["fastest_lap"] = classified & (rows["best_lap_time"] == session_fastest)
+        if session_type == "Qualifying":
+            rows["position"] = frame["Position"].astype(int)
+        return rows.astype(object).where(rows.notna(), None)
@@ -4,6 +4,15 @@ from .driver_team_link_repository import DriverTeamLinkRepository
 from .events_repository import EventsRepository
 from .session_repository import SessionRepository
 from .sessions_results_repository import SessionResultsRepository
+from .driver_season_stats_repository import DriverSeasonStatsRepository
+from .ingestion_state_repository import IngestionStateRepository
+from .data_version_repository import DataVersionRepository
+from .ingestion_jobs_repository import IngestionJobsRepository
+from .ingestion_checkpoint_repository import IngestionCheckpointRepository
+from .bulk_upsert_repository import BulkUpsertRepository
+from .dry_run_repository import DryRunRepository
+from .lookup_registry import IngestionLookupRegistry
+from .schema_repository import SchemaRepository
 from .users_repository import UserRepository
 from .leagues_repository import LeaguesRepository
 from .user_league_links_repository import UserLeagueLinksRepository
@@ -19,6 +28,15 @@ __all__ = [
     "EventsRepository",
     "SessionRepository",
     "SessionResultsRepository",
+    "DriverSeasonStatsRepository",
+    "IngestionStateRepository",
+    "DataVersionRepository",
+    "IngestionJobsRepository",
+    "IngestionCheckpointRepository",
+    "BulkUpsertRepository",
+    "DryRunRepository",
+    "IngestionLookupRegistry",
+    "SchemaRepository",
     "UserRepository",
     "LeaguesRepository",
     "UserLeagueLinksRepository",
@@ -0,0 +1,110 @@
+"""
+PostgreSQL bulk writes for ingested rows.
+
+Rows are written with batched ``INSERT ... ON CONFLICT`` statements, so ingestion
+no longer needs to read the existing keys of each table before inserting.
+Every method returns the number of inserted and updated rows.
+"""
+from sqlalchemy import and_, case, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from f1_api.models.f1_schemas import DriverSeason, DriverTeamLink, Drivers, Events, SessionResult, Sessions, TeamRoster, Teams
+
+BATCH_SIZE = 1000
+
+class BulkUpsertRepository:
+    def __init__(self, session: Session, batch_size: int = BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+
+    def upsert_events(self, rows: list[dict]) -> dict:
+        return self._upsert(Events, rows, ["round_number", "season_id"])
+
+    def upsert_sessions(self, rows: list[dict]) -> dict:
+        return self._upsert(Sessions, rows, ["round_number", "season_id", "session_number"])
+
+    def upsert_teams(self, rows: list[dict]) -> dict:
+        return self._upsert(Teams, rows, ["team_name"])
+
+    def upsert_team_rosters(self, rows: list[dict]) -> dict:
+        return self._upsert(TeamRoster, rows, ["season_id", "round_number", "team_name"], ["session_name"])
+
+    def upsert_drivers(self, rows: list[dict]) -> dict:
+        """
+        Inserts new drivers keyed on driver_key and refreshes number, acronym,
+        driver_color, plus headshot_url when the driver's team_key changed.
+        A season older than the one the stored fields came from (last_season)
+        leaves them alone, so a backfill never overwrites the current season.
+        """
+        table = Drivers.__table__
+        # The same driver may show up twice in a season (team change), keep the last one
+        rows = list({row["driver_key"]: row for row in rows}.values())
+        def build(stmt):
+            team_changed = table.c.team_key.is_distinct_from(stmt.excluded.team_key)
+            return stmt.on_conflict_do_update(
+                index_elements=["driver_key"],
+                set_={
+                    "driver_number": stmt.excluded.driver_number,
+                    "acronym": stmt.excluded.acronym,
+                    "driver_color": stmt.excluded.driver_color,
+                    "headshot_url": case((team_changed, stmt.excluded.headshot_url), else_=table.c.headshot_url),
+                    "team_key": stmt.excluded.team_key,
+                    "last_season": stmt.excluded.last_season,
+                },
+                where=and_(
+                    stmt.excluded.last_season >= func.coalesce(table.c.last_season, stmt.excluded.last_season),
+                    or_(
+                        *(table.c[column].is_distinct_from(stmt.excluded[column])
+                          for column in ("driver_number", "acronym", "driver_color", "last_season")),
+                        team_changed
+                    )
+                )
+            )
+        return self._write(table, rows, build)
+
+    def upsert_driver_seasons(self, rows: list[dict]) -> dict:
+        """Season attributes of the drivers, rows carry the driver_key their driver id is resolved from"""
+        rows = list({(row["season_id"], row["driver_key"]): row for row in rows}.values())
+        driver_ids = self.driver_ids_by_key(row["driver_key"] for row in rows)
+        rows = [{**row, "driver_id": driver_ids[row["driver_key"]]} for row in rows if row["driver_key"] in driver_ids]
+        return self._upsert(DriverSeason, rows, ["season_id", "driver_id"],
+                            ["driver_number", "acronym", "driver_color", "headshot_url"])
+
+    def driver_ids_by_key(self, driver_keys) -> dict:
+        """driver_key -> id of the stored drivers, in one query"""
+        driver_keys = set(driver_keys)
+        if not driver_keys:
+            return {}
+        return dict(self.session.execute(select(Drivers.driver_key, Drivers.id).where(Drivers.driver_key.in_(driver_keys))).all())
+
+    def upsert_driver_team_links(self, rows: list[dict]) -> dict:
+        return self._upsert(DriverTeamLink, rows, ["driver_id", "team_id", "season_id", "round_number"])
+
+    def upsert_session_results(self, rows: list[dict]) -> dict:
+        """Inserts results, refreshing the stored values of sessions that were re-ingested"""
+        update_columns = ["position", "grid_position", "best_lap_time", "total_time", "points", "status", "fastest_lap"]
+        return self._upsert(SessionResult, rows, ["season_id", "round_number", "session_number", "driver_id"], update_columns)
+
+    def _upsert(self, model, rows: list[dict], index_elements: list[str], update_columns: list[str] | None = None) -> dict:
+        table = model.__table__
+        def build(stmt):
+            if not update_columns:
+                return stmt.on_conflict_do_nothing(index_elements=index_elements)
+            return stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns},
+                where=or_(*(table.c[column].is_distinct_from(stmt.excluded[column]) for column in update_columns))
+            )
+        return self._write(table, rows, build)
+
+    def _write(self, table, rows: list[dict], build) -> dict:
+        counts = {"inserted": 0, "updated": 0}
+        columns = set(table.c.keys())
+        rows = [{key: value for key, value in row.items() if key in columns} for row in rows]
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            # xmax is 0 only for tuples created by this statement
+            stmt = build(insert(table).values(batch)).returning(literal_column("xmax = 0").label("inserted"))
+            for (inserted,) in self.session.execute(stmt):
+                counts["inserted" if inserted else "updated"] += 1
+        return counts
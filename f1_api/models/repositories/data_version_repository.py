@@ -0,0 +1,35 @@
+"""Data versions of the ingested seasons, read by the response cache"""
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, func, select
+from f1_api.models.f1_schemas import DataVersion
+
+class DataVersionRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def bump(self, season_year: int):
+        """Increments the version of a season, committed once the snapshot that changed it is written"""
+        table = DataVersion.__table__
+        stmt = insert(table).values(season_id=season_year, version=1, updated_at=datetime.now())
+        self.session.execute(stmt.on_conflict_do_update(
+            index_elements=["season_id"],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at}
+        ))
+
+    def current(self) -> int:
+        """
+        Sum of the season versions: grows with every bump of any season, so a
+        response built from several seasons (or a fallback season) is covered too
+        """
+        return self.session.exec(select(func.coalesce(func.sum(DataVersion.version), 0))).one()
+
+    def served_season(self, season_year: int) -> int:
+        """The season a read of season_year serves: itself once ingested, else the latest ingested one"""
+        return self.session.exec(
+            select(func.coalesce(
+                select(DataVersion.season_id).where(DataVersion.season_id == season_year).scalar_subquery(),
+                select(func.max(DataVersion.season_id)).scalar_subquery(),
+                season_year
+            ))
+        ).one()
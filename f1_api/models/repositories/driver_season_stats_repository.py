@@ -0,0 +1,99 @@
+"""
+Materialized season totals of each driver (driver_season_stats).
+
+Ingestion refreshes the rows of the drivers it wrote results for with a single
+``INSERT ... SELECT ... GROUP BY ... ON CONFLICT`` over the season's
+SessionResult rows, so a re-ingested round replaces its contribution instead of
+being counted twice. The drivers endpoint then reads the counters and running
+sums in one query instead of rebuilding them in Python.
+"""
+from datetime import datetime
+from sqlalchemy import func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from f1_api.models.f1_schemas import Drivers, DriverSeason, DriverSeasonStats, SessionResult, Sessions
+from f1_api.models.repositories.sessions_results_repository import driver_stat_aggregates
+
+STAT_COLUMNS = list(driver_stat_aggregates())
+
+class DriverSeasonStatsRepository:
+    def __init__(self, session: Session, year: int):
+        self.session = session
+        self.season = year
+
+    def refresh(self, driver_ids=None) -> dict:
+        """Recomputes the season rows of the given drivers (all of them when None) from SessionResult"""
+        aggregates = driver_stat_aggregates()
+        query = (
+            select(
+                SessionResult.season_id,
+                SessionResult.driver_id,
+                *[expression.label(column) for column, expression in aggregates.items()],
+                literal(datetime.now()).label("updated_at"),
+            )
+            .where(SessionResult.season_id == self.season)
+            .group_by(SessionResult.season_id, SessionResult.driver_id)
+        )
+        if driver_ids is not None:
+            driver_ids = {driver_id for driver_id in driver_ids if driver_id is not None}
+            if not driver_ids:
+                return {"inserted": 0, "updated": 0}
+            query = query.where(SessionResult.driver_id.in_(driver_ids))
+        table = DriverSeasonStats.__table__
+        stmt = insert(table).from_select(["season_id", "driver_id", *aggregates, "updated_at"], query)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["season_id", "driver_id"],
+            set_={column: stmt.excluded[column] for column in [*STAT_COLUMNS, "updated_at"]},
+            where=or_(*(table.c[column].is_distinct_from(stmt.excluded[column]) for column in STAT_COLUMNS))
+        ).returning(literal_column("xmax = 0").label("inserted"))
+        counts = {"inserted": 0, "updated": 0}
+        for (inserted,) in self.session.execute(stmt):
+            counts["inserted" if inserted else "updated"] += 1
+        return counts
+
+    def backfill(self) -> dict:
+        """Builds the season rows when the season has results but no stats yet"""
+        has_stats = self.session.exec(
+            select(DriverSeasonStats.driver_id).where(DriverSeasonStats.season_id == self.season)
+        ).first()
+        if has_stats is not None:
+            return {"inserted": 0, "updated": 0}
+        return self.refresh()
+
+    def get_drivers_with_stats(self) -> list:
+        """
+        (driver, stats or None, max_round, sprint_rounds) for every driver of the
+        season, by points. Reads the latest season with stats when this one has none yet.
+        """
+        stats_season = func.coalesce(
+            select(DriverSeasonStats.season_id)
+            .where(DriverSeasonStats.season_id == self.season)
+            .limit(1)
+            .scalar_subquery(),
+            select(func.max(DriverSeasonStats.season_id)).scalar_subquery(),
+        )
+        max_round = (
+            select(func.max(DriverSeasonStats.last_round))
+            .where(DriverSeasonStats.season_id == stats_season)
+            .scalar_subquery()
+        )
+        sprint_rounds = (
+            select(func.count())
+            .select_from(Sessions)
+            .where(
+                Sessions.season_id == stats_season,
+                Sessions.session_type == "Sprint",
+                Sessions.round_number <= max_round
+            )
+            .scalar_subquery()
+        )
+        return self.session.exec(
+            select(Drivers, DriverSeasonStats, func.coalesce(max_round, 0), sprint_rounds)
+            .select_from(Drivers)
+            .join(DriverSeason, (DriverSeason.driver_id == Drivers.id) & (DriverSeason.season_id == stats_season))
+            .outerjoin(
+                DriverSeasonStats,
+                (DriverSeasonStats.driver_id == Drivers.id) & (DriverSeasonStats.season_id == stats_season)
+            )
+            .order_by(func.coalesce(DriverSeasonStats.points, 0).desc(), Drivers.id)
+        ).all()
@@ -1,5 +1,6 @@
+from sqlalchemy import case
 from sqlmodel import Session, select, func
-from f1_api.models.f1_schemas import DriverTeamLink, Teams
+from f1_api.models.f1_schemas import DriverTeamLink, SessionResult, Teams
 
 class DriverTeamLinkRepository:
     def __init__(self, session: Session):
@@ -11,6 +12,29 @@ class DriverTeamLinkRepository:
     def get_existing_links(self):
         return set(self.session.exec(select(DriverTeamLink.driver_id, DriverTeamLink.team_id, DriverTeamLink.round_number)).all())
     
+    def get_missing_links(self, season_year: int, rounds=None) -> list[tuple[int, int]]:
+        """
+        (driver_id, round_number) pairs of a season (or of some of its rounds)
+        with SessionResults but no DriverTeamLink, found with a single anti-join
+        """
+        query = (
+            select(SessionResult.driver_id, SessionResult.round_number)
+            .outerjoin(
+                DriverTeamLink,
+                (DriverTeamLink.driver_id == SessionResult.driver_id) &
+                (DriverTeamLink.round_number == SessionResult.round_number) &
+                (DriverTeamLink.season_id == SessionResult.season_id)
+            )
+            .where(
+                SessionResult.season_id == season_year,
+                DriverTeamLink.driver_id == None
+            )
+            .distinct()
+        )
+        if rounds is not None:
+            query = query.where(SessionResult.round_number.in_(rounds))
+        return list(self.session.exec(query).all())
+    
     def get_latest_round_for_season(self, season_year: int) -> int | None:
         """Get the latest round number for a given season"""
         result = self.session.exec(
@@ -54,3 +78,36 @@ class DriverTeamLinkRepository:
         ).all()
         
         return {driver_id: team_name for driver_id, team_name in results}
+
+    def get_driver_team_names(self, driver_ids, round_number: int, season_year: int | None = None) -> dict[int, str]:
+        """
+        driver_id -> team_name of each driver at a round, falling back to the
+        driver's latest link when there is none at that round, in one query.
+        """
+        driver_ids = list(driver_ids)
+        if not driver_ids:
+            return {}
+        at_round = DriverTeamLink.round_number == round_number
+        if season_year is not None:
+            at_round = at_round & (DriverTeamLink.season_id == season_year)
+        ranked = (
+            select(
+                DriverTeamLink.driver_id,
+                Teams.team_name,
+                func.row_number().over(
+                    partition_by=DriverTeamLink.driver_id,
+                    order_by=(
+                        case((at_round, 0), else_=1),
+                        DriverTeamLink.season_id.desc(),
+                        DriverTeamLink.round_number.desc()
+                    )
+                ).label("link_rank")
+            )
+            .join(Teams, DriverTeamLink.team_id == Teams.id)
+            .where(DriverTeamLink.driver_id.in_(driver_ids))
+            .subquery()
+        )
+        results = self.session.exec(
+            select(ranked.c.driver_id, ranked.c.team_name).where(ranked.c.link_rank == 1)
+        ).all()
+        return {driver_id: team_name for driver_id, team_name in results}
@@ -0,0 +1,126 @@
+"""
+Change-set computation for dry-run ingestion.
+
+DryRunRepository has the BulkUpsertRepository interface but only reads: each
+upsert compares its rows with the stored ones (one query per batch) and records
+what the real upsert would insert or update. Rows a previous call would have
+written are kept as pending state, so a streamed run does not count a new
+driver or team once per round.
+"""
+import json
+import math
+from sqlalchemy import tuple_
+from sqlmodel import Session, select
+from f1_api.models.f1_schemas import Drivers, DriverSeason
+from f1_api.models.repositories.bulk_upsert_repository import BulkUpsertRepository, BATCH_SIZE
+
+MAX_SAMPLE_CHANGES = 5
+
+def _same(a, b) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return str(a) == str(b)
+
+class DryRunRepository(BulkUpsertRepository):
+    def __init__(self, session: Session, batch_size: int = BATCH_SIZE):
+        super().__init__(session, batch_size)
+        self.changes = {}
+        self._pending = {}
+
+    def upsert_drivers(self, rows: list[dict]) -> dict:
+        """Same rule as the drivers upsert: a season older than last_season changes nothing, headshot_url only with the team"""
+        rows = list({row["driver_key"]: row for row in rows}.values())
+        def diff(existing: dict, row: dict) -> dict:
+            if existing["last_season"] is not None and row["last_season"] < existing["last_season"]:
+                return {}
+            changed = {
+                column: [existing[column], row[column]]
+                for column in ("driver_number", "acronym", "driver_color", "last_season")
+                if not _same(existing[column], row[column])
+            }
+            if not _same(existing["team_key"], row["team_key"]):
+                changed["team_key"] = [existing["team_key"], row["team_key"]]
+                changed["headshot_url"] = [existing["headshot_url"], row["headshot_url"]]
+            return changed
+        compared = ["driver_number", "acronym", "driver_color", "headshot_url", "team_key", "last_season"]
+        return self._diff(Drivers, rows, ["driver_key"], compared, diff)
+
+    def upsert_driver_seasons(self, rows: list[dict]) -> dict:
+        """Keyed on the season's car number, the driver id of a new driver is not known yet"""
+        return self._upsert(DriverSeason, rows, ["season_id", "driver_number"], ["acronym", "driver_color", "headshot_url"])
+
+    def _upsert(self, model, rows: list[dict], index_elements: list[str], update_columns: list[str] | None = None) -> dict:
+        def diff(existing: dict, row: dict) -> dict:
+            return {
+                column: [existing[column], row.get(column)]
+                for column in update_columns or []
+                if not _same(existing[column], row.get(column))
+            }
+        return self._diff(model, rows, index_elements, update_columns or [], diff)
+
+    def _diff(self, model, rows: list[dict], keys: list[str], compared: list[str], diff) -> dict:
+        table = model.__table__
+        name = table.name
+        pending = self._pending.setdefault(name, {})
+        changes = self.changes.setdefault(name, {"inserted": [], "updated": []})
+        counts = {"inserted": 0, "updated": 0}
+        rows = list({tuple(row[k] for k in keys): row for row in rows}.values())
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            stored = self._stored(table, keys, compared, [tuple(row[k] for k in keys) for row in batch])
+            for row in batch:
+                key = tuple(row[k] for k in keys)
+                existing = pending[key] if key in pending else stored.get(key)
+                if existing is None:
+                    changes["inserted"].append(row)
+                    counts["inserted"] += 1
+                    pending[key] = {column: row.get(column) for column in compared}
+                    continue
+                changed = diff(existing, row)
+                if changed:
+                    changes["updated"].append({"key": dict(zip(keys, key)), "changes": changed})
+                    counts["updated"] += 1
+                    pending[key] = {**existing, **{column: new for column, (_, new) in changed.items()}}
+        return counts
+
+    def _stored(self, table, keys: list[str], compared: list[str], batch_keys: list[tuple]) -> dict:
+        key_columns = [table.c[k] for k in keys]
+        key_filter = tuple_(*key_columns).in_(batch_keys) if len(keys) > 1 else key_columns[0].in_([k[0] for k in batch_keys])
+        stored = {}
+        for record in self.session.execute(select(*key_columns, *[table.c[c] for c in compared]).where(key_filter)):
+            values = tuple(record)
+            stored[values[:len(keys)]] = dict(zip(compared, values[len(keys):]))
+        return stored
+
+    def missing_season(self, year: int):
+        self.changes["seasons"] = {"inserted": [{"year": year}], "updated": []}
+
+    def new_keys(self, table_name: str, column: str) -> list:
+        """Values of a column in the rows that would be inserted into a table"""
+        return [row[column] for row in self.changes.get(table_name, {}).get("inserted", [])]
+
+    @property
+    def summary(self) -> dict:
+        """Compact change set: counts and changed columns per table, with a few sample rows"""
+        summary = {}
+        for name, changes in self.changes.items():
+            columns = {}
+            for update in changes["updated"]:
+                for column in update["changes"]:
+                    columns[column] = columns.get(column, 0) + 1
+            summary[name] = {
+                "inserted": len(changes["inserted"]),
+                "updated": len(changes["updated"]),
+                "updated_columns": columns,
+                "sample_updates": changes["updated"][:MAX_SAMPLE_CHANGES],
+            }
+        return summary
+
+    def write_changes(self, path: str) -> str:
+        """Writes the detailed change set as JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.changes, f, indent=2, default=str)
+        return path
+
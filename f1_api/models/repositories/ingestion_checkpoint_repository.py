@@ -0,0 +1,60 @@
+"""Stage checkpoints of unfinished ingestion runs, one row per (season, round, stage) completed"""
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from f1_api.models.f1_schemas import IngestionCheckpoint
+
+# Checkpoints older than this are from an abandoned run and are not resumed
+CHECKPOINT_MAX_AGE = timedelta(hours=24)
+
+class IngestionCheckpointRepository:
+    def __init__(self, session: Session, year: int):
+        self.session = session
+        self.season = year
+        self._completed = None
+
+    @property
+    def completed(self) -> dict[tuple[int, str], IngestionCheckpoint]:
+        """(round_number, stage) -> checkpoint of the season"""
+        if self._completed is None:
+            checkpoints = self.session.exec(
+                select(IngestionCheckpoint).where(IngestionCheckpoint.season_id == self.season)
+            ).all()
+            self._completed = {(c.round_number, c.stage): c for c in checkpoints}
+        return self._completed
+
+    def is_done(self, round_number: int, stage: str) -> bool:
+        return (round_number, stage) in self.completed
+
+    def get(self, round_number: int, stage: str) -> IngestionCheckpoint | None:
+        return self.completed.get((round_number, stage))
+
+    def mark(self, round_number: int, stage: str, sessions: list | None = None):
+        """Adds the checkpoint to the session, committed together with the stage's writes"""
+        checkpoint = IngestionCheckpoint(
+            season_id=self.season, round_number=round_number, stage=stage,
+            sessions=[list(key) for key in sessions] if sessions is not None else None
+        )
+        self.session.merge(checkpoint)
+        self.completed[(round_number, stage)] = checkpoint
+
+    def clear(self, round_number: int | None = None):
+        """Drops the checkpoints of a finished round, or of the whole season"""
+        stmt = delete(IngestionCheckpoint).where(IngestionCheckpoint.season_id == self.season)
+        if round_number is not None:
+            stmt = stmt.where(IngestionCheckpoint.round_number == round_number)
+        self.session.execute(stmt)
+        self._completed = None
+
+    def discard_stale(self, now: datetime | None = None) -> list[tuple[int, int]]:
+        """Drops the checkpoints of an abandoned run, returns the (round, session) extracts they kept"""
+        now = now or datetime.now()
+        stale = [c for c in self.completed.values() if c.completed_at < now - CHECKPOINT_MAX_AGE]
+        extracts = []
+        for checkpoint in stale:
+            if checkpoint.stage == "loading_sessions":
+                extracts.extend((rn, sn) for rn, sn in checkpoint.sessions or [])
+            self.session.delete(checkpoint)
+        if stale:
+            self._completed = None
+        return extracts
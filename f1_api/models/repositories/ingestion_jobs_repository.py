@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from f1_api.models.f1_schemas import IngestionJob
+
+ACTIVE_STATUSES = ("queued", "running", "cancelling")
+# First key of the two-int advisory lock a worker holds while it runs a season, the season is the second
+INGESTION_LOCK_NAMESPACE = 8001
+# A job reserved for a worker that has not started it after this long is considered dead.
+# Running jobs are alive as long as their worker holds the season lock, however long a load takes.
+STALE_AFTER = timedelta(minutes=15)
+
+class IngestionJobsRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_id(self, job_id: int) -> IngestionJob | None:
+        return self.session.get(IngestionJob, job_id)
+
+    def get_recent(self, limit: int = 20) -> list[IngestionJob]:
+        return list(self.session.exec(
+            select(IngestionJob).order_by(IngestionJob.id.desc()).limit(limit)
+        ))
+
+    def get_latest_finished_by_season(self) -> list[IngestionJob]:
+        """Latest completed or failed job of every season"""
+        latest = (
+            select(func.max(IngestionJob.id))
+            .where(IngestionJob.status.in_(("completed", "failed")))
+            .group_by(IngestionJob.season_id)
+        )
+        return list(self.session.exec(select(IngestionJob).where(IngestionJob.id.in_(latest))))
+
+    def count_by_status(self) -> dict:
+        return dict(self.session.exec(
+            select(IngestionJob.status, func.count(IngestionJob.id)).group_by(IngestionJob.status)
+        ).all())
+
+    def get_active_for_season(self, season_year: int) -> IngestionJob | None:
+        """Queued or running job of a season"""
+        return self.session.exec(
+            select(IngestionJob).where(
+                IngestionJob.season_id == season_year,
+                IngestionJob.status.in_(ACTIVE_STATUSES)
+            )
+        ).first()
+
+    def fail_dead_jobs(self, season_year: int) -> list[int]:
+        """
+        Fails the active jobs of a season whose worker is gone: running without
+        holding the season's advisory lock, or reserved for a worker that never
+        started them. Returns their ids.
+        """
+        job_ids = self.session.execute(text(
+            """
+            UPDATE ingestionjob j
+            SET status = 'failed', error = 'Worker exited without finishing the job',
+                finished_at = now(), updated_at = now()
+            WHERE j.season_id = :season AND j.status IN ('queued', 'running', 'cancelling')
+              AND (j.status <> 'queued' OR (j.worker_pid IS NOT NULL AND j.updated_at < :reserved_before))
+              AND NOT EXISTS (
+                SELECT 1 FROM pg_locks l
+                WHERE l.locktype = 'advisory' AND l.granted AND l.objsubid = 2
+                  AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+                  AND l.classid::bigint = :namespace AND l.objid::bigint = j.season_id
+              )
+            RETURNING j.id
+            """
+        ), {
+            "season": season_year,
+            "namespace": INGESTION_LOCK_NAMESPACE,
+            "reserved_before": datetime.now() - STALE_AFTER,
+        }).scalars().all()
+        self.session.commit()
+        return list(job_ids)
+
+    def create_job(self, season_year: int, scope: dict | None = None, worker_pid: int | None = None) -> IngestionJob | None:
+        """
+        Creates a queued job, worker_pid 0 marks it as reserved for a worker being started.
+        Returns None when the season already has an active job (uq_ingestionjob_active_season).
+        """
+        table = IngestionJob.__table__
+        values = IngestionJob(season_id=season_year, scope=scope, worker_pid=worker_pid).model_dump(exclude={"id"})
+        job_id = self.session.execute(
+            insert(table).values(**values)
+            .on_conflict_do_nothing(index_elements=["season_id"], index_where=table.c.status.in_(ACTIVE_STATUSES))
+            .returning(table.c.id)
+        ).scalar()
+        self.session.commit()
+        return self.get_by_id(job_id) if job_id is not None else None
+
+    def claim_next_queued(self, worker_pid: int) -> int | None:
+        """
+        Atomically assigns the oldest queued job without a worker to this worker,
+        SKIP LOCKED lets several backfill workers claim concurrently.
+        """
+        job_id = self.session.execute(text(
+            """
+            UPDATE ingestionjob SET worker_pid = :pid, updated_at = now()
+            WHERE id = (
+                SELECT id FROM ingestionjob
+                WHERE status = 'queued' AND worker_pid IS NULL AND NOT cancel_requested
+                ORDER BY id LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id
+            """
+        ), {"pid": worker_pid}).scalar()
+        self.session.commit()
+        return job_id
+
+    def update_job(self, job: IngestionJob, **fields) -> IngestionJob:
+        for key, value in fields.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.now()
+        self.session.add(job)
+        self.session.commit()
+        return job
@@ -0,0 +1,120 @@
+"""
+Ingestion watermarks, one row per (season, round, session) already ingested.
+
+Each watermark keeps a checksum of the session's stored results. When a
+reload stores different results (a post-race penalty, a corrected
+classification) the watermark becomes 'changed' instead of 'completed', so
+the session stays in the pending plan and is reloaded by the next run until
+two loads agree.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from sqlmodel import Session, select
+from f1_api.models.f1_schemas import Events, IngestionState, SessionResult, Sessions
+
+# Sessions of a round become ingestible this many days before its race day
+WEEKEND_LEAD_DAYS = 3
+
+class IngestionStateRepository:
+    def __init__(self, session: Session, year: int):
+        self.session = session
+        self.season = year
+
+    def get_ingested_sessions(self) -> set[tuple[int, int]]:
+        """(round_number, session_number) pairs whose results are already stored"""
+        return set(self.session.exec(
+            select(IngestionState.round_number, IngestionState.session_number)
+            .where(
+                IngestionState.season_id == self.season,
+                IngestionState.status == "completed"
+            )
+        ).all())
+
+    def backfill_from_results(self) -> int:
+        """
+        Seeds the watermarks from SessionResult when the season has none yet,
+        so trees ingested before this table existed are not reloaded.
+        """
+        has_state = self.session.exec(
+            select(IngestionState.round_number).where(IngestionState.season_id == self.season)
+        ).first()
+        if has_state is not None:
+            return 0
+        keys = self.session.exec(
+            select(SessionResult.round_number, SessionResult.session_number)
+            .where(SessionResult.season_id == self.season)
+            .distinct()
+        ).all()
+        return len(self.record_sessions(keys))
+
+    def get_pending_sessions(self, now: datetime | None = None) -> set[tuple[int, int]] | None:
+        """
+        Plans the run from the DB alone: scheduled sessions of started weekends
+        without a completed watermark. Returns None when the season schedule is
+        not stored yet and a full pass is needed.
+        """
+        now = now or datetime.now()
+        scheduled = self.session.exec(
+            select(Sessions.round_number, Sessions.session_number)
+            .join(Events, (Events.round_number == Sessions.round_number) & (Events.season_id == Sessions.season_id))
+            .where(
+                Sessions.season_id == self.season,
+                Events.date_start <= now + timedelta(days=WEEKEND_LEAD_DAYS)
+            )
+        ).all()
+        if not scheduled:
+            has_schedule = self.session.exec(
+                select(Events.round_number).where(Events.season_id == self.season)
+            ).first()
+            return set() if has_schedule is not None else None
+        return set(scheduled) - self.get_ingested_sessions()
+
+    def record_sessions(self, keys) -> list[IngestionState]:
+        """
+        Upserts the watermark of each (round, session) from its stored SessionResult
+        rows, a session whose checksum differs from the last load stays pending
+        """
+        keys = set(keys)
+        if not keys:
+            return []
+        rounds = {round_number for round_number, _ in keys}
+        rows = self.session.exec(
+            select(SessionResult)
+            .where(
+                SessionResult.season_id == self.season,
+                SessionResult.round_number.in_(rounds)
+            )
+        ).all()
+        rows_by_key = {}
+        for r in rows:
+            rows_by_key.setdefault((r.round_number, r.session_number), []).append(r)
+        states = []
+        for round_number, session_number in sorted(keys):
+            session_rows = rows_by_key.get((round_number, session_number), [])
+            state = self.session.get(IngestionState, (self.season, round_number, session_number))
+            if state is None:
+                state = IngestionState(season_id=self.season, round_number=round_number, session_number=session_number, status="empty")
+            checksum = self._checksum(session_rows)
+            if not session_rows:
+                state.status = "empty"
+            elif state.status in ("completed", "changed") and state.checksum not in (None, checksum):
+                logging.info(f"Results of session {session_number} of round {round_number} changed since their last load, "
+                             f"keeping it pending")
+                state.status = "changed"
+            else:
+                state.status = "completed"
+            state.row_count = len(session_rows)
+            state.checksum = checksum
+            state.loaded_at = datetime.now()
+            self.session.add(state)
+            states.append(state)
+        return states
+
+    @staticmethod
+    def _checksum(rows: list[SessionResult]) -> str:
+        payload = "|".join(sorted(
+            f"{r.driver_id},{r.position},{r.grid_position},{r.points},{r.status},{r.fastest_lap}"
+            for r in rows
+        ))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
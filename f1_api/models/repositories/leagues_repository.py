@@ -1,7 +1,11 @@
 import secrets
 import string
-from sqlmodel import Session, select
-from f1_api.models.app_models import LeagueCreate, LeagueJoin, Leagues
+from datetime import datetime
+from sqlalchemy import case
+from sqlmodel import Session, func, select
+from f1_api.models.app_models import (
+    DriverOwnership, LeagueCreate, LeagueJoin, Leagues, MarketTransactions, UserLeagueLink, UserTeams
+)
 
 class LeaguesRepository:
     def __init__(self,  session: Session):
@@ -50,3 +54,29 @@ class LeaguesRepository:
                 Leagues.is_active == True
             )
         ).first()
+
+    def get_change_marker(self, league_id: int) -> tuple:
+        """
+        One row that changes whenever the league's ownerships, transactions,
+        participants or teams do (including a purchase lock running out),
+        read with a single query to validate the ETags of the league routes
+        """
+        now = datetime.now()
+        def of_league(model, *columns):
+            return [
+                select(column).select_from(model).where(model.league_id == league_id).scalar_subquery()
+                for column in columns
+            ]
+        return tuple(self.session.exec(select(
+            Leagues.name, Leagues.description, Leagues.is_active, Leagues.admin_user_id,
+            *of_league(
+                DriverOwnership, func.count(), func.max(DriverOwnership.updated_at),
+                func.sum(case((DriverOwnership.locked_until > now, 1), else_=0))
+            ),
+            *of_league(MarketTransactions, func.max(MarketTransactions.id)),
+            *of_league(
+                UserLeagueLink, func.count(), func.max(UserLeagueLink.joined_at),
+                func.sum(case((UserLeagueLink.is_active, 1), else_=0))
+            ),
+            *of_league(UserTeams, func.count(), func.max(UserTeams.updated_at)),
+        ).where(Leagues.id == league_id)).first() or ())
@@ -0,0 +1,113 @@
+"""Ingestion-wide identity maps for driver and team id lookups"""
+from sqlmodel import Session, select
+from f1_api.models.f1_schemas import DriverSeason, Teams
+
+class _LookupMap:
+    """
+    Key -> value map loaded with one query on first use.
+
+    A key missing from the map is looked up with a targeted query, so rows
+    inserted after the load are picked up; keys that are still unknown are
+    remembered until invalidate() is called.
+    """
+    def __init__(self, load_all, load_one):
+        self._load_all = load_all
+        self._load_one = load_one
+        self._values = None
+        self._unknown = set()
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+
+    def get(self, key):
+        if self._values is None:
+            self._values = self._load_all()
+            self.queries += 1
+        if key in self._values:
+            self.hits += 1
+            return self._values[key]
+        self.misses += 1
+        if key in self._unknown:
+            return None
+        value = self._load_one(key)
+        self.queries += 1
+        if value is None:
+            self._unknown.add(key)
+        else:
+            self._values[key] = value
+        return value
+
+    def put(self, key, value):
+        if self._values is None:
+            self._values = self._load_all()
+            self.queries += 1
+        self._values[key] = value
+        self._unknown.discard(key)
+
+    def invalidate(self):
+        self._unknown.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "queries": self.queries}
+
+class IngestionLookupRegistry:
+    """
+    Loads driver_number -> id and team_name -> id once per ingestion run.
+    Car numbers are reused across seasons, they resolve through the season's DriverSeason rows.
+    """
+    def __init__(self, session: Session, year: int):
+        self.session = session
+        self.year = year
+        self._driver_ids = _LookupMap(self._all_driver_ids, self._one_driver_id)
+        self._team_ids = _LookupMap(self._all_team_ids, self._one_team_id)
+        self._provisional_ids = 0
+
+    def driver_id(self, driver_number: int) -> int | None:
+        return self._driver_ids.get(int(driver_number))
+
+    def team_id(self, team_name: str) -> int | None:
+        return self._team_ids.get(team_name)
+
+    def add_provisional(self, driver_numbers=(), team_names=()):
+        """
+        Negative placeholder ids for drivers and teams a dry run would insert,
+        so later stages still produce their links and results
+        """
+        for driver_number in driver_numbers:
+            if self.driver_id(driver_number) is None:
+                self._provisional_ids -= 1
+                self._driver_ids.put(int(driver_number), self._provisional_ids)
+        for team_name in team_names:
+            if self.team_id(team_name) is None:
+                self._provisional_ids -= 1
+                self._team_ids.put(team_name, self._provisional_ids)
+
+    def invalidate(self):
+        """Forget unknown keys, called after ingestion writes drivers or teams"""
+        for lookup in (self._driver_ids, self._team_ids):
+            lookup.invalidate()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "driver_ids": self._driver_ids.stats,
+            "team_ids": self._team_ids.stats,
+        }
+
+    def _all_driver_ids(self) -> dict:
+        return dict(self.session.exec(
+            select(DriverSeason.driver_number, DriverSeason.driver_id).where(DriverSeason.season_id == self.year)
+        ).all())
+
+    def _one_driver_id(self, driver_number: int) -> int | None:
+        return self.session.exec(
+            select(DriverSeason.driver_id)
+            .where(DriverSeason.season_id == self.year, DriverSeason.driver_number == driver_number)
+        ).first()
+
+    def _all_team_ids(self) -> dict:
+        return dict(self.session.exec(select(Teams.team_name, Teams.id)).all())
+
+    def _one_team_id(self, team_name: str) -> int | None:
+        return self.session.exec(select(Teams.id).where(Teams.team_name == team_name)).first()
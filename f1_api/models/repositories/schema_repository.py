@@ -0,0 +1,216 @@
+"""
+Idempotent schema upgrades for databases created before the current models.
+
+The tables ingestion writes (INGESTION_TABLES) are created when missing, so a
+database set up before them does not need config/sql_init.py to be re-run.
+SQLModel.metadata.create_all only creates missing tables, it never adds a
+constraint to a table that already exists. The ON CONFLICT upserts of
+BulkUpsertRepository need a unique index on their conflict target, so
+ensure_ingestion_schema() removes the duplicate rows of an existing table
+(pointing every reference at the row that is kept) and then runs
+CREATE UNIQUE INDEX IF NOT EXISTS. It runs under a transaction-level advisory
+lock, so parallel backfill workers do not race on it.
+
+Drivers used to be keyed on driver_number, which merged every driver who
+raced with a number in any season. The upgrade adds driver_key and
+last_season, fills them from the stored names and links, drops the old unique
+constraint and seeds the DriverSeason rows from the DriverTeamLinks.
+
+The single-flight index of IngestionJob (one active job per season) is built
+after failing all but the newest active job of each season.
+"""
+import logging
+from sqlalchemy import UniqueConstraint, text
+from sqlmodel import Session, SQLModel
+from f1_api.models.f1_schemas import (
+    DataVersion, Drivers, DriverSeason, DriverSeasonStats, IngestionCheckpoint, IngestionJob, IngestionState,
+    TeamRoster, Teams
+)
+
+# First key of the two-int advisory lock held while the schema is upgraded
+SCHEMA_LOCK_NAMESPACE = 7_002
+# (model, column, type) added to tables created by an earlier schema
+ADDED_COLUMNS = [
+    (Drivers, "driver_key", "VARCHAR"),
+    (Drivers, "last_season", "INTEGER"),
+    (Drivers, "team_key", "VARCHAR"),
+]
+# (model, columns) of unique constraints an earlier schema had
+DROPPED_UNIQUE = [
+    (Drivers, ["driver_number"]),
+]
+# (model, unique columns, index name) the ingestion upserts conflict on
+UNIQUE_INDEXES = [
+    (Teams, ["team_name"], "uq_teams_team_name"),
+    (Drivers, ["driver_key"], "uq_drivers_driver_key"),
+]
+
+# Tables ingestion writes that a database created by an earlier schema may lack
+INGESTION_TABLES = [DriverSeason, DriverSeasonStats, TeamRoster, IngestionState, IngestionCheckpoint, DataVersion, IngestionJob]
+
+_ensured = False
+
+class SchemaRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def ensure_unique(self, model, columns: list[str], index_name: str) -> int:
+        """Dedupes a table on columns (keeping the lowest id) and creates its unique index, returns the rows removed"""
+        table = model.__table__
+        if self._index_exists(table.name, columns):
+            return 0
+        keys = ", ".join(columns)
+        # NULL keys never collide in a unique index, they are not duplicates
+        not_null = " AND ".join(f"{column} IS NOT NULL" for column in columns)
+        duplicates = (
+            f"SELECT id AS dup_id, keep_id FROM ("
+            f"SELECT id, min(id) OVER (PARTITION BY {keys}) AS keep_id FROM {table.name} WHERE {not_null}"
+            f") ranked WHERE id <> keep_id"
+        )
+        removed = self.session.execute(text(f"SELECT count(*) FROM ({duplicates}) d")).scalar()
+        if removed:
+            logging.warning(f"Removing {removed} duplicate {table.name} rows before indexing {keys}")
+            for referencing, column, unique_sets in self._references(table):
+                for unique_columns in unique_sets:
+                    # Rows that would collide once repointed keep only the one with the lowest id
+                    same = "".join(f" AND r2.{c} IS NOT DISTINCT FROM r.{c}" for c in unique_columns if c != column)
+                    self.session.execute(text(
+                        f"DELETE FROM {referencing} r USING ({duplicates}) d "
+                        f"WHERE r.{column} = d.dup_id AND EXISTS ("
+                        f"SELECT 1 FROM {referencing} r2 LEFT JOIN ({duplicates}) d2 ON r2.{column} = d2.dup_id "
+                        f"WHERE coalesce(d2.keep_id, r2.{column}) = d.keep_id AND r2.{column} < r.{column}{same})"
+                    ))
+                self.session.execute(text(
+                    f"UPDATE {referencing} r SET {column} = d.keep_id FROM ({duplicates}) d WHERE r.{column} = d.dup_id"
+                ))
+            self.session.execute(text(f"DELETE FROM {table.name} WHERE id IN (SELECT dup_id FROM ({duplicates}) d)"))
+        self.session.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table.name} ({keys})"))
+        return removed
+
+    def add_column(self, model, column: str, column_type: str) -> None:
+        self.session.execute(text(f"ALTER TABLE {model.__table__.name} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+
+    def drop_unique(self, model, columns: list[str]) -> None:
+        """Drops the unique constraints and indexes covering exactly these columns"""
+        table_name = model.__table__.name
+        for index_name, constraint_name in self._unique_indexes(table_name, columns):
+            logging.info(f"Dropping unique {constraint_name or index_name} of {table_name} ({', '.join(columns)})")
+            if constraint_name:
+                self.session.execute(text(f'ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS "{constraint_name}"'))
+            else:
+                self.session.execute(text(f'DROP INDEX IF EXISTS "{index_name}"'))
+
+    def backfill_drivers(self) -> int:
+        """Fills driver_key and last_season of drivers stored before they existed, returns the keys set"""
+        # drivers_utility imports this package, a module-level import would be circular
+        from f1_api.models.lib.drivers_utility import DriversUtility
+        keys = []
+        for driver_id, full_name in self.session.execute(text("SELECT id, full_name FROM drivers WHERE driver_key IS NULL")):
+            try:
+                keys.append({"id": driver_id, "driver_key": DriversUtility.create_driver_id(full_name)})
+            except ValueError as e:
+                logging.warning(f"Driver {driver_id} keeps no driver_key: {e}")
+        if keys:
+            self.session.execute(text("UPDATE drivers SET driver_key = :driver_key WHERE id = :id"), keys)
+        self.session.execute(text(
+            """
+            UPDATE drivers d SET last_season = l.season_id
+            FROM (SELECT driver_id, max(season_id) AS season_id FROM driverteamlink GROUP BY driver_id) l
+            WHERE d.id = l.driver_id AND d.last_season IS NULL
+            """
+        ))
+        return len(keys)
+
+    def backfill_driver_seasons(self) -> None:
+        """Seeds DriverSeason from the DriverTeamLinks when the table is still empty"""
+        if self.session.execute(text("SELECT 1 FROM driverseason LIMIT 1")).first() is not None:
+            return
+        self.session.execute(text(
+            """
+            INSERT INTO driverseason (season_id, driver_id, driver_number, acronym, driver_color, headshot_url)
+            SELECT DISTINCT l.season_id, d.id, d.driver_number, d.acronym, d.driver_color, d.headshot_url
+            FROM driverteamlink l JOIN drivers d ON d.id = l.driver_id
+            ON CONFLICT DO NOTHING
+            """
+        ))
+
+    def ensure_single_active_jobs(self) -> None:
+        """Fails every active job but the newest of its season and builds uq_ingestionjob_active_season"""
+        index = next(i for i in IngestionJob.__table__.indexes if i.name == "uq_ingestionjob_active_season")
+        if self.session.execute(text("SELECT to_regclass(:name)"), {"name": index.name}).scalar() is not None:
+            return
+        superseded = self.session.execute(text(
+            """
+            UPDATE ingestionjob SET status = 'failed', error = 'Superseded by a newer job of the season',
+                finished_at = now(), updated_at = now()
+            WHERE status IN ('queued', 'running', 'cancelling') AND id NOT IN (
+                SELECT max(id) FROM ingestionjob
+                WHERE status IN ('queued', 'running', 'cancelling') GROUP BY season_id
+            )
+            """
+        )).rowcount
+        if superseded:
+            logging.warning(f"Failed {superseded} duplicate active ingestion jobs before indexing")
+        index.create(self.session.connection())
+
+    def _index_exists(self, table_name: str, columns: list[str]) -> bool:
+        """True when a unique index or constraint already covers exactly these columns"""
+        return bool(self._unique_indexes(table_name, columns))
+
+    def _unique_indexes(self, table_name: str, columns: list[str]) -> list[tuple[str, str | None]]:
+        """(index name, backing constraint name or None) of the unique indexes covering exactly these columns"""
+        return [tuple(row) for row in self.session.execute(text(
+            """
+            SELECT ic.relname, c.conname FROM pg_index i
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_class ic ON ic.oid = i.indexrelid
+            LEFT JOIN pg_constraint c ON c.conindid = i.indexrelid AND c.contype = 'u'
+            WHERE t.relname = :table AND i.indisunique AND NOT i.indisprimary AND i.indpred IS NULL
+              AND (
+                SELECT array_agg(a.attname::text ORDER BY a.attname)
+                FROM pg_attribute a
+                WHERE a.attrelid = t.oid AND a.attnum = ANY(i.indkey)
+              ) = :columns
+            """
+        ), {"table": table_name, "columns": sorted(columns)})]
+
+    @staticmethod
+    def _references(table) -> list[tuple[str, str, list[list[str]]]]:
+        """(table, column, unique column sets containing it) of every foreign key to table.id"""
+        references = []
+        for referencing in SQLModel.metadata.sorted_tables:
+            for fk in referencing.foreign_keys:
+                if fk.column.table is not table or fk.column.name != "id":
+                    continue
+                column = fk.parent.name
+                unique_sets = [[c.name for c in referencing.primary_key.columns]]
+                unique_sets += [
+                    [c.name for c in constraint.columns]
+                    for constraint in referencing.constraints
+                    if isinstance(constraint, UniqueConstraint)
+                ]
+                references.append((
+                    referencing.name, column,
+                    [columns for columns in unique_sets if column in columns]
+                ))
+        return references
+
+def ensure_ingestion_schema(session: Session) -> None:
+    """Creates the missing ingestion tables and the unique indexes the upserts need, once per process"""
+    global _ensured
+    if _ensured:
+        return
+    session.execute(text("SELECT pg_advisory_xact_lock(:namespace, 0)"), {"namespace": SCHEMA_LOCK_NAMESPACE})
+    SQLModel.metadata.create_all(session.connection(), tables=[model.__table__ for model in INGESTION_TABLES])
+    repository = SchemaRepository(session)
+    for model, column, column_type in ADDED_COLUMNS:
+        repository.add_column(model, column, column_type)
+    repository.backfill_drivers()
+    for model, columns in DROPPED_UNIQUE:
+        repository.drop_unique(model, columns)
+    for model, columns, index_name in UNIQUE_INDEXES:
+        repository.ensure_unique(model, columns, index_name)
+    repository.backfill_driver_seasons()
+    repository.ensure_single_active_jobs()
+    session.commit()
+    _ensured = True
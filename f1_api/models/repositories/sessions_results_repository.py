@@ -1,7 +1,52 @@
 """Gets Teams data from the DB"""
+from sqlalchemy import Integer, and_, case, cast
 from sqlmodel import Session, func, select
 from f1_api.models.f1_schemas import Drivers, SessionResult, Sessions
 
+RACE_SESSION = 5
+SPRINT_SESSION = 3
+# Finish position counted for a race without a classified position
+UNCLASSIFIED_FINISH = 20
+
+def _count(condition):
+    return func.count().filter(condition)
+
+def _sum(value, condition):
+    return func.coalesce(func.sum(value).filter(condition), 0)
+
+def driver_stat_aggregates() -> dict:
+    """
+    Per-driver stats (poles, podiums, average finish...) as SQL expressions
+    over SessionResult, to be grouped by driver_id. Averages are kept as
+    {name}_sum / {name}_count so they can be combined and materialized.
+    """
+    r = SessionResult
+    race = r.session_number == RACE_SESSION
+    sprint = r.session_number == SPRINT_SESSION
+    classified = r.position.regexp_match("^[0-9]+$")
+    podium = r.position.in_(["1", "2", "3"])
+    started = r.grid_position > 0
+    finish = case((classified, cast(r.position, Integer)), else_=UNCLASSIFIED_FINISH)
+    overtake = case((and_(classified, started), cast(r.position, Integer) - r.grid_position), else_=0)
+    return {
+        "last_round": func.max(r.round_number),
+        "points": func.coalesce(func.sum(r.points), 0),
+        "poles": _count(and_(race, r.grid_position == 1)),
+        "pole_victories": _count(and_(race, r.grid_position == 1, r.position == "1")),
+        "podiums": _count(and_(race, podium)),
+        "victories": _count(and_(race, r.position == "1")),
+        "fastest_laps": _count(and_(race, r.fastest_lap.is_(True))),
+        "sprint_podiums": _count(and_(sprint, podium)),
+        "sprint_victories": _count(and_(sprint, r.position == "1")),
+        "sprint_poles": _count(and_(sprint, r.grid_position == 1)),
+        "finish_sum": _sum(finish, race),
+        "finish_count": _count(race),
+        "grid_sum": _sum(r.grid_position, and_(race, started)),
+        "grid_count": _count(and_(race, started)),
+        "overtake_sum": _sum(overtake, race),
+        "overtake_count": _count(race),
+    }
+
 class SessionResultsRepository:
     def __init__(self, year: int, session: Session, session_map=None, session_types_by_rn=None):
         self.season = year
@@ -46,3 +91,40 @@ class SessionResultsRepository:
             "all_results": all_results,
             "drivers": drivers
         }
+    def get_driver_stats(self, max_round: int | None = None) -> dict:
+        """
+        Driver stats of the season up to a round (the latest by default),
+        aggregated by Postgres with one row per driver. Reads the latest
+        season with results when this one has none yet.
+
+        Returns:
+            dict: max_round, sprint_rounds and stats (driver_id -> aggregates)
+        """
+        season = func.coalesce(
+            select(SessionResult.season_id)
+            .where(SessionResult.season_id == self.season)
+            .limit(1)
+            .scalar_subquery(),
+            select(func.max(SessionResult.season_id)).scalar_subquery(),
+        )
+        scope = [SessionResult.season_id == season]
+        if max_round is not None:
+            scope.append(SessionResult.round_number <= max_round)
+        aggregates = driver_stat_aggregates()
+        rows = self.session.exec(
+            select(SessionResult.driver_id, *[expression.label(name) for name, expression in aggregates.items()])
+            .where(*scope)
+            .group_by(SessionResult.driver_id)
+        ).all()
+        stats = {row.driver_id: {name: getattr(row, name) for name in aggregates} for row in rows}
+        last_round = max((driver_stats["last_round"] for driver_stats in stats.values()), default=0)
+        sprint_rounds = self.session.exec(
+            select(func.count())
+            .select_from(Sessions)
+            .where(
+                Sessions.season_id == season,
+                Sessions.session_type == "Sprint",
+                Sessions.round_number <= last_round
+            )
+        ).one() if last_round else 0
+        return {"max_round": last_round, "sprint_rounds": sprint_rounds, "stats": stats}
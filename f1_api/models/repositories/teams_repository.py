@@ -2,7 +2,7 @@
 from sqlmodel import Session, select, func
 from f1_api.controllers.season_context_controller import SeasonContextController
 from f1_api.data_sources.ff1_client import FastF1Client
-from f1_api.models.f1_schemas import DriverTeamLink, SessionResult, Teams
+from f1_api.models.f1_schemas import DriverTeamLink, SessionResult, TeamRoster, Teams
 
 class TeamsRepository:
     """Encapsulates DB logic for the Teams entity"""
@@ -24,6 +24,32 @@ class TeamsRepository:
             select(Teams.team_name)
         ).all())
     
+    def get_round_rosters(self, season: int) -> dict[int, list[str]]:
+        """round_number -> team names recorded for that round"""
+        rosters = {}
+        rows = self.session.exec(
+            select(TeamRoster.round_number, TeamRoster.team_name)
+            .where(TeamRoster.season_id == season)
+            .order_by(TeamRoster.round_number, TeamRoster.team_name)
+        ).all()
+        for round_number, team_name in rows:
+            rosters.setdefault(round_number, []).append(team_name)
+        return rosters
+
+    def get_roster_changes(self, season: int) -> list[dict]:
+        """Teams that joined or left the grid between consecutive recorded rounds"""
+        changes = []
+        previous = None
+        for round_number, teams in self.get_round_rosters(season).items():
+            if previous is not None and set(teams) != previous:
+                changes.append({
+                    "round_number": round_number,
+                    "joined": sorted(set(teams) - previous),
+                    "left": sorted(previous - set(teams)),
+                })
+            previous = set(teams)
+        return changes
+
     def get_team_points_data(self) -> list:
         """Get aggregated points data for all teams"""
         return self.session.exec(
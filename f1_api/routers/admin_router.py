@@ -1,12 +1,96 @@
 """Administrative routes"""
-from fastapi import APIRouter
-from f1_api.controllers.database_controller import update_db
-from f1_api.config.sql_init import engine
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from sqlmodel import Session
+from f1_api.controllers.ingestion_jobs_controller import IngestionJobsController
+from f1_api.controllers.ingestion_scheduler import get_scheduler
+from f1_api.controllers.response_cache import response_cache
+from f1_api.dependencies import get_db_session
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-@router.post("/season/")
-async def update_season():
-    """Update all data for the current season in the database"""
-    await update_db(engine)
-    return {"status": "updated"}
+@router.post("/season/", status_code=202)
+def update_season(season: int | None = None, force: bool = False, session: Session = Depends(get_db_session)):
+    """
+    Queue an ingestion of the season (current one by default), returns the job id
+
+    With INGESTION_CHECKPOINTS=1 a failed run resumes from its checkpoints,
+    ?force=true reloads the whole season instead.
+    """
+    with IngestionJobsController(session) as controller:
+        return controller.submit(season, force=force)
+
+@router.post("/season/{season}/dry-run", status_code=202)
+def dry_run_season(
+    season: int,
+    rounds: list[int] | None = Query(default=None),
+    session: Session = Depends(get_db_session)
+):
+    """Queue a dry run of the season's ingestion, the job summary lists what it would change"""
+    with IngestionJobsController(session) as controller:
+        return controller.submit(season, rounds=rounds, dry_run=True)
+
+@router.post("/season/{season}/rounds/{round_number}", status_code=202)
+def update_round(
+    season: int,
+    round_number: int,
+    sessions: list[str] | None = Query(default=None),
+    session: Session = Depends(get_db_session)
+):
+    """Queue an ingestion of a single round, optionally only some of its sessions (e.g. ?sessions=Race)"""
+    with IngestionJobsController(session) as controller:
+        return controller.submit(season, rounds=[round_number], sessions=sessions)
+
+@router.post("/backfill/", status_code=202)
+def backfill_seasons(
+    first_season: int,
+    last_season: int,
+    max_parallel: int | None = None,
+    session: Session = Depends(get_db_session)
+):
+    """Queue one ingestion job per season of the range, running up to max_parallel seasons at a time"""
+    with IngestionJobsController(session) as controller:
+        if max_parallel:
+            return controller.submit_backfill(first_season, last_season, max_parallel)
+        return controller.submit_backfill(first_season, last_season)
+
+@router.get("/scheduler")
+def get_scheduler_status():
+    """Sessions the auto-ingestion scheduler will ingest next and its latest outcomes"""
+    return get_scheduler().status
+
+@router.get("/cache")
+def get_response_cache_status():
+    """Entries and hit/miss counters of the drivers and teams response cache"""
+    return response_cache.status
+
+@router.get("/jobs/")
+def get_ingestion_jobs(session: Session = Depends(get_db_session)):
+    """List the most recent ingestion jobs"""
+    with IngestionJobsController(session) as controller:
+        return controller.get_recent_jobs()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_ingestion_metrics(session: Session = Depends(get_db_session)):
+    """Prometheus metrics of the latest ingestion run of each season and of the response cache"""
+    with IngestionJobsController(session) as controller:
+        metrics = controller.get_metrics() + response_cache.render_prometheus()
+        return PlainTextResponse(metrics, media_type="text/plain; version=0.0.4")
+
+@router.get("/jobs/{job_id}/report")
+def get_ingestion_report(job_id: int, session: Session = Depends(get_db_session)):
+    """JSON run report of an ingestion job: stage timings, rows, FastF1 loads and errors"""
+    with IngestionJobsController(session) as controller:
+        return controller.get_job_report(job_id)
+
+@router.get("/jobs/{job_id}")
+def get_ingestion_job(job_id: int, session: Session = Depends(get_db_session)):
+    """Status of an ingestion job: stage, round, summary and error"""
+    with IngestionJobsController(session) as controller:
+        return controller.get_job(job_id)
+
+@router.delete("/jobs/{job_id}")
+def cancel_ingestion_job(job_id: int, session: Session = Depends(get_db_session)):
+    """Request cancellation of an ingestion job"""
+    with IngestionJobsController(session) as controller:
+        return controller.cancel(job_id)
@@ -3,13 +3,19 @@ from fastapi import APIRouter, Depends
 from sqlmodel import Session
 
 from f1_api.controllers.drivers_controller import DriversController
-from f1_api.dependencies import get_db_session
+from f1_api.controllers.response_cache import cached_response
+from f1_api.dependencies import get_db_session, versioned_etag
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
 
 
-@router.get("/")
-def get_drivers(session: Session = Depends(get_db_session)):
-    """Get all drivers sorted by championship points up to the last round"""
+@router.get("/", dependencies=[Depends(versioned_etag("drivers"))])
+def get_drivers(round_number: int | None = None, session: Session = Depends(get_db_session)):
+    """
+    Get all drivers sorted by championship points up to the last round, cached until the next ingestion
+
+    ?round_number= returns the standings as of that round instead
+    """
+    endpoint = "drivers" if round_number is None else f"drivers@{round_number}"
     with DriversController(session) as controller:
-        return controller.get_drivers_service()
\ No newline at end of file
+        return cached_response(session, endpoint, controller.season, lambda: controller.get_drivers_service(round_number))
@@ -6,7 +6,7 @@ from f1_api.controllers.league_controller import LeagueController
 from f1_api.controllers.user_teams_controller_new import UserTeamsController
 from f1_api.controllers.driver_ownership_controller import DriverOwnershipController
 from f1_api.controllers.market_controller import MarketController
-from f1_api.dependencies import get_db_session
+from f1_api.dependencies import get_db_session, league_etag
 from f1_api.models.app_models import (
     LeagueCreate, LeagueResponse, LeagueJoin, UserTeamUpdate, UserTeamResponse,
     DriverOwnership
@@ -52,7 +52,7 @@ def create_league(
         return controller.create_league(admin_user_id, league)
 
 
-@router.get("/{league_id}", response_model=LeagueResponse)
+@router.get("/{league_id}", response_model=LeagueResponse, dependencies=[Depends(league_etag)])
 def get_league_by_id(
     league_id: int,
     user_id: str,
@@ -95,7 +95,7 @@ def join_league(
         return controller.join_league(league_join, user_id)
 
 
-@router.get("/{league_id}/participants")
+@router.get("/{league_id}/participants", dependencies=[Depends(league_etag)])
 def get_league_participants(
     league_id: int,
     session: Session = Depends(get_db_session)
@@ -129,7 +129,7 @@ def get_my_team(
 
 
 # Driver Ownership endpoints
-@router.get("/{league_id}/driver-ownership", response_model=List[DriverOwnership])
+@router.get("/{league_id}/driver-ownership", response_model=List[DriverOwnership], dependencies=[Depends(league_etag)])
 def get_league_driver_ownership(
     league_id: int,
     session: Session = Depends(get_db_session)
@@ -139,7 +139,7 @@ def get_league_driver_ownership(
         return controller.get_all_drivers_with_ownership(league_id)
 
 
-@router.get("/{league_id}/drivers/free", response_model=List[DriverOwnership])
+@router.get("/{league_id}/drivers/free", response_model=List[DriverOwnership], dependencies=[Depends(league_etag)])
 def get_free_drivers_ownership(
     league_id: int,
     session: Session = Depends(get_db_session)
@@ -149,7 +149,7 @@ def get_free_drivers_ownership(
         return controller.get_free_drivers(league_id)
 
 
-@router.get("/{league_id}/drivers/for-sale", response_model=List[DriverOwnership])
+@router.get("/{league_id}/drivers/for-sale", response_model=List[DriverOwnership], dependencies=[Depends(league_etag)])
 def get_drivers_for_sale_ownership(
     league_id: int,
     session: Session = Depends(get_db_session)
@@ -217,7 +217,7 @@ def initialize_user_team(
 
 
 # Market GET endpoints
-@router.get("/{league_id}/market/free-drivers")
+@router.get("/{league_id}/market/free-drivers", dependencies=[Depends(league_etag)])
 def get_free_drivers(
     league_id: int,
     session: Session = Depends(get_db_session)
@@ -227,7 +227,7 @@ def get_free_drivers(
         return controller.get_free_drivers(league_id)
 
 
-@router.get("/{league_id}/market/for-sale")
+@router.get("/{league_id}/market/for-sale", dependencies=[Depends(league_etag)])
 def get_drivers_for_sale(
     league_id: int,
     session: Session = Depends(get_db_session)
@@ -237,7 +237,7 @@ def get_drivers_for_sale(
         return controller.get_drivers_for_sale(league_id)
 
 
-@router.get("/{league_id}/market/user-drivers/{user_id}")
+@router.get("/{league_id}/market/user-drivers/{user_id}", dependencies=[Depends(league_etag)])
 def get_user_drivers(
     league_id: int,
     user_id: str,  # Changed to str to accept UUID
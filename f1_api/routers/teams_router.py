@@ -1,13 +1,20 @@
 """Teams-related routes"""
+from datetime import datetime
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
-from f1_api.controllers.teams_controller import TeamsController
-from f1_api.dependencies import get_db_session
+from f1_api.controllers.response_cache import cached_response
+from f1_api.controllers.teams_controller import TeamsController, get_team_rosters
+from f1_api.dependencies import get_db_session, versioned_etag
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(versioned_etag("teams"))])
 def get_teams(session: Session = Depends(get_db_session)):
-    """Get all teams for the current season with accumulated points"""
+    """Get all teams for the current season with accumulated points, cached until the next ingestion"""
     with TeamsController(session) as controller:
-        return controller.get_teams_with_season_stats
+        return cached_response(session, "teams", datetime.now().year, lambda: controller.get_teams_with_season_stats)
+
+@router.get("/rosters")
+def get_rosters(season: int, session: Session = Depends(get_db_session)):
+    """Teams recorded for each round of a season and the changes between rounds"""
+    return get_team_rosters(session, season)
@@ -0,0 +1,105 @@
+"""
+Shared fixtures: an in-memory SQLite database with every table and a statement counter.
+
+The ON CONFLICT upserts only run on PostgreSQL: pg_session connects to
+TEST_DATABASE_URL, a scratch database whose tables are dropped and recreated,
+and the tests using it are skipped when it is not set.
+"""
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlmodel import Session, SQLModel, select
+import f1_api.models  # noqa: F401  registers the tables
+
+# config.sql_init builds its PostgreSQL engine at import time, the tests never connect to it
+for key, value in {"user": "test", "password": "test", "host": "localhost", "port": "5432", "dbname": "test"}.items():
+    os.environ.setdefault(key, value)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+@pytest.fixture
+def count_queries(engine):
+    """Context manager yielding a list that receives every statement run inside it"""
+    @contextmanager
+    def counter():
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return counter
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(url, poolclass=NullPool)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def pg_session(pg_engine):
+    """Session on PostgreSQL whose commits become savepoints, everything is rolled back after the test"""
+    with pg_engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint") as session:
+            yield session
+        transaction.rollback()
+
+@pytest.fixture
+def add_results():
+    """
+    Function writing SessionResult rows with the seasons, events, sessions and
+    drivers they reference: add_results(session, season, [(round, session_number,
+    driver_number, position, grid_position, points, fastest_lap), ...])
+    """
+    def add(session, season: int, results: list[tuple]):
+        from f1_api.models.f1_schemas import Drivers, Events, Seasons, SessionResult, Sessions
+        session_types = {1: "Practice 1", 2: "Sprint Qualifying", 3: "Sprint", 4: "Qualifying", 5: "Race"}
+        session.merge(Seasons(year=season))
+        for round_number in sorted({result[0] for result in results}):
+            session.merge(Events(round_number=round_number, season_id=season, event_name=f"Round {round_number}",
+                                 event_type="sprint_qualifying", event_country="Nowhere",
+                                 date_start=datetime(season, 3, 1) + timedelta(weeks=round_number)))
+        session.flush()
+        for round_number, session_number in sorted({result[:2] for result in results}):
+            session.merge(Sessions(round_number=round_number, season_id=season, session_number=session_number,
+                                   session_type=session_types[session_number]))
+        drivers = {}
+        for driver_number in sorted({result[2] for result in results}):
+            key = f"drv{driver_number:03d}01"
+            driver = session.exec(select(Drivers).where(Drivers.driver_key == key)).first()
+            if driver is None:
+                driver = Drivers(driver_key=key, driver_number=driver_number, full_name=f"Driver {driver_number}",
+                                 acronym=f"D{driver_number:02d}", driver_color="#ffffff", country_code=None,
+                                 headshot_url="")
+                session.add(driver)
+            drivers[driver_number] = driver
+        session.flush()
+        for round_number, session_number, driver_number, position, grid, points, fastest_lap in results:
+            session.merge(SessionResult(season_id=season, round_number=round_number, session_number=session_number,
+                                        driver_id=drivers[driver_number].id, position=position, grid_position=grid,
+                                        best_lap_time=None, total_time=None, points=points, status=None,
+                                        fastest_lap=fastest_lap))
+        session.flush()
+        return {driver_number: driver.id for driver_number, driver in drivers.items()}
+    return add
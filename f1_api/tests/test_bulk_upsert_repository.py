@@ -0,0 +1,119 @@
+"""Batched ON CONFLICT upserts of BulkUpsertRepository, run on PostgreSQL"""
+from sqlmodel import select
+from f1_api.models.f1_schemas import Drivers
+from f1_api.models.repositories.bulk_upsert_repository import BulkUpsertRepository
+from f1_api.models.repositories.dry_run_repository import DryRunRepository
+
+SEASON = 2025
+
+def driver_row(key: str, number: int, team: str, color: str = "#ffffff", season: int = SEASON, base: str = "") -> dict:
+    return {
+        "driver_key": key, "driver_number": number, "full_name": f"Driver {key}", "acronym": key[:3].upper(),
+        "driver_color": color, "country_code": None, "last_season": season, "current_market_value": 10_000_000,
+        "headshot_url": f"{base}/common/f1/{season}/{team}/{key}/{season}{team}{key}right.webp", "team_key": team,
+    }
+
+def stored(session) -> dict:
+    return {d.driver_key: d for d in session.exec(select(Drivers)).all()}
+
+def per_driver_changes(existing: dict, rows: list[dict]) -> tuple[list, list]:
+    """
+    (inserted, updated) keys of the per-driver SELECT path the upsert replaced:
+    new drivers are inserted, known ones are updated when their color or the
+    team of their headshot changed
+    """
+    def team(url):
+        parts = url.split("/")
+        return parts[4] if len(parts) >= 5 else ""
+    inserted, updated = [], []
+    for row in rows:
+        driver = existing.get(row["driver_key"])
+        if driver is None:
+            inserted.append(row["driver_key"])
+        elif driver.driver_color != row["driver_color"] or team(driver.headshot_url) != team(row["headshot_url"]):
+            updated.append(row["driver_key"])
+    return inserted, updated
+
+def test_upsert_drivers_matches_the_per_driver_path(pg_session):
+    bulk = BulkUpsertRepository(pg_session)
+    bulk.upsert_drivers([
+        driver_row("maxver01", 1, "redbull"),
+        driver_row("lannor01", 4, "mclaren"),
+        driver_row("chalec01", 16, "ferrari"),
+    ])
+    before = {key: driver.model_dump() for key, driver in stored(pg_session).items()}
+    rows = [
+        driver_row("maxver01", 1, "redbull"),                      # unchanged
+        driver_row("lannor01", 4, "mclaren", color="#ff8000"),     # new color
+        driver_row("chalec01", 16, "mercedes"),                    # new team
+        driver_row("olibea01", 87, "haas"),                        # new driver
+    ]
+    inserted, updated = per_driver_changes(stored(pg_session), rows)
+    pg_session.expire_all()
+
+    counts = bulk.upsert_drivers(rows)
+    after = stored(pg_session)
+    assert counts == {"inserted": len(inserted), "updated": len(updated)}
+    assert sorted(set(after) - set(before)) == sorted(inserted)
+    changed = [key for key in before if after[key].model_dump() != before[key]]
+    assert sorted(changed) == sorted(updated)
+    assert after["lannor01"].driver_color == "#ff8000"
+    assert "/mercedes/" in after["chalec01"].headshot_url
+
+def test_counts_of_insert_unchanged_and_changed_reruns(pg_session):
+    # A batch size below the row count checks the counts add up across batches
+    bulk = BulkUpsertRepository(pg_session, batch_size=2)
+    rows = [{"team_name": name, "team_color": "#000000"} for name in ("Ferrari", "McLaren", "Williams")]
+    assert bulk.upsert_teams(rows) == {"inserted": 3, "updated": 0}
+    assert bulk.upsert_teams(rows) == {"inserted": 0, "updated": 0}
+
+    drivers = [driver_row("maxver01", 1, "redbull"), driver_row("lannor01", 4, "mclaren")]
+    assert bulk.upsert_drivers(drivers) == {"inserted": 2, "updated": 0}
+    assert bulk.upsert_drivers(drivers) == {"inserted": 0, "updated": 0}
+    changed = [driver_row("maxver01", 3, "redbull"), driver_row("lannor01", 4, "mclaren")]
+    assert bulk.upsert_drivers(changed) == {"inserted": 0, "updated": 1}
+    assert stored(pg_session)["maxver01"].driver_number == 3
+
+def test_an_older_season_does_not_overwrite_newer_attributes(pg_session):
+    bulk = BulkUpsertRepository(pg_session)
+    bulk.upsert_drivers([driver_row("lewham01", 44, "ferrari", color="#dc0000", season=2025)])
+
+    backfill = driver_row("lewham01", 44, "mercedes", color="#00d2be", season=2024)
+    assert bulk.upsert_drivers([backfill]) == {"inserted": 0, "updated": 0}
+    pg_session.expire_all()
+    driver = stored(pg_session)["lewham01"]
+    assert (driver.driver_color, driver.last_season) == ("#dc0000", 2025)
+    assert "/ferrari/" in driver.headshot_url
+
+    newer = driver_row("lewham01", 44, "ferrari", color="#ff2800", season=2026)
+    assert bulk.upsert_drivers([newer]) == {"inserted": 0, "updated": 1}
+    pg_session.expire_all()
+    assert stored(pg_session)["lewham01"].driver_color == "#ff2800"
+
+def test_headshot_follows_the_team_whatever_the_url_base(pg_session):
+    bulk = BulkUpsertRepository(pg_session)
+    base = "https://media.example.com/content/dam/fom-website"
+    bulk.upsert_drivers([driver_row("carsai01", 55, "williams", season=2025, base=base)])
+
+    # A new season with the same team keeps the stored headshot
+    assert bulk.upsert_drivers([driver_row("carsai01", 55, "williams", season=2026, base=base)]) == {"inserted": 0, "updated": 1}
+    pg_session.expire_all()
+    assert "/2025/williams/" in stored(pg_session)["carsai01"].headshot_url
+
+    assert bulk.upsert_drivers([driver_row("carsai01", 55, "audi", season=2026, base=base)]) == {"inserted": 0, "updated": 1}
+    pg_session.expire_all()
+    driver = stored(pg_session)["carsai01"]
+    assert (driver.team_key, driver.headshot_url) == ("audi", driver_row("carsai01", 55, "audi", season=2026, base=base)["headshot_url"])
+
+def test_dry_run_reports_the_same_driver_changes(pg_session):
+    BulkUpsertRepository(pg_session).upsert_drivers([
+        driver_row("carsai01", 55, "williams", season=2025), driver_row("alealb01", 23, "williams", season=2025),
+    ])
+    dry_run = DryRunRepository(pg_session)
+    counts = dry_run.upsert_drivers([
+        driver_row("carsai01", 55, "williams", season=2025), driver_row("alealb01", 23, "audi", season=2025),
+    ])
+    assert counts == {"inserted": 0, "updated": 1}
+    [update] = dry_run.changes["drivers"]["updated"]
+    assert update["key"] == {"driver_key": "alealb01"}
+    assert sorted(update["changes"]) == ["headshot_url", "team_key"]
@@ -0,0 +1,59 @@
+"""Materialized driver_season_stats rows, run on PostgreSQL (INSERT ... SELECT ... ON CONFLICT)"""
+from sqlmodel import select
+from f1_api.models.f1_schemas import DriverSeason, DriverSeasonStats
+from f1_api.models.repositories.driver_season_stats_repository import DriverSeasonStatsRepository
+
+SEASON = 2025
+RACE = 5
+
+def season_stats(session, season: int = SEASON) -> dict:
+    session.expire_all()
+    rows = session.exec(select(DriverSeasonStats).where(DriverSeasonStats.season_id == season)).all()
+    return {row.driver_id: row for row in rows}
+
+def test_reingested_round_replaces_its_share(pg_session, add_results):
+    ids = add_results(pg_session, SEASON, [(1, RACE, 1, "1", 1, 25, True), (1, RACE, 44, "2", 2, 18, False)])
+    repository = DriverSeasonStatsRepository(pg_session, SEASON)
+    assert repository.refresh() == {"inserted": 2, "updated": 0}
+
+    add_results(pg_session, SEASON, [(2, RACE, 1, "2", 2, 18, False), (2, RACE, 44, "1", 1, 25, False)])
+    assert repository.refresh(ids.values()) == {"inserted": 0, "updated": 2}
+    # Round 2 reloaded with a post-race penalty: its results replace the first load
+    add_results(pg_session, SEASON, [(2, RACE, 1, "3", 2, 15, False)])
+    assert repository.refresh([ids[1]]) == {"inserted": 0, "updated": 1}
+
+    stats = season_stats(pg_session)
+    assert (stats[ids[1]].points, stats[ids[1]].podiums, stats[ids[1]].finish_count) == (40, 2, 2)
+    assert (stats[ids[44]].points, stats[ids[44]].victories, stats[ids[44]].last_round) == (43, 1, 2)
+
+def test_unchanged_rows_are_not_rewritten(pg_session, add_results):
+    ids = add_results(pg_session, SEASON, [(1, RACE, 1, "1", 1, 25, True)])
+    repository = DriverSeasonStatsRepository(pg_session, SEASON)
+    repository.refresh()
+    updated_at = season_stats(pg_session)[ids[1]].updated_at
+
+    assert repository.refresh() == {"inserted": 0, "updated": 0}
+    assert season_stats(pg_session)[ids[1]].updated_at == updated_at
+    assert repository.refresh(driver_ids=[None]) == {"inserted": 0, "updated": 0}
+
+def test_backfill_only_seeds_a_season_without_stats(pg_session, add_results):
+    ids = add_results(pg_session, SEASON, [(1, RACE, 1, "1", 1, 25, True), (1, RACE, 44, "2", 2, 18, False)])
+    repository = DriverSeasonStatsRepository(pg_session, SEASON)
+    assert repository.backfill() == {"inserted": 2, "updated": 0}
+    add_results(pg_session, SEASON, [(2, RACE, 1, "1", 1, 25, False)])
+    assert repository.backfill() == {"inserted": 0, "updated": 0}
+    assert season_stats(pg_session)[ids[1]].last_round == 1
+
+def test_drivers_with_stats_fall_back_to_the_latest_season(pg_session, add_results):
+    ids = add_results(pg_session, SEASON, [(1, RACE, 1, "1", 1, 25, True), (1, RACE, 44, "2", 2, 18, False)])
+    for driver_number, driver_id in ids.items():
+        pg_session.add(DriverSeason(season_id=SEASON, driver_id=driver_id, driver_number=driver_number,
+                                    acronym=f"D{driver_number:02d}", driver_color="#ffffff", headshot_url=""))
+    pg_session.flush()
+    DriverSeasonStatsRepository(pg_session, SEASON).refresh()
+
+    # The next season has started but has no results yet
+    rows = DriverSeasonStatsRepository(pg_session, SEASON + 1).get_drivers_with_stats()
+    assert [(driver.id, stats.season_id, max_round) for driver, stats, max_round, _ in rows] == [
+        (ids[1], SEASON, 1), (ids[44], SEASON, 1)
+    ]
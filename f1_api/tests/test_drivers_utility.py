@@ -0,0 +1,45 @@
+"""get_drivers_mapped resolves the teams of every driver with a fixed number of queries"""
+import pytest
+from f1_api.models.f1_schemas import DriverTeamLink, Drivers, Seasons, Teams
+from f1_api.models.lib.drivers_utility import MARKET_FIELDS, DriversUtility
+
+SEASON = 2025
+
+def seed_drivers(session, count: int) -> list[Drivers]:
+    """count drivers racing rounds 1 and 2, every other driver changing team at round 2"""
+    session.add(Seasons(year=SEASON))
+    teams = [Teams(team_name=f"Team {n}", team_color="#000000") for n in range(count + 1)]
+    drivers = [
+        Drivers(driver_key=f"dri{n:03d}01", driver_number=n, full_name=f"Driver {n}", acronym=f"D{n:02d}",
+                driver_color="#ffffff", country_code=None, headshot_url="")
+        for n in range(1, count + 1)
+    ]
+    session.add_all([*teams, *drivers])
+    session.flush()
+    for n, driver in enumerate(drivers, start=1):
+        session.add(DriverTeamLink(driver_id=driver.id, team_id=teams[n - 1].id, season_id=SEASON, round_number=1))
+        second_team = teams[n] if n % 2 else teams[n - 1]
+        session.add(DriverTeamLink(driver_id=driver.id, team_id=second_team.id, season_id=SEASON, round_number=2))
+    session.commit()
+    return drivers
+
+@pytest.mark.parametrize("driver_count", [1, 5, 40])
+def test_get_drivers_mapped_query_count_is_constant(session, count_queries, driver_count):
+    drivers = seed_drivers(session, driver_count)
+    with count_queries() as statements:
+        mapped = DriversUtility.get_drivers_mapped(2, {}, {}, 0, drivers, session, SEASON)
+    assert len(statements) == 1
+    assert len(mapped) == driver_count
+
+def test_get_drivers_mapped_uses_the_team_of_the_round(session):
+    drivers = seed_drivers(session, 4)
+    at_round_1 = DriversUtility.get_drivers_mapped(1, {}, {}, 0, drivers, session, SEASON)
+    at_round_2 = DriversUtility.get_drivers_mapped(2, {}, {}, 0, drivers, session, SEASON)
+    assert [d["team_name"] for d in at_round_1] == ["Team 0", "Team 1", "Team 2", "Team 3"]
+    assert [d["team_name"] for d in at_round_2] == ["Team 1", "Team 1", "Team 3", "Team 3"]
+
+def test_get_drivers_mapped_falls_back_to_the_latest_link(session):
+    drivers = seed_drivers(session, 2)
+    mapped = DriversUtility.get_drivers_mapped(5, {}, {}, 0, drivers, session, SEASON)
+    assert not MARKET_FIELDS & set(mapped[0])
+    assert [d["team_name"] for d in mapped] == ["Team 1", "Team 1"]
@@ -0,0 +1,54 @@
+"""League ETag validator and the content-hash middleware"""
+import asyncio
+from datetime import datetime
+from starlette.requests import Request
+from starlette.responses import Response
+from f1_api.middleware.etag import etag_middleware
+from f1_api.models.app_models import DriverOwnership, Leagues, Users
+from f1_api.models.f1_schemas import Drivers
+from f1_api.models.repositories.leagues_repository import LeaguesRepository
+
+def seed_league(session) -> Leagues:
+    user = Users(user_name="admin", email="admin@example.com", supabase_user_id="sb-admin")
+    driver = Drivers(driver_key="drive01", driver_number=1, full_name="Driver One", acronym="DRI",
+                     driver_color="#ffffff", country_code=None, headshot_url="")
+    session.add_all([user, driver])
+    session.flush()
+    league = Leagues(name="League", admin_user_id=user.id, join_code="ABC123")
+    session.add(league)
+    session.flush()
+    session.add(DriverOwnership(driver_id=driver.id, league_id=league.id, acquisition_price=10_000_000))
+    session.commit()
+    return league
+
+def test_change_marker_follows_ownership_writes(session):
+    league = seed_league(session)
+    repository = LeaguesRepository(session)
+    before = repository.get_change_marker(league.id)
+    assert repository.get_change_marker(league.id) == before
+
+    ownership = session.get(DriverOwnership, (1, league.id))
+    ownership.owner_id = league.admin_user_id
+    ownership.updated_at = datetime(2100, 1, 1)
+    session.commit()
+    assert repository.get_change_marker(league.id) != before
+    assert repository.get_change_marker(league.id + 1) == ()
+
+def test_middleware_keeps_repeated_headers():
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""}
+    request = Request(scope)
+    request.state.content_etag = True
+
+    async def call_next(_):
+        response = Response(content=b"body", media_type="application/json")
+        response.raw_headers.append((b"set-cookie", b"a=1"))
+        response.raw_headers.append((b"set-cookie", b"b=2"))
+        response.body_iterator = _chunks(response.body)
+        return response
+
+    tagged = asyncio.run(etag_middleware(request, call_next))
+    assert [value for name, value in tagged.raw_headers if name == b"set-cookie"] == [b"a=1", b"b=2"]
+    assert tagged.headers["etag"].startswith('"')
+
+async def _chunks(body: bytes):
+    yield body
@@ -0,0 +1,163 @@
+"""IngestionScheduler driven by a fake clock, a fake FastF1 schedule and a fake job submitter"""
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from sqlmodel import Session, select
+from f1_api.controllers.ingestion_scheduler import IngestionScheduler
+from f1_api.models.f1_schemas import Events, IngestionJob, IngestionState, Seasons
+
+SEASON = 2025
+ROUND = 5
+RACE_START = datetime(2025, 5, 4, 13, 0)
+# Race duration (2h) plus the scheduler delay
+RACE_DUE = RACE_START + timedelta(hours=2, minutes=30)
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+class FakeSchedule:
+    """FastF1 client whose schedule has a single round with only its race"""
+    @staticmethod
+    def get_event_schedule(year: int) -> pd.DataFrame:
+        event = {"RoundNumber": ROUND, "EventFormat": "conventional", "EventName": "Test Grand Prix"}
+        for n in range(1, 5):
+            event[f"Session{n}"] = ""
+            event[f"Session{n}DateUtc"] = pd.NaT
+        event["Session5"] = "Race"
+        event["Session5DateUtc"] = pd.Timestamp(RACE_START)
+        return pd.DataFrame([event])
+
+class FakeLock:
+    def __init__(self, acquired: bool = True):
+        self.acquired = acquired
+        self.held = False
+
+    def acquire(self) -> bool:
+        self.held = self.acquired
+        return self.acquired
+
+    def release(self):
+        self.held = False
+
+class FakeSubmit:
+    """Records the submitted tasks as running jobs, or reports the season busy"""
+    def __init__(self):
+        self.tasks = []
+        self.busy = False
+
+    def __call__(self, session: Session, task: dict) -> int | None:
+        if self.busy:
+            return None
+        job = IngestionJob(season_id=task["season"], status="running",
+                           scope={"rounds": [task["round_number"]], "sessions": [task["session_type"]]})
+        session.add(job)
+        session.commit()
+        self.tasks.append(task)
+        return job.id
+
+@pytest.fixture
+def scheduler(engine):
+    with Session(engine) as session:
+        session.add(Seasons(year=SEASON))
+        session.add(Events(round_number=ROUND, season_id=SEASON, event_name="Test Grand Prix",
+                           event_type="conventional", event_country="Nowhere", date_start=RACE_START))
+        session.commit()
+    return IngestionScheduler(
+        lambda: Session(engine), ff1_client=FakeSchedule, clock=FakeClock(RACE_DUE - timedelta(minutes=1)),
+        submit=FakeSubmit(), lock=FakeLock(), delay=timedelta(minutes=30), retry_base=timedelta(minutes=10),
+        max_attempts=3, poll_seconds=1
+    )
+
+def finish_jobs(engine, status: str = "completed"):
+    with Session(engine) as session:
+        for job in session.exec(select(IngestionJob)).all():
+            job.status = status
+            session.add(job)
+        session.commit()
+
+def store_results(engine):
+    with Session(engine) as session:
+        session.add(IngestionState(season_id=SEASON, round_number=ROUND, session_number=5, status="completed"))
+        session.commit()
+
+def race_task(scheduler) -> dict:
+    return scheduler.tasks[(SEASON, ROUND, 5)]
+
+def test_session_is_submitted_once_due(scheduler):
+    scheduler.tick()
+    assert scheduler.submit.tasks == []
+    assert race_task(scheduler)["status"] == "scheduled"
+
+    scheduler.clock.now = RACE_DUE
+    scheduler.tick()
+    assert [(t["round_number"], t["session_type"]) for t in scheduler.submit.tasks] == [(ROUND, "Race")]
+    assert race_task(scheduler)["status"] == "submitted"
+
+    # The job is still running, nothing is submitted again
+    scheduler.clock.now += timedelta(hours=1)
+    scheduler.tick()
+    assert len(scheduler.submit.tasks) == 1
+
+def test_empty_results_are_retried_with_backoff(scheduler, engine):
+    scheduler.clock.now = RACE_DUE
+    scheduler.tick()
+    finish_jobs(engine)
+    scheduler.tick()
+    task = race_task(scheduler)
+    assert task["status"] == "waiting"
+    assert task["next_attempt_at"] == RACE_DUE + timedelta(minutes=10)
+
+    scheduler.clock.now = RACE_DUE + timedelta(minutes=10)
+    scheduler.tick()
+    assert len(scheduler.submit.tasks) == 2
+    finish_jobs(engine)
+    scheduler.tick()
+    # Second retry waits twice as long
+    assert race_task(scheduler)["next_attempt_at"] == RACE_DUE + timedelta(minutes=30)
+
+    store_results(engine)
+    scheduler.tick()
+    assert race_task(scheduler)["status"] == "ingested"
+    assert scheduler.upcoming() == []
+
+def test_gives_up_after_max_attempts(scheduler, engine):
+    scheduler.clock.now = RACE_DUE
+    for _ in range(scheduler.max_attempts):
+        scheduler.tick()
+        finish_jobs(engine, "failed")
+        # The next tick sees the finished job and schedules the retry
+        scheduler.tick()
+        scheduler.clock.now += timedelta(days=1)
+    assert race_task(scheduler)["status"] == "gave_up"
+    assert len(scheduler.submit.tasks) == scheduler.max_attempts
+
+def test_busy_season_defers_without_spending_an_attempt(scheduler):
+    scheduler.clock.now = RACE_DUE
+    scheduler.submit.busy = True
+    scheduler.tick()
+    scheduler.tick()
+    task = race_task(scheduler)
+    assert task["status"] == "deferred"
+    assert task["attempts"] == 0
+    assert [o["result"] for o in scheduler.outcomes].count("deferred, the season has an active job of another scope") == 1
+
+    scheduler.submit.busy = False
+    scheduler.tick()
+    assert task["status"] == "submitted"
+    assert task["attempts"] == 1
+
+def test_only_the_lock_holder_ticks(scheduler):
+    scheduler.clock.now = RACE_DUE
+    scheduler.lock.acquired = False
+    assert scheduler.run_once() is False
+    assert scheduler.submit.tasks == []
+    assert scheduler.status["leader"] is False
+
+    scheduler.lock.acquired = True
+    assert scheduler.run_once() is True
+    assert len(scheduler.submit.tasks) == 1
+    assert scheduler.status["leader"] is True
@@ -0,0 +1,36 @@
+"""Watermarks keep a session pending while its reloaded results differ from the stored checksum"""
+from f1_api.models.f1_schemas import IngestionState, SessionResult
+from f1_api.models.repositories.ingestion_state_repository import IngestionStateRepository
+
+SEASON = 2025
+
+def store_results(session, points: list[int]):
+    for driver_id, driver_points in enumerate(points, start=1):
+        session.merge(SessionResult(season_id=SEASON, round_number=1, session_number=5, driver_id=driver_id,
+                                    position=str(driver_id), grid_position=driver_id, best_lap_time=None,
+                                    total_time=None, points=driver_points, status="Finished", fastest_lap=False))
+    session.flush()
+
+def test_changed_results_stay_pending_until_a_reload_agrees(session):
+    repository = IngestionStateRepository(session, SEASON)
+    store_results(session, [25, 18])
+    repository.record_sessions([(1, 5)])
+    assert repository.get_ingested_sessions() == {(1, 5)}
+
+    store_results(session, [18, 25])
+    [state] = repository.record_sessions([(1, 5)])
+    assert state.status == "changed"
+    assert repository.get_ingested_sessions() == set()
+
+    [state] = repository.record_sessions([(1, 5)])
+    assert state.status == "completed"
+    assert repository.get_ingested_sessions() == {(1, 5)}
+
+def test_first_load_and_empty_sessions(session):
+    repository = IngestionStateRepository(session, SEASON)
+    [empty] = repository.record_sessions([(2, 1)])
+    assert empty.status == "empty"
+    store_results(session, [25])
+    [state] = repository.record_sessions([(1, 5)])
+    assert state.status == "completed"
+    assert session.get(IngestionState, (SEASON, 1, 5)).checksum == state.checksum
@@ -0,0 +1,15 @@
+"""ensure_ingestion_schema upgrades a database created before the ingestion tables, run on PostgreSQL"""
+from sqlalchemy import inspect, text
+from f1_api.models.repositories import schema_repository
+from f1_api.models.repositories.schema_repository import INGESTION_TABLES, ensure_ingestion_schema
+
+def test_creates_the_missing_ingestion_tables(pg_session, monkeypatch):
+    names = [model.__table__.name for model in INGESTION_TABLES]
+    for name in names:
+        pg_session.execute(text(f"DROP TABLE {name} CASCADE"))
+    monkeypatch.setattr(schema_repository, "_ensured", False)
+
+    ensure_ingestion_schema(pg_session)
+
+    existing = set(inspect(pg_session.connection()).get_table_names())
+    assert set(names) <= existing
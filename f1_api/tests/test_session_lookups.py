@@ -0,0 +1,36 @@
+"""SessionLookups.build skips the drivers fastf1.plotting has no data for"""
+from f1_api.data_sources.session_lookups import SessionLookups
+
+class FakePlottingClient:
+    drivers = {"Red": ["Max Verstappen", "Unknown Reserve"], "Blue": ["Lando Norris"]}
+
+    @staticmethod
+    def get_session_teams(session):
+        return ["Red", "Blue"]
+
+    @staticmethod
+    def get_team_color(team, session):
+        if team == "Blue":
+            raise KeyError(team)
+        return "#ff0000"
+
+    @classmethod
+    def get_drivers_by_team(cls, team, session):
+        return cls.drivers[team]
+
+    @staticmethod
+    def get_driver_abbreviation(name, session):
+        if name == "Unknown Reserve":
+            raise KeyError(name)
+        return name.split()[1][:3].upper()
+
+    @staticmethod
+    def get_driver_color(name, session):
+        return "#00ff00"
+
+def test_build_skips_drivers_without_plotting_data():
+    lookups = SessionLookups.build(object(), FakePlottingClient)
+    assert lookups.driver_names == ["Max Verstappen", "Lando Norris"]
+    assert lookups.team_name_by_driver("VER") == "Red"
+    assert "Unknown Reserve" not in lookups.abbreviations
+    assert lookups.team_colors["Blue"] is None
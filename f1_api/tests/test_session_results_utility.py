@@ -0,0 +1,86 @@
+"""extract_session_rows produces the same rows as the per-driver pick_fastest loop it replaced"""
+import pandas as pd
+import pytest
+
+core = pytest.importorskip("fastf1.core")
+from f1_api.benchmarks.session_results_benchmark import extract_rows_columnar, extract_rows_loop  # noqa: E402
+
+NaT = pd.NaT
+
+class FakeSession:
+    """The attributes both extraction paths read from a loaded FastF1 session"""
+    def __init__(self, name: str, results: list[dict], laps: list[tuple]):
+        self.name = name
+        self.results = pd.DataFrame(results)
+        numbers = dict(zip(self.results["Abbreviation"], self.results["DriverNumber"]))
+        self.laps = core.Laps(pd.DataFrame(laps, columns=["Driver", "LapTime", "IsPersonalBest"]).assign(
+            LapTime=lambda frame: pd.to_timedelta(frame["LapTime"]),
+            DriverNumber=lambda frame: frame["Driver"].map(numbers),
+        ))
+        self.drivers = list(self.results["DriverNumber"])
+
+    def get_driver(self, abbreviation: str) -> pd.Series:
+        return self.results.loc[self.results["Abbreviation"] == abbreviation].iloc[0]
+
+def result(number: str, abbreviation: str, classified: str, grid: float, time, points: float, status: str,
+           position: float | None = None) -> dict:
+    return {
+        "DriverNumber": number, "Abbreviation": abbreviation, "ClassifiedPosition": classified,
+        "Position": position if position is not None else (float(classified) if classified.isdigit() else float("nan")),
+        "GridPosition": grid, "Time": pd.to_timedelta(time), "Points": points, "Status": status,
+    }
+
+RACE_RESULTS = [
+    result("1", "VER", "1", 1.0, "1:30:00", 25.0, "Finished"),
+    result("4", "NOR", "2", 3.0, "0:00:05", 18.0, "Finished"),
+    result("16", "LEC", "R", 2.0, NaT, 0.0, "Retired"),
+    result("44", "HAM", "W", 0.0, NaT, 0.0, "Did not start", position=20.0),
+]
+RACE_LAPS = [
+    ("VER", "0:01:21", True), ("VER", "0:01:20.5", True), ("VER", "0:01:22", False),
+    ("NOR", "0:01:21.2", True), ("NOR", "0:01:20.1", False),   # deleted lap, not a personal best
+    ("LEC", NaT, False), ("LEC", "0:01:22.4", True), ("LEC", NaT, True),
+    # HAM has no laps
+]
+
+SCENARIOS = {
+    "race with deleted, untimed and missing laps": ("Race", RACE_RESULTS, RACE_LAPS),
+    "sprint whose fastest driver is disqualified": ("Sprint", [
+        result("1", "VER", "1", 2.0, "0:30:00", 8.0, "Finished"),
+        result("63", "RUS", "D", 1.0, "0:00:02", 0.0, "Disqualified"),
+        result("81", "PIA", "2", 3.0, "0:00:04", 7.0, "Finished"),
+    ], [
+        ("VER", "0:01:21.5", True), ("RUS", "0:01:20.9", True), ("PIA", "0:01:21.1", True), ("PIA", NaT, False),
+    ]),
+    "qualifying": ("Qualifying", [
+        result("1", "VER", "", float("nan"), NaT, 0.0, "", position=1.0),
+        result("4", "NOR", "", float("nan"), NaT, 0.0, "", position=2.0),
+        result("44", "HAM", "", float("nan"), NaT, 0.0, "", position=3.0),
+    ], [
+        ("VER", "0:01:18.5", True), ("NOR", "0:01:18.7", True), ("NOR", "0:01:18.2", False),
+    ]),
+}
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_columnar_rows_match_the_per_driver_loop(scenario):
+    session_type, results, laps = SCENARIOS[scenario]
+    f1_session = FakeSession(session_type, results, laps)
+
+    def by_driver(rows):
+        return sorted(rows, key=lambda row: row["driver_number"])
+    assert by_driver(extract_rows_columnar(f1_session, session_type)) == by_driver(extract_rows_loop(f1_session, session_type))
+
+def test_race_where_every_lap_was_deleted():
+    # pick_fastest() returns None here, the per-driver loop failed on it
+    f1_session = FakeSession("Race", RACE_RESULTS[:2], [("VER", "0:01:21", False), ("NOR", "0:01:21.2", False)])
+    rows = extract_rows_columnar(f1_session, "Race")
+    assert [(row["driver_number"], row["best_lap_time"], row["fastest_lap"]) for row in rows] == [
+        (1, None, False), (4, None, False)
+    ]
+    assert [(row["position"], row["grid_position"], row["points"]) for row in rows] == [("1", 1, 25), ("2", 3, 18)]
+
+def test_fastest_lap_goes_to_a_classified_driver_only():
+    f1_session = FakeSession("Sprint", *SCENARIOS["sprint whose fastest driver is disqualified"][1:])
+    rows = {row["driver_number"]: row for row in extract_rows_columnar(f1_session, "Sprint")}
+    assert [number for number, row in rows.items() if row["fastest_lap"]] == [81]
+    assert rows[63]["best_lap_time"] is None
@@ -0,0 +1,60 @@
+"""SQL driver stats aggregates against hand-counted results, edge cases of the old Python loop included"""
+import pytest
+from f1_api.models.lib.drivers_utility import DriversUtility
+from f1_api.models.repositories.sessions_results_repository import SessionResultsRepository
+
+SEASON = 2025
+RACE, SPRINT, QUALIFYING = 5, 3, 4
+
+# (round, session, driver number, position, grid, points, fastest lap)
+RESULTS = [
+    (1, QUALIFYING, 1, "1", None, None, None),   # not a race, ignored by the counters
+    (1, RACE, 1, "1", 1, 25, True),             # pole, win from pole, fastest lap
+    (2, RACE, 1, "R", 3, 0, False),             # retired: finish 20, overtakes 0
+    (2, SPRINT, 1, "1", 1, 8, False),           # sprint pole and win
+    (1, RACE, 44, "3", 0, 15, False),           # pit lane start: no grid, overtakes 0
+    (2, RACE, 44, "2", 5, 18, False),           # gained 3 places
+    (2, SPRINT, 44, "D", 2, 0, False),          # disqualified from the sprint
+    (1, RACE, 81, None, None, 0, None),         # not classified, no grid
+    (2, RACE, 81, "10", 10, 1, False),
+]
+
+EXPECTED = {
+    1: {"poles": 1, "pole_victories": 1, "podiums": 1, "victories": 1, "fastest_laps": 1,
+        "sprint_podiums": 1, "sprint_victories": 1, "sprint_poles": 1, "points": 33,
+        "finish_sum": 21, "finish_count": 2, "grid_sum": 4, "grid_count": 2,
+        "overtake_sum": 0, "overtake_count": 2},
+    44: {"poles": 0, "pole_victories": 0, "podiums": 2, "victories": 0, "fastest_laps": 0,
+         "sprint_podiums": 0, "sprint_victories": 0, "sprint_poles": 0, "points": 33,
+         "finish_sum": 5, "finish_count": 2, "grid_sum": 5, "grid_count": 1,
+         "overtake_sum": -3, "overtake_count": 2},
+    81: {"poles": 0, "pole_victories": 0, "podiums": 0, "victories": 0, "fastest_laps": 0,
+         "sprint_podiums": 0, "sprint_victories": 0, "sprint_poles": 0, "points": 1,
+         "finish_sum": 30, "finish_count": 2, "grid_sum": 10, "grid_count": 1,
+         "overtake_sum": 0, "overtake_count": 2},
+}
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def any_session(request):
+    return request.getfixturevalue("session" if request.param == "sqlite" else "pg_session")
+
+def test_driver_stats_aggregates(any_session, add_results):
+    driver_ids = add_results(any_session, SEASON, RESULTS)
+    result = SessionResultsRepository(SEASON, any_session).get_driver_stats()
+
+    assert result["max_round"] == 2
+    assert result["sprint_rounds"] == 1
+    for driver_number, expected in EXPECTED.items():
+        stats = result["stats"][driver_ids[driver_number]]
+        assert {key: stats[key] for key in expected} == expected, driver_number
+    assert DriversUtility.average(result["stats"][driver_ids[1]], "finish") == 10.5
+    assert DriversUtility.average(result["stats"][driver_ids[44]], "grid") == 5
+
+def test_driver_stats_up_to_a_round(any_session, add_results):
+    driver_ids = add_results(any_session, SEASON, RESULTS)
+    result = SessionResultsRepository(SEASON, any_session).get_driver_stats(max_round=1)
+
+    assert result["max_round"] == 1
+    assert result["sprint_rounds"] == 0
+    assert result["stats"][driver_ids[81]]["finish_sum"] == 20
+    assert result["stats"][driver_ids[44]]["grid_count"] == 0